@@ -0,0 +1,378 @@
+"""
+헤드리스 배치 실행기
+
+Streamlit 화면 없이 로드 → 컬럼 타입 분석 → 결측 처리 → 상관/선형회귀/머신러닝/변수 점검을
+여러 데이터셋에 대해 한 번에 수행하고 결과를 JSON/Parquet으로 저장합니다.
+
+사용 예:
+    python batch_runner.py data/unit01.csv data/unit02.xlsx --y 수율 --x 온도 압력 유량 --out results --jobs 4
+    python batch_runner.py --spec nightly.json --out results --jobs 8
+
+--spec JSON 형식 (데이터셋마다 Y/X가 다를 때):
+    [{"path": "data/unit01.csv", "y": "수율", "x": ["온도", "압력"], "sheet": 0, "clean": "drop",
+      "outliers": "mad", "outlier_k": 3.5, "outlier_action": "drop"}, ...]
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import streamlit.logger
+from sklearn.model_selection import train_test_split
+
+# 화면 밖 실행이라 st.* 호출이 남기는 bare mode 경고는 숨김 (분석 모듈 import 전에 설정)
+streamlit.logger.set_log_level("error")
+
+from step1_load import read_table, analyze_column_types
+from step3_clean import clean_dataframe
+import outlier_screen
+from step5_1_linear_regression import compute_linear_models
+from step5_2_machine_learning import train_compare_models
+from step5_3_variable_feedback import compute_vif, compute_lasso_importance, compute_shap_importance
+
+# CLI 값 → step3_clean.clean_dataframe 처리 방법
+CLEAN_METHODS = {
+    "drop": "행 삭제",
+    "mean": "평균값 대체",
+    "none": "처리 불필요",
+}
+STAGES = ["corr", "linear", "ml", "variable"]
+CORR_METHODS = ["pearson", "spearman", "kendall"]
+
+
+# -------------------------------
+# JSON 직렬화 보조
+# -------------------------------
+def _to_jsonable(obj):
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, pd.DataFrame):
+        return obj.to_dict(orient="records")
+    if isinstance(obj, pd.Series):
+        return obj.to_dict()
+    return str(obj)
+
+
+def _records(df):
+    return None if df is None else df.to_dict(orient="records")
+
+
+def _output_name(path, sheet):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return stem if sheet in (0, None, "0") else f"{stem}__{sheet}"
+
+
+def _dataset_id(job: dict) -> str:
+    sheet = job.get("sheet", 0)
+    return f"{os.path.abspath(job['path'])}::{0 if sheet in (None, '0') else sheet}"
+
+
+def _assign_output_names(jobs: list):
+    """
+    데이터셋마다 결과 폴더 이름(job["name"])을 정합니다.
+    같은 파일·시트가 두 번 있으면 ValueError. 이름이 겹치면(a/unit01.csv와 b/unit01.csv, unit01.csv와 unit01.xlsx)
+    전체 경로의 짧은 해시를 붙여 서로 덮어쓰지 않게 합니다.
+    """
+    ids = [_dataset_id(job) for job in jobs]
+    duplicated = sorted({i for i in ids if ids.count(i) > 1})
+    if duplicated:
+        raise ValueError(f"같은 데이터셋이 두 번 지정됐습니다: {', '.join(duplicated)}")
+    names = [_output_name(job["path"], job.get("sheet", 0)) for job in jobs]
+    # 대소문자만 다른 이름도 같은 폴더가 되는 파일 시스템이 있으므로 소문자로 비교
+    lowered = [name.lower() for name in names]
+    for job, name, low, dataset_id in zip(jobs, names, lowered, ids):
+        if lowered.count(low) > 1:
+            name = f"{name}__{hashlib.sha1(dataset_id.encode('utf-8')).hexdigest()[:8]}"
+        job["name"] = name
+    return jobs
+
+
+# -------------------------------
+# 단계별 계산
+# -------------------------------
+def _run_correlations(df_ready, out_dir):
+    numeric_cols = df_ready.select_dtypes(include=np.number).columns.tolist()
+    summary = {"columns": numeric_cols, "files": {}}
+    if len(numeric_cols) < 2:
+        return summary
+    for method in CORR_METHODS:
+        corr = df_ready[numeric_cols].corr(method=method)
+        file_name = f"corr_{method}.parquet"
+        corr.to_parquet(os.path.join(out_dir, file_name))
+        summary["files"][method] = file_name
+    return summary
+
+
+def _run_linear(df_ready, y_col, x_cols):
+    fit = compute_linear_models(df_ready, y_col, x_cols)
+    if "error" in fit:
+        return {"error": fit["error"]}
+    summary = {"numeric_x": fit["numeric_cols"], "n_rows": fit["n_rows"]}
+    for name in ("OLS", "ElasticNet"):
+        model = fit[name]
+        summary[name] = {
+            "r2_test": float(model["r2_test"]),
+            "intercept": float(model["model"].intercept_),
+            "coefficients": model["coef_series"].to_dict(),
+            "term_analysis": model["term_analysis"],
+        }
+    summary["ElasticNet"]["best_alpha"] = float(fit["ElasticNet"]["best_alpha"])
+    summary["ElasticNet"]["best_l1_ratio"] = float(fit["ElasticNet"]["best_l1_ratio"])
+    return summary
+
+
+def _run_ml(df_ready, y_col, x_cols, out_dir):
+    numeric_x_cols = df_ready[x_cols].select_dtypes(include=np.number).columns.tolist()
+    if not numeric_x_cols:
+        return {"error": "머신러닝 분석을 위한 수치형 변수가 없습니다."}
+
+    # 화면(perform_ml_analysis_and_simulator)과 같은 분할
+    X = df_ready[numeric_x_cols]
+    y = df_ready[y_col]
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    # 캐시 래퍼는 Streamlit 세션 기준이므로 배치에서는 원본 함수를 직접 호출
+    results = train_compare_models.__wrapped__(X_train, y_train, X_test, y_test)
+
+    best_name = results["__best__"]
+    predictions = pd.DataFrame({"actual": y_test.to_numpy()}, index=y_test.index)
+    models = {}
+    for name, res in results.items():
+        if name == "__best__":
+            continue
+        predictions[name] = np.asarray(res["y_pred"], dtype=float)
+        models[name] = {"r2_test": float(res["r2"])}
+        if res.get("pi") is not None:
+            models[name]["permutation_importance"] = res["pi"]
+        if res.get("shap") is not None:
+            models[name]["shap_importance"] = res["shap"]
+    predictions.to_parquet(os.path.join(out_dir, "ml_predictions.parquet"))
+    return {"best": best_name, "models": models, "files": {"predictions": "ml_predictions.parquet"}}
+
+
+def _run_variable_check(df_ready, y_col, x_cols):
+    numeric_x_cols = df_ready[x_cols].select_dtypes(include=np.number).columns.tolist()
+    if not numeric_x_cols:
+        return {"error": "변수 점검을 위한 수치형 변수가 없습니다."}
+    summary = {
+        "vif": _records(compute_vif(df_ready, numeric_x_cols)),
+        "lasso": _records(compute_lasso_importance(df_ready, numeric_x_cols, y_col)),
+    }
+    try:
+        summary["shap"] = _records(compute_shap_importance(df_ready, numeric_x_cols, y_col))
+    except Exception as e:
+        summary["shap"] = None
+        summary["shap_error"] = str(e)
+    return summary
+
+
+# -------------------------------
+# 데이터셋 1개 처리 (워커 프로세스에서 실행)
+# -------------------------------
+def run_pipeline(job: dict, out_root: str, stages=None) -> dict:
+    """데이터셋 1개에 대해 전체 파이프라인을 수행하고 요약 dict를 반환합니다."""
+    stages = stages or STAGES
+
+    path = job["path"]
+    sheet = job.get("sheet", 0)
+    y_col = job["y"]
+    x_cols = list(job["x"])
+    clean = job.get("clean", "drop")
+    outliers = job.get("outliers", "none")
+
+    name = job.get("name") or _output_name(path, sheet)
+    out_dir = os.path.join(out_root, name)
+    os.makedirs(out_dir, exist_ok=True)
+
+    summary = {"dataset": path, "sheet": sheet, "y": y_col, "x": x_cols, "clean": clean, "outliers": outliers,
+               "status": "ok", "timings": {}, "load_timings": {}}
+    timings = summary["timings"]
+    stage = "로드"
+    try:
+        # 1) 로드 (+ 값 정규화)
+        t0 = time.perf_counter()
+        with open(path, "rb") as f:
+            df = read_table(f, sheet, summary["load_timings"])
+        df.columns = df.columns.astype(str).str.strip()
+        timings[stage] = time.perf_counter() - t0
+        summary["shape"] = list(df.shape)
+
+        # 2) 컬럼 타입 분석
+        stage = "타입 분석"
+        t0 = time.perf_counter()
+        _, numeric_columns, categorical_columns, date_columns, datelike_columns, empty_columns = analyze_column_types(df)
+        timings[stage] = time.perf_counter() - t0
+        summary["column_types"] = {
+            "numeric": numeric_columns, "categorical": categorical_columns,
+            "date": date_columns, "datelike": datelike_columns, "empty": empty_columns,
+        }
+
+        missing = [c for c in [y_col] + x_cols if c not in df.columns]
+        if missing:
+            raise KeyError(f"데이터에 없는 열: {', '.join(missing)}")
+        if y_col not in numeric_columns:
+            raise ValueError(f"Y 변수는 수치형이어야 합니다: {y_col}")
+
+        # 3) 변수 선택 + 결측 처리
+        stage = "결측 처리"
+        t0 = time.perf_counter()
+        df_subset = df[[y_col] + x_cols].copy()
+        df_ready = clean_dataframe(df_subset, CLEAN_METHODS[clean])
+        timings[stage] = time.perf_counter() - t0
+        summary["rows_ready"] = int(len(df_ready))
+
+        # 3-1) 이상치 점검 (선택, Y와 수치형 X)
+        if outliers != "none":
+            stage = "이상치 점검"
+            t0 = time.perf_counter()
+            numeric = outlier_screen.numeric_columns(df_ready)
+            settings = {
+                "method": outliers,
+                "k": job.get("outlier_k") or outlier_screen.DEFAULT_K[outliers],
+                "action": job.get("outlier_action", "drop"),
+                "columns": [c for c in [y_col] + x_cols if c in numeric],
+            }
+            df_ready, report = outlier_screen.apply_screen(df_ready, settings)
+            timings[stage] = time.perf_counter() - t0
+            summary["outlier_screen"] = {
+                **settings,
+                "rows_flagged": report["rows_flagged"],
+                "bounds": _records(report["table"].rename_axis("column").reset_index()),
+            }
+            summary["rows_ready"] = int(len(df_ready))
+        if len(df_ready) == 0:
+            raise ValueError("결측 처리 후 남은 행이 없습니다.")
+
+        # 4) 분석 단계
+        for key, label, fn, args in [
+            ("corr", "상관 분석", _run_correlations, (df_ready, out_dir)),
+            ("linear", "선형회귀", _run_linear, (df_ready, y_col, x_cols)),
+            ("ml", "머신러닝", _run_ml, (df_ready, y_col, x_cols, out_dir)),
+            ("variable", "변수 점검", _run_variable_check, (df_ready, y_col, x_cols)),
+        ]:
+            if key not in stages:
+                continue
+            stage = label
+            t0 = time.perf_counter()
+            summary[key] = fn(*args)
+            timings[stage] = time.perf_counter() - t0
+    except Exception as e:
+        summary["status"] = "failed"
+        summary["error"] = f"[{stage}] {type(e).__name__}: {e}"
+        summary["traceback"] = traceback.format_exc()
+
+    summary["total_seconds"] = sum(timings.values())
+    with open(os.path.join(out_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2, default=_to_jsonable)
+    summary["out_dir"] = out_dir
+    return summary
+
+
+# -------------------------------
+# CLI
+# -------------------------------
+def _format_timings(summary: dict) -> str:
+    parts = [f"{k} {v:.2f}s" for k, v in summary["timings"].items()]
+    return " | ".join(parts) + f" | 합계 {summary['total_seconds']:.2f}s"
+
+
+def _print_result(summary: dict):
+    mark = "✅" if summary["status"] == "ok" else "❌"
+    print(f"{mark} {summary['dataset']}: {_format_timings(summary)}")
+    if summary["status"] != "ok":
+        print(f"   {summary['error']}")
+
+
+def _build_jobs(args) -> list:
+    if args.spec:
+        with open(args.spec, encoding="utf-8") as f:
+            jobs = json.load(f)
+        for job in jobs:
+            job.setdefault("sheet", args.sheet)
+            job.setdefault("clean", args.clean)
+            job.setdefault("outliers", args.outliers)
+            job.setdefault("outlier_k", args.outlier_k)
+            job.setdefault("outlier_action", args.outlier_action)
+        return jobs
+    if not args.y or not args.x:
+        raise SystemExit("--spec 를 쓰지 않으면 --y 와 --x 가 필요합니다.")
+    return [{"path": p, "y": args.y, "x": args.x, "sheet": args.sheet, "clean": args.clean, "outliers": args.outliers,
+             "outlier_k": args.outlier_k, "outlier_action": args.outlier_action} for p in args.datasets]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="상관/회귀/머신러닝 분석 파이프라인 배치 실행")
+    parser.add_argument("datasets", nargs="*", help="CSV/XLSX 파일 경로")
+    parser.add_argument("--spec", help="데이터셋별 Y/X 지정 JSON 파일")
+    parser.add_argument("--y", help="Y(목표) 변수명")
+    parser.add_argument("--x", nargs="+", help="X(설명) 변수명 목록")
+    parser.add_argument("--sheet", default=0, help="엑셀 시트 이름 또는 번호 (기본: 첫 시트)")
+    parser.add_argument("--clean", choices=list(CLEAN_METHODS), default="drop",
+                        help="결측 처리: drop=행 삭제, mean=평균값 대체, none=처리 안 함")
+    parser.add_argument("--outliers", choices=["none"] + list(outlier_screen.METHODS), default="none",
+                        help="이상치 점검 경계: none=점검 안 함, mad=중앙값±k·MAD, iqr=Q1/Q3±k·IQR")
+    parser.add_argument("--outlier-k", type=float, help="이상치 경계 배수 (기본: mad 3.5, iqr 1.5)")
+    parser.add_argument("--outlier-action", choices=list(outlier_screen.ACTIONS), default="drop",
+                        help="이상치 처리: drop=행 제외, clip=경계값으로 자르기, flag=개수만 기록")
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help=f"실행할 분석 단계 (쉼표 구분, 기본: {','.join(STAGES)})")
+    parser.add_argument("--out", default="batch_results", help="결과 저장 폴더")
+    parser.add_argument("--jobs", type=int, default=1, help="동시에 처리할 데이터셋 수 (워커 프로세스 수)")
+    args = parser.parse_args(argv)
+
+    if isinstance(args.sheet, str) and args.sheet.isdigit():
+        args.sheet = int(args.sheet)
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        parser.error(f"알 수 없는 단계: {', '.join(unknown)}")
+
+    jobs = _build_jobs(args)
+    if not jobs:
+        parser.error("처리할 데이터셋이 없습니다.")
+    try:
+        _assign_output_names(jobs)
+    except ValueError as e:
+        parser.error(str(e))
+    os.makedirs(args.out, exist_ok=True)
+
+    started = time.perf_counter()
+    summaries = []
+    if args.jobs > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(args.jobs, len(jobs))) as executor:
+            futures = [executor.submit(run_pipeline, job, args.out, stages) for job in jobs]
+            for future in as_completed(futures):
+                summary = future.result()
+                summaries.append(summary)
+                _print_result(summary)
+    else:
+        for job in jobs:
+            summary = run_pipeline(job, args.out, stages)
+            summaries.append(summary)
+            _print_result(summary)
+
+    failed = [s for s in summaries if s["status"] != "ok"]
+    index = {
+        "elapsed_seconds": time.perf_counter() - started,
+        "datasets": [
+            {k: s.get(k) for k in ("dataset", "sheet", "status", "error", "out_dir", "timings", "total_seconds")}
+            for s in summaries
+        ],
+    }
+    with open(os.path.join(args.out, "batch_summary.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=2, default=_to_jsonable)
+
+    print(f"완료: {len(summaries) - len(failed)}/{len(summaries)}개 성공, 총 {index['elapsed_seconds']:.2f}s → {args.out}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import session_cache
+
+# ==============================
+# 범주 인덱스 (범주형 X의 범주별 행 위치를 데이터셋당 한 번만 계산)
+# ==============================
+# 필터를 적용할 때마다 열마다 isin()을 다시 돌리거나, 매 실행마다 sorted(unique())를 부르지 않도록
+# 범주형 열마다 (정렬된 범주 값, 범주 코드, 범주별 행 수, 범주별 행 위치)를 미리 만들어 둡니다.
+# - 선택 조합 = 변수별로 고른 범주들의 위치 합집합 → 변수 간 교집합
+#   (가장 적은 변수의 합집합에서 시작해 나머지 변수는 코드 배열로 걸러냄)
+# - 범주 값은 str()로 비교합니다. (applied_filter_spec과 같은 형식)
+
+
+@session_cache.memoize("filter")
+def column_index(col: pd.Series) -> dict:
+    """열 하나의 범주 인덱스. 같은 열 데이터면 세션 캐시에서 재사용."""
+    codes, uniques = pd.factorize(col, sort=True)
+    codes = codes.astype(np.int32, copy=False)
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+
+    # 코드 순 안정 정렬 → 범주별로 잘라 행 위치(오름차순) 목록으로 (결측 -1은 맨 앞이라 제외)
+    order = np.argsort(codes, kind="stable").astype(np.int32, copy=False)
+    order = order[len(order) - int(counts.sum()):]
+    positions = np.split(order, np.cumsum(counts)[:-1]) if len(uniques) else []
+
+    values = list(uniques)
+    return {
+        "values": values,
+        "labels": [str(v) for v in values],
+        "codes": codes,
+        "counts": counts,
+        "positions": positions,
+    }
+
+
+def build_category_index(df: pd.DataFrame, columns) -> dict:
+    """{열 이름: {"values", "labels", "codes", "counts", "positions"}}. 열별로 캐시되므로 열 조합이 달라도 재사용."""
+    return {col: column_index(df[col]) for col in columns}
+
+
+def option_counts(index: dict, column) -> dict:
+    """{범주 값: 행 수} (필터 선택지 옆 개수 표시용)."""
+    entry = index[column]
+    return dict(zip(entry["values"], entry["counts"].tolist()))
+
+
+def _selected_codes(entry: dict, labels) -> np.ndarray:
+    wanted = set(map(str, labels))
+    return np.array([i for i, label in enumerate(entry["labels"]) if label in wanted], dtype=np.int32)
+
+
+def select_positions(index: dict, spec: dict) -> np.ndarray:
+    """
+    필터 조건 {열: [범주 문자열, ...]}에 맞는 행 위치 (오름차순 int32).
+    spec의 열은 모두 index에 있어야 합니다. 조건이 비어 있으면 None (전체).
+    """
+    spec = {col: vals for col, vals in (spec or {}).items() if vals}
+    if not spec:
+        return None
+
+    selected = {col: _selected_codes(index[col], vals) for col, vals in spec.items()}
+    # 선택 행 수가 가장 적은 변수부터 시작
+    order = sorted(spec, key=lambda col: int(index[col]["counts"][selected[col]].sum()))
+
+    first = index[order[0]]
+    parts = [first["positions"][code] for code in selected[order[0]]]
+    if not parts:
+        return np.empty(0, dtype=np.int32)
+    candidates = parts[0] if len(parts) == 1 else np.sort(np.concatenate(parts))
+
+    for col in order[1:]:
+        if candidates.size == 0:
+            break
+        candidates = candidates[np.isin(index[col]["codes"][candidates], selected[col])]
+    return candidates
@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+import weakref
+import pandas as pd
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+from upload_cache import read_parquet
+
+# ==============================
+# 열 단위 저장소 (Parquet) – 열이 많은 파일은 선택된 열만 메모리에 올림
+# ==============================
+
+# 열 수가 이 값 이상이면 세션에 전체 DataFrame 대신 ColumnStore를 보관
+PROJECTION_MIN_COLUMNS = int(os.environ.get("ANALYZER_PROJECTION_MIN_COLUMNS", "500"))
+
+
+class ColumnStore:
+    """Parquet 파일 위의 읽기 전용 데이터셋.
+    store[cols] 로 필요한 열만 DataFrame으로 읽고, shape/columns 는 파일 메타데이터로 제공합니다."""
+
+    def __init__(self, path: str, dtypes: dict = None):
+        # 원본(업로드 캐시)이 LRU로 지워져도 세션 동안 읽을 수 있도록 하드링크로 고정
+        self._dir = tempfile.mkdtemp(prefix="analyzer_cols_")
+        self.path = os.path.join(self._dir, "data.parquet")
+        try:
+            os.link(path, self.path)
+        except OSError:
+            shutil.copyfile(path, self.path)
+        self._finalizer = weakref.finalize(self, shutil.rmtree, self._dir, True)
+
+        schema = pq.read_schema(self.path)
+        pandas_meta = schema.pandas_metadata or {}
+        index_fields = {c for c in pandas_meta.get("index_columns", []) if isinstance(c, str)}
+        self.columns = pd.Index([c["name"] for c in pandas_meta.get("columns", [])
+                                 if c["field_name"] not in index_fields])
+        self.shape = (pq.read_metadata(self.path).num_rows, len(self.columns))
+        # 읽은 뒤 적용할 dtype (compact_dtypes 결과 등)
+        self.dtypes = dict(dtypes or {})
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __contains__(self, col):
+        return col in self.columns
+
+    def __getitem__(self, cols):
+        if isinstance(cols, str):
+            return self[[cols]].iloc[:, 0]
+        cols = list(cols)
+        missing = [c for c in cols if c not in self.columns]
+        if missing:
+            raise KeyError(f"{missing} not in columns")
+        df = read_parquet(self.path, columns=cols)
+        for col in cols:
+            if col in self.dtypes:
+                df[col] = df[col].astype(self.dtypes[col])
+        return df[cols]
+
+    def to_frame(self) -> pd.DataFrame:
+        """전체 열을 읽습니다. (미리보기 등 꼭 필요한 경우에만)"""
+        return self[self.columns]
+
+    def close(self):
+        self._finalizer()
+
+
+def open_projected(df: pd.DataFrame, parquet_path: str, dtypes: dict = None):
+    """열이 충분히 많고 같은 내용의 Parquet 파일이 있으면 ColumnStore를, 아니면 None을 반환합니다."""
+    if pq is None or parquet_path is None or df.shape[1] < PROJECTION_MIN_COLUMNS:
+        return None
+    store = ColumnStore(parquet_path, dtypes)
+    if store.shape != df.shape:
+        store.close()
+        return None
+    return store
@@ -0,0 +1,136 @@
+import os
+import json
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import session_cache
+import category_index
+
+# ==============================
+# 범주 필터 레지스트리 (필터별 DataFrame 복사본 대신 df_ready 위의 행 선택만 보관)
+# ==============================
+# "🚀 분석 시작"을 누를 때마다 filtered_df 전체 복사본을 세션에 쌓으면
+# 필터 조합 10개를 둘러본 사용자는 데이터 10벌을 들고 있게 됩니다.
+# 여기서는 (세션 ID, df_ready 시그니처, 필터 조건)별로 행 선택만 압축해 보관합니다.
+# - 행 선택은 category_index의 범주별 행 위치 교집합으로 계산
+# - 형식: 선택 행이 적으면 행 위치(int32/int64), 많으면 불리언 비트맵(np.packbits) 중 작은 쪽
+# - 전체 크기가 상한을 넘으면 가장 오래 사용하지 않은 항목부터 삭제 (LRU), 삭제된 조건은 다시 선택 시 재계산
+# - 실제 DataFrame은 세션마다 현재 필터 하나만 만들어 둠 (같은 조건이면 같은 객체 → 지문 메모·분석 캐시 적중)
+
+MAX_FILTER_BYTES = int(float(os.environ.get("ANALYZER_FILTER_REGISTRY_MAX_MB", "64")) * 1024 * 1024)
+
+_lock = threading.RLock()
+_entries = OrderedDict()   # (namespace, spec_key) -> {"kind", "data", "n_rows", "selected", "bytes"}  ※ 순서 = 최근 사용 순
+_views = {}                # 세션 ID -> (namespace, spec_key, filtered_df)
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def spec_key(spec: dict) -> str:
+    """필터 조건 {변수: [범주 문자열, ...]}의 정규화된 키. 빈 조건은 '{}' (전체)."""
+    spec = {str(var): sorted(map(str, vals)) for var, vals in (spec or {}).items() if vals}
+    return json.dumps(spec, ensure_ascii=False, sort_keys=True)
+
+
+def _row_positions(df: pd.DataFrame, spec: dict) -> np.ndarray:
+    """조건에 맞는 행 위치. 범주 값은 str()로 비교합니다. (applied_filter_spec과 같은 형식)"""
+    index = category_index.build_category_index(df, list(spec))
+    return category_index.select_positions(index, spec)
+
+
+def _compact(positions: np.ndarray, n_rows: int) -> dict:
+    """비트맵과 행 위치 중 작은 쪽으로 압축."""
+    selected = len(positions)
+    position_dtype = np.int32 if n_rows < 2 ** 31 else np.int64
+    if selected * np.dtype(position_dtype).itemsize < (n_rows + 7) // 8:
+        data = np.asarray(positions, dtype=position_dtype)
+        kind = "positions"
+    else:
+        mask = np.zeros(n_rows, dtype=bool)
+        mask[positions] = True
+        data = np.packbits(mask)
+        kind = "bitmap"
+    return {"kind": kind, "data": data, "n_rows": n_rows, "selected": selected, "bytes": int(data.nbytes)}
+
+
+def _positions(entry: dict) -> np.ndarray:
+    if entry["kind"] == "positions":
+        return entry["data"]
+    mask = np.unpackbits(entry["data"], count=entry["n_rows"]).astype(bool)
+    return np.flatnonzero(mask)
+
+
+def _evict(max_bytes: int):
+    total = sum(e["bytes"] for e in _entries.values())
+    while total > max_bytes and len(_entries) > 1:
+        _, entry = _entries.popitem(last=False)
+        total -= entry["bytes"]
+        _stats["evictions"] += 1
+
+
+def _lookup(df: pd.DataFrame, namespace, key: str) -> dict:
+    entry_key = (namespace, key)
+    with _lock:
+        entry = _entries.get(entry_key)
+        if entry is not None and entry["n_rows"] == len(df):
+            _entries.move_to_end(entry_key)
+            _stats["hits"] += 1
+            return entry
+        _stats["misses"] += 1
+
+    entry = _compact(_row_positions(df, json.loads(key)), len(df))
+    with _lock:
+        _entries[entry_key] = entry
+        _entries.move_to_end(entry_key)
+        _evict(MAX_FILTER_BYTES)
+    return entry
+
+
+def filtered_view(df: pd.DataFrame, spec: dict) -> pd.DataFrame:
+    """
+    df(df_ready)에 필터 조건을 적용한 DataFrame.
+    - 조건이 비어 있으면 df 그대로 (복사 없음)
+    - 이전에 쓴 조건이면 보관된 행 선택을 재사용하고, 현재 조건과 같으면 이미 만든 객체를 돌려줌
+    """
+    key = spec_key(spec)
+    if key == "{}":
+        return df
+    namespace = session_cache.current_namespace()
+    sid = namespace[0]
+    with _lock:
+        view = _views.get(sid)
+        if view is not None and view[0] == namespace and view[1] == key:
+            if (namespace, key) in _entries:
+                _entries.move_to_end((namespace, key))
+            _stats["hits"] += 1
+            return view[2]
+
+    entry = _lookup(df, namespace, key)
+    filtered = df.iloc[_positions(entry)]
+    with _lock:
+        _views[sid] = (namespace, key, filtered)
+    return filtered
+
+
+def clear_session(session: str = None) -> int:
+    """세션의 필터 항목과 현재 필터 DataFrame을 비웁니다. 지운 항목 수를 반환."""
+    session = session or session_cache.session_id()
+    with _lock:
+        targets = [k for k in _entries if k[0][0] == session]
+        for entry_key in targets:
+            del _entries[entry_key]
+        _views.pop(session, None)
+    return len(targets)
+
+
+def registry_stats(session: str = None) -> dict:
+    """필터 항목 수/크기(압축)/적중 통계. session을 주면 항목 수·크기는 해당 세션만."""
+    with _lock:
+        entries = [e for k, e in _entries.items() if session is None or k[0][0] == session]
+        return {
+            "entries": len(entries),
+            "bytes": sum(e["bytes"] for e in entries),
+            "bitmaps": sum(e["kind"] == "bitmap" for e in entries),
+            "max_bytes": MAX_FILTER_BYTES,
+            **_stats,
+        }
@@ -0,0 +1,214 @@
+import weakref
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+
+try:
+    import xxhash
+except ImportError:  # pragma: no cover - 선택 의존성
+    xxhash = None
+
+# ==============================
+# 데이터셋 지문 (캐시 키용 빠른 해시)
+# ==============================
+# hash_pandas_object(...).sum() 처럼 모든 셀을 파이썬 해시 경로로 돌리지 않고
+# 열 버퍼(수치·불리언·날짜형은 원시 바이트, 그 외는 벡터화된 값 해시)를 한 번에 해시합니다.
+# - 해시: xxhash(xxh3_128)가 있으면 사용, 없으면 hashlib.blake2b
+# - 열 단위 메모: 같은 열 버퍼는 다시 해시하지 않음. 적중할 때 균등 간격 표본 값을 다시 비교해 제자리에서
+#   바뀐 열은 다시 해시 (표본 밖 셀만 바꿨을 수 있으므로 값을 제자리에서 바꾸는 곳은 forget() 호출)
+# - 표본 모드: 큰 데이터에서 균등 간격 행만 해시 (키가 's'로 시작, 전체 지문과 섞이지 않음)
+# - 증분: 행이 뒤에 추가된 경우 기존 상태에 새 행만 이어서 해시 (FrameFingerprint.extend)
+
+SAMPLE_ROWS = 65536
+# 메모 적중 시 다시 비교하는 표본 값 수
+_CHECK_SAMPLES = 64
+_INDEX_KEY = "\x00index"
+
+_memo = {}            # 버퍼 키 -> (소유 배열 weakref, 다이제스트, 표본 바이트) / RangeIndex 키 -> 다이제스트
+_range_memo = []      # RangeIndex 메모 키 (오래된 것부터 제거)
+_memo_lock = threading.Lock()
+
+
+def _new_hasher():
+    if xxhash is not None:
+        return xxhash.xxh3_128()
+    return hashlib.blake2b(digest_size=16)
+
+
+def _column_bytes(values) -> memoryview:
+    """열 값을 해시할 바이트 버퍼로. 수치/불리언/날짜형은 원시 버퍼, 그 외는 값별 uint64 해시."""
+    if isinstance(values, np.ndarray) and values.dtype.kind in "biufcmM":
+        return memoryview(np.ascontiguousarray(values)).cast("B")
+    hashed = pd.util.hash_array(np.asarray(values, dtype=object)) if isinstance(values, np.ndarray) \
+        else pd.util.hash_pandas_object(pd.Series(values), index=False).to_numpy()
+    return memoryview(np.ascontiguousarray(hashed)).cast("B")
+
+
+def _values(obj):
+    """Series/Index의 값 배열 (numpy 기반이면 ndarray, 확장 타입이면 ExtensionArray)."""
+    values = obj.array
+    # NumpyExtensionArray.to_numpy()는 결측 검사를 거치므로 버퍼를 그대로 꺼냄
+    return np.asarray(values) if isinstance(values, pd.arrays.NumpyExtensionArray) else values
+
+
+def _memo_owner(values):
+    """메모 키로 쓸 (소유 객체, 키). numpy 열은 블록 버퍼를 소유한 배열 기준 (Series 객체는 매번 새로 생김)."""
+    if isinstance(values, np.ndarray):
+        owner = values
+        while isinstance(owner.base, np.ndarray):
+            owner = owner.base
+        return owner, (id(owner), values.__array_interface__["data"][0], values.shape, values.strides, values.dtype.str)
+    return values, (id(values), len(values), str(values.dtype))
+
+
+def _spot_check(values) -> bytes:
+    """제자리 변경 확인용 표본 바이트 (균등 간격 최대 _CHECK_SAMPLES개, 처음·끝 포함)."""
+    n = len(values)
+    if n == 0:
+        return b""
+    positions = np.unique(np.linspace(0, n - 1, min(n, _CHECK_SAMPLES)).astype(np.int64))
+    return bytes(_column_bytes(values[positions]))
+
+
+def _forget_later(key):
+    with _memo_lock:
+        _memo.pop(key, None)
+
+
+def _range_digest(index: pd.RangeIndex) -> str:
+    key = ("range", index.start, index.stop, index.step)
+    with _memo_lock:
+        hit = _memo.get(key)
+    if hit is None:
+        h = _new_hasher()
+        h.update(_column_bytes(index.to_numpy()))
+        hit = h.hexdigest()
+        with _memo_lock:
+            if len(_range_memo) >= 64:
+                _memo.pop(_range_memo.pop(0), None)
+            _range_memo.append(key)
+            _memo[key] = hit
+    return hit
+
+
+def column_digest(obj) -> str:
+    """열(Series) 또는 인덱스 하나의 지문. 같은 버퍼는 표본 값이 그대로일 때 메모된 값을 재사용."""
+    if isinstance(obj, pd.RangeIndex):
+        return _range_digest(obj)
+    values = _values(obj)
+    owner, key = _memo_owner(values)
+    check = _spot_check(values)
+    with _memo_lock:
+        hit = _memo.get(key)
+        if hit is not None and hit[0]() is owner and hit[2] == check:
+            return hit[1]
+
+    h = _new_hasher()
+    h.update(_column_bytes(values))
+    digest = h.hexdigest()
+
+    with _memo_lock:
+        try:
+            ref = weakref.ref(owner, lambda _, key=key: _forget_later(key))
+        except TypeError:
+            return digest
+        _memo[key] = (ref, digest, check)
+    return digest
+
+
+def forget(df) -> None:
+    """값을 제자리에서 바꾼 경우 해당 열/인덱스의 메모를 버립니다."""
+    objs = [df] if isinstance(df, pd.Series) else [df.iloc[:, i] for i in range(df.shape[1])]
+    with _memo_lock:
+        for obj in objs + [df.index]:
+            _memo.pop(_memo_owner(_values(obj))[1], None)
+
+
+def _combine(n_rows, columns, dtypes, digests, index_digest, prefix="") -> str:
+    h = _new_hasher()
+    parts = [f"{n_rows}x{len(columns)}"]
+    parts += [f"{name!r}:{dtype}={digest}" for name, dtype, digest in zip(columns, dtypes, digests)]
+    parts.append(f"{_INDEX_KEY}={index_digest}")
+    for part in parts:
+        h.update(part.encode("utf-8") + b"\x00")
+    return prefix + h.hexdigest()
+
+
+def fingerprint(df, sample: bool = False, sample_rows: int = SAMPLE_ROWS) -> str:
+    """
+    DataFrame(또는 Series) 지문. 값·열 이름·dtype·인덱스를 모두 반영합니다.
+    - sample=False: 전체 값 (열 단위 메모, FrameFingerprint와 같은 값)
+    - sample=True: 행이 sample_rows보다 많으면 균등 간격 표본만 해시 (빠르지만 근사, 's' 접두)
+    """
+    if isinstance(df, pd.Series):
+        df = df.to_frame()
+    dtypes = [str(t) for t in df.dtypes]
+
+    if sample and len(df) > sample_rows:
+        positions = np.linspace(0, len(df) - 1, sample_rows).astype(np.int64)
+        sampled = df.iloc[positions]
+        digests = []
+        for i in range(sampled.shape[1]):
+            h = _new_hasher()
+            h.update(_column_bytes(_values(sampled.iloc[:, i])))
+            digests.append(h.hexdigest())
+        h = _new_hasher()
+        h.update(_column_bytes(_values(sampled.index)))
+        return _combine(len(df), list(df.columns), dtypes, digests, h.hexdigest(), prefix="s")
+
+    digests = [column_digest(df.iloc[:, i]) for i in range(df.shape[1])]
+    return _combine(len(df), list(df.columns), dtypes, digests, column_digest(df.index))
+
+
+# -------------------------------
+# 증분 지문 (행 추가)
+# -------------------------------
+class FrameFingerprint:
+    """열별 해시 상태를 들고 있어 뒤에 추가된 행만 이어서 해시할 수 있는 지문."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.columns = list(df.columns)
+        self.dtypes = [str(t) for t in df.dtypes]
+        self.n_rows = len(df)
+        self._states = []
+        for i in range(df.shape[1]):
+            h = _new_hasher()
+            h.update(_column_bytes(_values(df.iloc[:, i])))
+            self._states.append(h)
+        self._index_state = _new_hasher()
+        self._index_state.update(_column_bytes(_values(df.index)))
+
+    def extend(self, new_rows: pd.DataFrame) -> "FrameFingerprint":
+        """새 행을 반영한 지문을 돌려줍니다. (원래 객체는 그대로) 열/dtype이 다르면 ValueError."""
+        if list(new_rows.columns) != self.columns or [str(t) for t in new_rows.dtypes] != self.dtypes:
+            raise ValueError("추가된 행의 열 구성 또는 dtype이 기존 데이터와 다릅니다.")
+        out = object.__new__(FrameFingerprint)
+        out.columns = self.columns
+        out.dtypes = self.dtypes
+        out.n_rows = self.n_rows + len(new_rows)
+        out._states = []
+        for i, state in enumerate(self._states):
+            h = state.copy()
+            h.update(_column_bytes(_values(new_rows.iloc[:, i])))
+            out._states.append(h)
+        out._index_state = self._index_state.copy()
+        out._index_state.update(_column_bytes(_values(new_rows.index)))
+        return out
+
+    def hexdigest(self) -> str:
+        """fingerprint(df)와 같은 값."""
+        return _combine(self.n_rows, self.columns, self.dtypes,
+                        [state.hexdigest() for state in self._states], self._index_state.hexdigest())
+
+
+def extend_or_rebuild(state, full_df: pd.DataFrame, new_rows: pd.DataFrame):
+    """state가 있고 열 구성이 같으면 증분, 아니면 full_df로 새로 만든 (state, 지문)."""
+    if state is not None:
+        try:
+            state = state.extend(new_rows)
+            return state, state.hexdigest()
+        except ValueError:
+            pass
+    state = FrameFingerprint(full_df)
+    return state, state.hexdigest()
@@ -7,16 +7,28 @@ import pandas as pd
 import cProfile
 import pstats
 import os
+import time
 
 # 커스텀 모듈 import with error handling
 try:
-    from step1_load import load_data, analyze_column_types, display_data_info, display_data_preview, get_emoji_for_type
+    from step1_load import load_data, load_appended_rows, list_excel_sheets, analyze_column_types, compact_dtypes, display_data_info, display_data_preview, get_emoji_for_type
     from step2_select import variable_selection_ui
-    from step3_clean import data_cleaner
+    from step3_clean import data_cleaner, clean_dataframe, apply_imputation, apply_outlier_screen, outlier_screener, outlier_status
     from step4_eda import perform_eda_analysis
     from step5_1_linear_regression import perform_linear_regression
     from step5_2_machine_learning import perform_ml_analysis_and_simulator
     from step5_3_variable_feedback import perform_variable_check
+    from step5_4_category_batch import perform_category_batch_analysis
+    import upload_cache
+    import session_cache
+    import result_store
+    import filter_registry
+    import category_index
+    import job_runner
+    import imputation
+    from fingerprint import FrameFingerprint, extend_or_rebuild, forget as forget_fingerprint
+    from column_store import ColumnStore, open_projected
+    from incremental_stats import IncrementalProfile
 
 except Exception as e:
     import sys, traceback
@@ -24,11 +36,32 @@ except Exception as e:
     st.error(f"모듈 가져오기 실패:\n{tb}")
     sys.exit(1)
 
-# step 완료 시점에 시그니처 저장
-def _df_signature(df: pd.DataFrame, cols=None) -> str:
-    if cols:
-        df = df[cols]
-    return str(pd.util.hash_pandas_object(df, index=True).sum())
+# step 완료 시점에 df_ready와 지문(캐시 키) 저장
+def _set_df_ready(df_ready: pd.DataFrame, new_rows: pd.DataFrame = None):
+    """new_rows가 있으면 기존 지문 상태에 추가된 행만 이어서 해시합니다."""
+    # 추가(append)·이상치 자르기(clip) 경로에서 열 버퍼를 제자리에서 고쳤을 수 있으므로 열 메모를 버림
+    forget_fingerprint(df_ready)
+    if new_rows is None:
+        state = FrameFingerprint(df_ready)
+        signature = state.hexdigest()
+    else:
+        state, signature = extend_or_rebuild(st.session_state.get("df_ready_fp"), df_ready, new_rows)
+    st.session_state.df_ready = df_ready
+    st.session_state.df_ready_fp = state
+    st.session_state.df_ready_sig = signature
+
+
+def _set_cleaned(df_cleaned: pd.DataFrame, new_rows: pd.DataFrame = None):
+    """결측 처리 결과 저장. 이상치 점검 설정이 있으면 결과를 df_cleaned에 두고 점검을 적용한 것을 df_ready로."""
+    settings = st.session_state.get("outlier_settings")
+    if not settings:
+        st.session_state.pop("df_cleaned", None)
+        st.session_state.pop("outlier_report", None)
+        _set_df_ready(df_cleaned, new_rows)
+        return
+    st.session_state.df_cleaned = df_cleaned
+    df_ready, st.session_state.outlier_report = apply_outlier_screen(df_cleaned, settings)
+    _set_df_ready(df_ready)
 
 
 # 코드 소요 시간 분석 프로파일링
@@ -75,10 +108,15 @@ def panel(title: str, section_id: str = None, small_title: bool = False, collaps
     
     Parameters:
     - collapsible: True일 때 Expander 형태로 동작하여 제목을 클릭하여 펼칠 수 있습니다.
+      펼치거나 접을 때 다시 실행되므로, 상세 내용은 panel_open()이 True일 때만 그리면 됩니다.
     """
     if collapsible:
-        # 접혀있는 expander 사용
-        exp = st.expander(title, expanded=False)
+        # 접혀있는 expander 사용 (펼친 상태는 세션에 유지)
+        try:
+            exp = st.expander(title, expanded=False, key=f"panel-open-{section_id or title}", on_change="rerun")
+        except TypeError:
+            # 펼침 상태를 알 수 없는 Streamlit 버전: 요약만 표시
+            exp = st.expander(title, expanded=False)
         with exp:
             if section_id:
                 st.markdown(f"<div id='{section_id}'></div>", unsafe_allow_html=True)
@@ -101,34 +139,81 @@ def panel(title: str, section_id: str = None, small_title: bool = False, collaps
         return c
 
 
+def panel_open(container) -> bool:
+    """collapsible panel()이 펼쳐져 있는지. (접힌 패널은 요약만 그리고 상세 계산은 건너뜀)"""
+    return bool(getattr(container, "open", False))
+
+
+_JOB_STEP_ICONS = {"pending": "⏸️", "running": "⏳", "done": "✅", "error": "⚠️", "cancelled": "⛔"}
+
+
+@st.fragment(run_every=1.0)
+def render_background_job(job_key: str):
+    """백그라운드 작업 진행 상황 (1초마다 이 부분만 갱신). 작업이 끝나면 전체를 다시 실행해 결과를 그립니다."""
+    job = job_runner.get(job_key)
+    if job is None or job.status == "done":
+        st.rerun()
+
+    with st.container(border=True):
+        st.markdown(f"#### ⚙️ {job.title} (백그라운드 실행 중)")
+        st.caption("데이터가 커서 분석을 백그라운드에서 계산합니다. 화면을 계속 사용하거나 새로고침해도 계산은 이어지며, 끝나면 결과가 자동으로 표시됩니다.")
+        elapsed = time.time() - (job.started or job.created)
+        text = f"{job.current_step or '대기 중'} · {job.progress:.0%} · {elapsed:.0f}초 경과"
+        st.progress(job.progress, text=text)
+        st.markdown("  \n".join(
+            f"{_JOB_STEP_ICONS[step['status']]} {step['label']}"
+            + (f" ({step['seconds']:.1f}초)" if step["seconds"] is not None else "")
+            for step in job.steps
+        ))
+
+        if job.status == "cancelled":
+            st.warning("분석이 취소되었습니다. 완료된 단계의 결과는 저장되어 있어, 다시 실행하면 남은 단계만 계산합니다.")
+            if st.button("🔄 남은 단계 다시 실행", key="job_resume", type="primary"):
+                job_runner.forget(job_key)
+                st.rerun()
+        elif st.button("⛔ 분석 취소", key="job_cancel", help="현재 계산 중인 단계가 끝나면 나머지 단계를 건너뜁니다."):
+            job.cancel()
+
+
 # ==============================
 # 기존 내용을 보존하기 위한 렌더링 함수
 # ==============================
-@st.cache_data(show_spinner=False)
 def render_upload_section(show_full: bool = True): #Step1_load.py 참고
-    with panel("1단계: 파일 업로드 (완료)", "section-upload", collapsible=not show_full):
+    section = panel("1단계: 파일 업로드 (완료)", "section-upload", collapsible=not show_full)
+    with section:
         st.success("✅ 파일이 성공적으로 업로드되었습니다.")
-        if show_full and "df" in st.session_state:
+        if not (show_full or panel_open(section)):
+            # 접힌 상태: 파일 이름과 크기만
+            if "df" in st.session_state:
+                n_rows, n_cols = st.session_state.df.shape
+                st.caption(f"📄 {st.session_state.get('filename', '알 수 없음')} · {n_rows:,}행 × {n_cols}열")
+        elif "df" in st.session_state:
             display_data_info(st.session_state.df,
                               st.session_state.get("numeric_columns", []),
                               st.session_state.get("categorical_columns", []),
                               st.session_state.get("date_columns", []),
                               st.session_state.get("datelike_columns", []),
-                              st.session_state.get("filename", "알 수 없음"))
+                              st.session_state.get("empty_columns", []),
+                              st.session_state.get("filename", "알 수 없음"),
+                              memory_report=st.session_state.get("memory_report"),
+                              missing_mask=st.session_state.get("missing_mask"))
             st.subheader("데이터 미리보기")
-            display_data_preview(st.session_state.df)
+            df_full = st.session_state.df
+            if isinstance(df_full, ColumnStore):
+                df_full = df_full.to_frame()
+            display_data_preview(df_full)
 
-@st.cache_data(show_spinner=False)
 def render_select_section(show_full: bool = True): #Step2_select.py 참고
     """변수군 선택 섹션을 요약/상세 형태로 다시 렌더링."""
-    with panel("2단계: 변수군 선택 (완료)", "section-select", collapsible=not show_full):
+    section = panel("2단계: 변수군 선택 (완료)", "section-select", collapsible=not show_full)
+    with section:
         if "y_column" in st.session_state and st.session_state.y_column:
             st.success(f"✅ Y 변수: {st.session_state.y_column}")
         if "x_columns" in st.session_state and st.session_state.x_columns:
             x_count = len(st.session_state.x_columns)
             st.success(f"✅ X 변수({x_count}개): {',  '.join(st.session_state.x_columns)}")
 
-        if show_full and "df_subset" in st.session_state and st.session_state.df_subset is not None:
+        if (show_full or panel_open(section)) and st.session_state.get("df_subset") is not None:
             df_subset = st.session_state.df_subset
             
             st.markdown(f'<h4 style="margin:10px 0;color:#333;">👀 선택된 변수들의 데이터 미리보기</h4>', unsafe_allow_html=True)
@@ -185,12 +270,15 @@ def render_select_section(show_full: bool = True): #Step2_select.py 참고
 
 def render_clean_section(show_full: bool = True): #Step3_clean.py 참고
     """결측치 처리 섹션을 요약/상세 형태로 다시 렌더링."""
-    with panel("3단계: 결측치 처리 (완료)", "section-clean", collapsible=not show_full):
+    section = panel("3단계: 결측치 처리 (완료)", "section-clean", collapsible=not show_full)
+    with section:
         if "cleaning_method" in st.session_state and st.session_state.cleaning_method:
             st.success(f"✅ 처리 방법: {st.session_state.cleaning_method}")
+        if st.session_state.get("outlier_settings") and st.session_state.get("outlier_report"):
+            st.success(f"✅ 이상치 점검: {outlier_status(st.session_state.outlier_settings, st.session_state.outlier_report)}")
         if "df_ready" in st.session_state and st.session_state.df_ready is not None:
             st.success("✅ 처리가 완료되었습니다.")
-            if show_full:
+            if show_full or panel_open(section):
                 st.markdown('<h4 style="margin:10px 0;color:#333;">👀 정리된 데이터 미리보기</h4>', unsafe_allow_html=True)
                 
                 # 결측치 처리 방법에 따라 다른 메시지 표시
@@ -198,6 +286,10 @@ def render_clean_section(show_full: bool = True): #Step3_clean.py 참고
                     st.markdown(f'<p style="margin: 0px 0 6px 0; color: #333; font-size:18px;">데이터 크기: <strong>{st.session_state.df_ready.shape[1]}열</strong> <span style="font-size:15px;">(X변수 {st.session_state.df_ready.shape[1]-1}개 + Y변수 1개)</span> × <strong>{st.session_state.df_ready.shape[0]:,}행&nbsp;&nbsp;</strong> <span style="font-size:15px; color: #333;">(🧹 전체 데이터의 <strong>{((st.session_state.df_subset.shape[0] - st.session_state.df_ready.shape[0]) / st.session_state.df_subset.shape[0] * 100):.1f}% ({st.session_state.df_subset.shape[0] - st.session_state.df_ready.shape[0]:,}개 행)</strong> 이 제거됨.)</span></p>', unsafe_allow_html=True)
                 elif st.session_state.cleaning_method == "평균값 대체":
                     st.markdown(f'<p style="margin: 0px 0 6px 0; color: #333; font-size:18px;">데이터 크기: <strong>{st.session_state.df_ready.shape[1]}열</strong> <span style="font-size:15px;">(X변수 {st.session_state.df_ready.shape[1]-1}개 + Y변수 1개)</span> × <strong>{st.session_state.df_ready.shape[0]:,}행&nbsp;&nbsp;</strong> <span style="font-size:15px; color: #333;">(✅ 수치형 변수에 있던 결측치들이 <strong>평균값</strong>으로 채워짐.)</span></p>', unsafe_allow_html=True)
+                elif st.session_state.cleaning_method == "변수별 대체":
+                    st.markdown(f'<p style="margin: 0px 0 6px 0; color: #333; font-size:18px;">데이터 크기: <strong>{st.session_state.df_ready.shape[1]}열</strong> <span style="font-size:15px;">(X변수 {st.session_state.df_ready.shape[1]-1}개 + Y변수 1개)</span> × <strong>{st.session_state.df_ready.shape[0]:,}행&nbsp;&nbsp;</strong> <span style="font-size:15px; color: #333;">(✅ 결측치가 변수마다 고른 <strong>방법</strong>으로 채워짐.)</span></p>', unsafe_allow_html=True)
+                    if st.session_state.get("imputation_log"):
+                        st.dataframe(imputation.log_table(st.session_state.imputation_log), width='stretch', hide_index=True)
                 else:
                     st.markdown(f'<p style="margin: 0px 0 6px 0; color: #333; font-size:18px;">데이터 크기: <strong>{st.session_state.df_ready.shape[1]}열</strong> <span style="font-size:15px;">(X변수 {st.session_state.df_ready.shape[1]-1}개 + Y변수 1개)</span> × <strong>{st.session_state.df_ready.shape[0]:,}행  </strong></p>', unsafe_allow_html=True)
                 
@@ -284,15 +376,21 @@ def render_clean_section(show_full: bool = True): #Step3_clean.py 참고
                         )
                         st.markdown('</div>', unsafe_allow_html=True)
 
-@st.cache_data(show_spinner=False)
 def render_eda_section(show_full: bool = True): #Step4_eda.py 참고
     """EDA 섹션을 요약/상세 형태로 다시 렌더링."""
-    with panel("4단계: 데이터 탐색 (완료)", "section-eda", collapsible=not show_full):
+    section = panel("4단계: 데이터 탐색 (완료)", "section-eda", collapsible=not show_full)
+    with section:
         st.success("✅ 데이터 탐색이 완료되었습니다.")
-        if "df_ready" in st.session_state and st.session_state.df_ready is not None:
+        if st.session_state.get("df_ready") is None:
+            return
+        if show_full or panel_open(section):
             perform_eda_analysis(st.session_state.df_ready,
                                  st.session_state.get("y_column"),
                                  st.session_state.get("x_columns", []))
+        else:
+            # 접힌 상태: 히스토그램·해설은 펼칠 때만 그림
+            x_count = len(st.session_state.get("x_columns", []))
+            st.caption(f"📊 Y 변수 1개 + X 변수 {x_count}개의 분포 분석 (펼치면 히스토그램과 해설을 표시합니다)")
 
 # ==============================
 # 새로운 파일 업로드 시 세션 초기화
@@ -305,54 +403,44 @@ def reset_session_state():
         'current_step', 'variables_confirmed', 'selected_vars', 'df_subset', 
         'df_ready', 'y_column', 'x_columns', 'numeric_x_selected', 'eda_completed',
         'df', 'numeric_columns', 'categorical_columns', 'date_columns', 
-        'datelike_columns', 'filename', 'cleaning_method', 'cleaning_completed',
-        'analysis_stage', 'scroll_to', 'category_filter_counter', 'current_filtered_df_key'
+        'datelike_columns', 'empty_columns', 'memory_report', 'filename', 'cleaning_method', 'cleaning_completed',
+        'imputation_settings', 'imputation_log', 'df_cleaned', 'outlier_settings', 'outlier_report',
+        'analysis_stage', 'scroll_to', 'current_filtered_df_key',
+        'column_analysis', 'sheet_name', 'subset_source_columns', 'subset_profile', 'append_summary',
+        'missing_mask'
     ]
     
-    # 과거의 필터링된 데이터셋들도 초기화
-    for key in list(st.session_state.keys()):
-        if key.startswith('df_ready_categoryfilter'):
-            keys_to_reset.append(key)
-    
     for key in keys_to_reset:
         if key in st.session_state:
             del st.session_state[key]
     
-    # st.cache로 캐시된 모든 데이터 초기화
-    st.cache_data.clear()
-    st.cache_resource.clear()
+    # 이 세션의 분석 캐시·범주 필터만 초기화 (다른 사용자의 캐시는 유지)
+    session_cache.clear_session()
+    filter_registry.clear_session()
     
     # 기본값으로 초기화
     st.session_state.current_step = "upload"
-    st.session_state.category_filter_counter = 0
 
 
 def reset_after_variable_selection():
     """변수군 선택이 다시 선택될 때 이후 단계(결측치 처리, 데이터 탐색, 데이터 분석)의 세션 상태를 초기화합니다."""
     # 이후 단계에서 사용되는 세션 상태 키들을 초기화
     keys_to_reset = [
-        'df_subset', 'df_ready', 'df_ready_sig',
-        'cleaning_method', 'cleaning_completed',
+        'df_subset', 'df_ready', 'df_ready_sig', 'df_ready_fp', 'subset_profile',
+        'cleaning_method', 'cleaning_completed', 'imputation_settings', 'imputation_log',
+        'df_cleaned', 'outlier_settings', 'outlier_report',
         'eda_completed',
         'analysis_stage', 'baseline_r2',
-        'category_filter_counter', 'current_filtered_df_key'
+        'current_filtered_df_key'
     ]
     
-    # 과거의 필터링된 데이터셋들도 초기화
-    for key in list(st.session_state.keys()):
-        if key.startswith('df_ready_categoryfilter'):
-            keys_to_reset.append(key)
-    
     for key in keys_to_reset:
         if key in st.session_state:
             del st.session_state[key]
     
-    # st.cache로 캐시된 모든 데이터 초기화
-    st.cache_data.clear()
-    st.cache_resource.clear()
-    
-    # 기본값으로 초기화
-    st.session_state.category_filter_counter = 0
+    # 이 세션의 분석 캐시·범주 필터만 초기화 (다른 사용자의 캐시는 유지)
+    session_cache.clear_session()
+    filter_registry.clear_session()
 
 
 def reset_to_select_step():
@@ -360,30 +448,119 @@ def reset_to_select_step():
     keys_to_reset = [
         # 2단계 자체 및 이후 단계에서 사용하는 상태
         'variables_confirmed', 'selected_vars',
-        'df_subset', 'df_ready', 'df_ready_sig',
+        'df_subset', 'df_ready', 'df_ready_sig', 'df_ready_fp', 'subset_source_columns', 'subset_profile',
         'y_column', 'x_columns', 'numeric_x_selected',
-        'cleaning_method', 'cleaning_completed',
+        'cleaning_method', 'cleaning_completed', 'imputation_settings', 'imputation_log',
+        'df_cleaned', 'outlier_settings', 'outlier_report',
         'eda_completed',
         'analysis_stage', 'baseline_r2',
-        'scroll_to', 'category_filter_counter', 'current_filtered_df_key'
+        'scroll_to', 'current_filtered_df_key'
     ]
-    
-    # 과거의 필터링된 데이터셋들도 초기화
-    for key in list(st.session_state.keys()):
-        if key.startswith('df_ready_categoryfilter'):
-            keys_to_reset.append(key)
 
     for key in keys_to_reset:
         if key in st.session_state:
             del st.session_state[key]
 
-    # 캐시 초기화
-    st.cache_data.clear()
-    st.cache_resource.clear()
+    # 이 세션의 분석 캐시·범주 필터만 초기화 (다른 사용자의 캐시는 유지)
+    session_cache.clear_session()
+    filter_registry.clear_session()
 
     # 2단계로 상태 이동
     st.session_state.current_step = "select"
-    st.session_state.category_filter_counter = 0
+
+
+# ==============================
+# 데이터 추가(append): 새 행만 처리하고 이후 단계 데이터를 갱신
+# ==============================
+
+def _concat_keep_categories(old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """이어 붙인 뒤 category 열은 category로 유지 (범주 집합이 달라 object가 된 경우)."""
+    out = pd.concat([old, new])
+    for i in range(out.shape[1]):
+        if isinstance(old.iloc[:, i].dtype, pd.CategoricalDtype) and not isinstance(out.iloc[:, i].dtype, pd.CategoricalDtype):
+            out.isetitem(i, out.iloc[:, i].astype('category'))
+    return out
+
+
+def apply_append_upload(uploaded_file):
+    """기존 데이터 뒤에 행이 추가된 파일을 반영합니다. 실패하면 오류 메시지를 반환합니다."""
+    base = st.session_state.df
+    base_df = base.to_frame() if isinstance(base, ColumnStore) else base
+    sheet_name = st.session_state.get("sheet_name", 0)
+    column_types = tuple(st.session_state.get(key) for key in (
+        "column_analysis", "numeric_columns", "categorical_columns",
+        "date_columns", "datelike_columns", "empty_columns"))
+    try:
+        df, new_rows, column_types, rechecked, new_mask = load_appended_rows(uploaded_file, base_df, column_types, sheet_name)
+    except (ValueError, pd.errors.ParserError) as e:
+        return str(e)
+
+    # 결측 단계 마스크도 새 행만큼 이어 붙임 (기존 마스크가 없으면 새 행만으로는 만들 수 없으므로 생략)
+    mask = st.session_state.get("missing_mask")
+    if mask is not None and mask.n_rows == len(base_df):
+        mask.append(new_mask)
+    else:
+        mask = st.session_state.missing_mask = None
+
+    # 새 파일 기준으로 캐시/열 저장소 갱신 (메모리 절약 모드면 캐시 형식과 dtype이 달라 생략)
+    projected = None
+    if not st.session_state.get("memory_report"):
+        cache_key = upload_cache.content_key(uploaded_file, sheet_name)
+        upload_cache.put(cache_key, df, column_types, filename=uploaded_file.name, mask=mask)
+        projected = open_projected(df, upload_cache.parquet_path(cache_key))
+    st.session_state.df = projected if projected is not None else df
+    (st.session_state.column_analysis, st.session_state.numeric_columns, st.session_state.categorical_columns,
+     st.session_state.date_columns, st.session_state.datelike_columns, st.session_state.empty_columns) = column_types
+    st.session_state.filename = uploaded_file.name
+    summary = {"rows": len(new_rows), "total": len(df), "rechecked": rechecked}
+
+    # 변수군이 선택되어 있으면 df_subset / df_ready 를 새 행만큼 갱신
+    source_columns = st.session_state.get("subset_source_columns")
+    if source_columns and st.session_state.get("df_subset") is not None:
+        df_subset = st.session_state.df_subset
+        new_subset = new_rows[source_columns].set_axis(df_subset.columns, axis=1)
+        st.session_state.df_subset = _concat_keep_categories(df_subset, new_subset)
+
+        # 통계/상관/결측 수는 새 행만 누적
+        profile = st.session_state.get("subset_profile")
+        if profile is None:
+            profile = IncrementalProfile.from_frame(st.session_state.df_subset)
+        else:
+            profile.update(new_subset)
+        st.session_state.subset_profile = profile
+
+        method = st.session_state.get("cleaning_method")
+        if st.session_state.get("cleaning_completed") and method:
+            if method == "처리 불필요" and new_subset.isnull().values.any():
+                # 새 행에 결측이 생겼으면 결측치 처리 방법을 다시 선택
+                for key in ['df_ready', 'df_ready_sig', 'df_ready_fp', 'cleaning_method', 'cleaning_completed', 'imputation_settings', 'imputation_log',
+                            'df_cleaned', 'outlier_settings', 'outlier_report', 'eda_completed', 'analysis_stage']:
+                    if key in st.session_state:
+                        del st.session_state[key]
+                st.session_state.current_step = "clean"
+                summary["reclean"] = True
+            else:
+                if method == "행 삭제":
+                    # 행 삭제는 행마다 독립이므로 새 행만 처리해 이어 붙이고, 지문도 새 행만 해시
+                    # (이상치 점검을 적용 중이면 점검 전 결과에 이어 붙이고 경계를 다시 계산)
+                    new_ready = new_subset.dropna()
+                    cleaned = st.session_state.get("df_cleaned", st.session_state.df_ready)
+                    _set_cleaned(_concat_keep_categories(cleaned, new_ready), new_ready)
+                elif method == "변수별 대체":
+                    # 시간순 채우기·보간·KNN은 기존 행과 이어지므로 전체를 다시 계산 (기록도 갱신)
+                    df_ready, st.session_state.imputation_log = apply_imputation(
+                        st.session_state.df_subset, st.session_state.imputation_settings, st.session_state.df)
+                    _set_cleaned(df_ready)
+                else:
+                    # 평균값은 전체 행 기준이므로 다시 계산
+                    _set_cleaned(clean_dataframe(st.session_state.df_subset, method))
+
+        # 이전 데이터 기준의 범주 필터 결과는 더 이상 유효하지 않음
+        st.session_state.pop('current_filtered_df_key', None)
+        filter_registry.clear_session()
+
+    st.session_state.append_summary = summary
+    return None
 
 
 # 5단계 상태머신
@@ -400,7 +577,6 @@ for key, default in [
     ('x_columns', None),
     ('numeric_x_selected', None),
     ('eda_completed', False),
-    ('category_filter_counter', 0),  # 필터 적용 카운터
 ]:
     if key not in st.session_state:
         st.session_state[key] = default
@@ -870,6 +1046,83 @@ with st.sidebar:
         st.button("✏️ 2단계: 변수군 선택", key="reset_to_step2_disabled", width='stretch',
                   help="1단계(파일 업로드)가 완료된 후에 사용할 수 있습니다.", disabled=True)
 
+    # 신규 행 추가 (append): 같은 파일에 행만 추가된 경우 새 행만 처리
+    if upload_ready and st.session_state.current_step != "upload":
+        with st.expander("➕ 신규 행 추가", expanded=bool(st.session_state.get("append_summary"))):
+            st.caption("기존 파일 뒤에 행만 추가된 파일을 올리면 새 행만 정규화·타입 확인하고 이후 단계 데이터를 갱신합니다.")
+            append_file = st.file_uploader("행이 추가된 파일", type=["csv", "xlsx"], key="append_file",
+                                           label_visibility="collapsed")
+            if append_file is not None and st.button("추가 반영", key="apply_append", width='stretch'):
+                append_error = apply_append_upload(append_file)
+                if append_error:
+                    st.error(f"⚠️ {append_error}")
+                else:
+                    st.rerun()
+
+            append_summary = st.session_state.get("append_summary")
+            if append_summary:
+                st.success(f"✅ {append_summary['rows']:,}행 추가 (전체 {append_summary['total']:,}행)")
+                if append_summary["rechecked"]:
+                    st.caption(f"타입 재판정: {', '.join(append_summary['rechecked'])}")
+                if append_summary.get("reclean"):
+                    st.warning("새 행에 결측치가 있어 결측치 처리 단계부터 다시 진행합니다.")
+
+            profile = st.session_state.get("subset_profile")
+            if append_summary and profile is not None:
+                # 누적 통계로 갱신된 요약 (전체 재계산 없음)
+                profile_view = pd.DataFrame({"결측 수": profile.missing_counts()})
+                profile_view = profile_view.join(profile.describe()[["mean", "std"]].rename(columns={"mean": "평균", "std": "표준편차"}))
+                y_col = st.session_state.get("y_column")
+                if y_col in profile.numeric_columns:
+                    profile_view["Y 상관(r)"] = profile.pearson()[y_col]
+                st.dataframe(profile_view.round(3), width='stretch')
+
+    # 업로드 캐시 상태
+    with st.expander("🗄️ 업로드 캐시", expanded=False):
+        cache_info = upload_cache.cache_stats()
+        st.caption(
+            f"적중률 {cache_info['hit_rate']:.0%} (적중 {cache_info['hits']} / 미스 {cache_info['misses']})  \n"
+            f"항목 {cache_info['entries']}개 · {cache_info['bytes'] / 1024 ** 2:.1f} / {cache_info['max_bytes'] / 1024 ** 2:.0f} MB"
+            f" · 제거 {cache_info['evictions']}회"
+        )
+
+    # 분석 결과 저장소 상태 (디스크, 세션 간 공유)
+    with st.expander("💾 분석 결과 저장소", expanded=False):
+        store_info = result_store.store_stats()
+        st.caption(
+            f"적중률 {store_info['hit_rate']:.0%} (적중 {store_info['hits']} / 미스 {store_info['misses']})  \n"
+            f"항목 {store_info['entries']}개 · {store_info['bytes'] / 1024 ** 2:.1f} / {store_info['max_bytes'] / 1024 ** 2:.0f} MB"
+            f" · 보관 {store_info['ttl_hours']:.0f}시간 · 제거 {store_info['evictions']}회 · 만료 {store_info['expired']}회"
+        )
+
+    # 세션 분석 캐시 상태 (이 세션의 네임스페이스별)
+    with st.expander("🧠 분석 캐시 (이 세션)", expanded=False):
+        ns_rows = session_cache.cache_stats(session_cache.session_id())
+        current_sig = st.session_state.get("df_ready_sig") or "-"
+        if ns_rows:
+            ns_df = pd.DataFrame([{
+                "데이터": ("▶ " if row["signature"] == current_sig else "") + str(row["signature"])[:10],
+                "항목": row["entries"],
+                "MB": row["bytes"] / 1024 ** 2,
+                "적중": row["hits"],
+                "미스": row["misses"],
+                "LRU 제거": row["evictions"],
+                "초기화 제거": row["invalidations"],
+            } for row in ns_rows])
+            st.dataframe(ns_df.round(2), width='stretch', hide_index=True)
+        else:
+            st.caption("캐시된 분석 결과가 없습니다.")
+        st.caption(
+            f"서버 전체 {session_cache.total_bytes() / 1024 ** 2:.1f} / {session_cache.MAX_CACHE_BYTES / 1024 ** 2:.0f} MB"
+        )
+        job_info = job_runner.job_stats()
+        st.caption(f"백그라운드 작업 (서버 전체): 실행 {job_info['running']} · 대기 {job_info['queued']} · 완료 {job_info['done']} · 취소 {job_info['cancelled']}")
+        filter_info = filter_registry.registry_stats(session_cache.session_id())
+        st.caption(
+            f"범주 필터 {filter_info['entries']}개 (비트맵 {filter_info['bitmaps']}개) · "
+            f"{filter_info['bytes'] / 1024:.1f} KB · 서버 전체 상한 {filter_info['max_bytes'] / 1024 ** 2:.0f} MB"
+        )
+
 # ==============================
 # 메인 컨텐츠 영역
 # ==============================
@@ -920,18 +1173,66 @@ with main_container:
     if st.session_state.current_step == "upload":
         with panel("1단계: 파일 업로드", "section-upload"):
             uploaded_file = st.file_uploader("CSV 또는 Excel 파일을 업로드하세요", type=["csv", "xlsx"])
+            compact_enabled = st.checkbox("💾 메모리 절약 모드", key="compact_dtypes_enabled",
+                                          help="정밀도가 허용되는 실수 열은 float32로, 고유값이 적은 범주형 열은 category로 변환합니다.")
             if uploaded_file is not None:
                 # 새로운 파일이 업로드되면 세션 상태 초기화
                 reset_session_state()
-                
-                df = load_data(uploaded_file)
+
+                # 엑셀: 시트 목록/크기만 먼저 읽고, 선택된 시트만 파싱
+                sheet_name = 0
+                if uploaded_file.name.endswith('.xlsx'):
+                    try:
+                        sheets = list_excel_sheets(uploaded_file)
+                    except Exception:
+                        sheets = []
+                    if len(sheets) > 1:
+                        sheet_labels = {
+                            name: f"{name} ({rows:,}행 × {cols}열)" if rows is not None and cols else name
+                            for name, rows, cols in sheets
+                        }
+                        sheet_name = st.selectbox("분석할 시트를 선택하세요", options=list(sheet_labels),
+                                                  format_func=sheet_labels.get, key="excel_sheet")
+                    elif sheets:
+                        sheet_name = sheets[0][0]
+
+                # 같은 내용의 파일(+ 시트)은 캐시(Parquet + 컬럼 분석 결과)에서 바로 읽기
+                t0 = time.perf_counter()
+                cache_key = upload_cache.content_key(uploaded_file, sheet_name)
+                cached = upload_cache.get(cache_key)
+                if cached is not None:
+                    df, column_types = cached
+                    st.session_state.missing_mask = upload_cache.get_mask(cache_key, df.columns)
+                    st.success("파일이 성공적으로 로드되었습니다. (캐시)")
+                    st.caption(f"⏱ 캐시 로드 {(time.perf_counter() - t0) * 1000:.0f}ms")
+                else:
+                    df = load_data(uploaded_file, sheet_name=sheet_name)
+                    if df is not None:
+                        # 컬럼 전처리 (엑셀 헤더의 숫자/날짜도 문자열 열 이름으로)
+                        df.columns = df.columns.astype(str).str.strip()
+                        mask = st.session_state.get("missing_mask")
+                        if mask is not None:
+                            mask.columns = list(df.columns)
+                        column_types = analyze_column_types(df, n_jobs=-1)
+                        upload_cache.put(cache_key, df, column_types, filename=uploaded_file.name, mask=mask)
                 if df is not None:
-                    # 컬럼 전처리
-                    df.columns = df.columns.str.strip()
-                    column_analysis, numeric_columns, categorical_columns, date_columns, datelike_columns, empty_columns = analyze_column_types(df)
+                    column_analysis, numeric_columns, categorical_columns, date_columns, datelike_columns, empty_columns = column_types
+
+                    # 선택 시 dtype 축소 (캐시에는 원본 dtype으로 저장됨)
+                    memory_report = None
+                    if compact_enabled:
+                        df, memory_report = compact_dtypes(df, column_analysis)
+
+                    # 열이 많은 파일은 세션에 전체 DataFrame 대신 열 단위 저장소를 보관
+                    # (이후 단계에서는 선택된 열만 읽어 옴)
+                    compact_dtypes_map = {c: df[c].dtype for c in memory_report['columns']} if memory_report else None
+                    projected = open_projected(df, upload_cache.parquet_path(cache_key), compact_dtypes_map)
 
                     # 세션 저장
-                    st.session_state.df = df
+                    st.session_state.df = projected if projected is not None else df
+                    st.session_state.memory_report = memory_report
+                    st.session_state.column_analysis = column_analysis
+                    st.session_state.sheet_name = sheet_name
                     st.session_state.numeric_columns = numeric_columns
                     st.session_state.categorical_columns = categorical_columns
                     st.session_state.date_columns = date_columns
@@ -971,6 +1272,8 @@ with main_container:
                             
                             # 세션 상태 설정 (깨끗한 이름 사용)
                             st.session_state.df_subset = df_subset
+                            st.session_state.subset_source_columns = selected_columns
+                            st.session_state.subset_profile = IncrementalProfile.from_frame(df_subset)
                             st.session_state.y_column = y_column_clean
                             st.session_state.x_columns = x_columns_clean
                             st.session_state.numeric_x_selected = numeric_x_selected
@@ -983,7 +1286,8 @@ with main_container:
                             st.rerun()
                     else:
                         # 상세 출력(업로드 단계 자체에서 확인)
-                        display_data_info(df, numeric_columns, categorical_columns, date_columns, datelike_columns, empty_columns, uploaded_file.name)
+                        display_data_info(df, numeric_columns, categorical_columns, date_columns, datelike_columns, empty_columns, uploaded_file.name,
+                                          memory_report=memory_report, missing_mask=st.session_state.get("missing_mask"))
                         st.subheader("데이터 미리보기")
                         display_data_preview(df)
 
@@ -1013,6 +1317,8 @@ with main_container:
                 
                 # 세션 저장
                 st.session_state.df_subset = df_subset
+                st.session_state.subset_source_columns = [y_column] + available_x_columns
+                st.session_state.subset_profile = IncrementalProfile.from_frame(df_subset)
                 st.session_state.y_column = y_column
                 st.session_state.x_columns = available_x_columns
                 st.session_state.numeric_x_selected = numeric_x_selected
@@ -1030,8 +1336,7 @@ with main_container:
             df_ready = data_cleaner(st.session_state.df_subset)
 
             if df_ready is not None and st.session_state.get("cleaning_completed"):
-                st.session_state.df_ready = df_ready
-                st.session_state.df_ready_sig = _df_signature(df_ready)
+                _set_cleaned(df_ready)
                 st.session_state.current_step = "eda"
                 st.rerun()
 
@@ -1042,6 +1347,18 @@ with main_container:
         render_select_section(show_full=False)
         render_clean_section(show_full=False)
 
+        # 선택 단계: 이상치 점검 (결측 처리 결과에 적용, 펼칠 때만 계산)
+        section = panel("3단계 (선택): 이상치 점검", "section-outlier", collapsible=True)
+        with section:
+            st.caption("센서 이상 등으로 튄 값이 회귀 계수와 R²를 좌우하지 않도록 중앙값·분위수 기준 경계를 벗어난 값을 확인하고 제외하거나 자릅니다.")
+            if panel_open(section):
+                settings = outlier_screener(st.session_state.get("df_cleaned", st.session_state.df_ready))
+                if settings is not None:
+                    cleaned = st.session_state.get("df_cleaned", st.session_state.df_ready)
+                    st.session_state.outlier_settings = settings
+                    _set_cleaned(cleaned)
+                    st.rerun()
+
         # 현재 단계 UI
         with panel("4단계: 데이터 탐색", "section-eda"):
             perform_eda_analysis(st.session_state.df_ready,
@@ -1100,21 +1417,36 @@ with main_container:
                                 cols = st.columns(2)
                                 num_cols = 2
 
-                            # 각 칼럼에 드롭다운 배치
+                            # 범주별 행 위치·개수 (데이터셋당 한 번 계산, 이후 실행은 캐시)
+                            cat_index = category_index.build_category_index(st.session_state.df_ready, categorical_x)
+                            n_ready = len(st.session_state.df_ready)
+
+                            # 각 칼럼에 드롭다운 배치 (선택지 옆에 행 수 표시)
                             selected_filters = {}
                             for i, cat_var in enumerate(categorical_x):
                                 col_idx = i % num_cols
                                 with cols[col_idx] if num_cols > 1 else cols[0]:
-                                    unique_vals = sorted(st.session_state.df_ready[cat_var].dropna().unique())
+                                    counts = category_index.option_counts(cat_index, cat_var)
                                     selected = st.multiselect(
                                         f'변수명: **"{cat_var}"**',
-                                        ["전체"] + list(unique_vals),
+                                        ["전체"] + cat_index[cat_var]["values"],
                                         default=["전체"],
                                         key=f"filter_{cat_var}",
+                                        format_func=lambda v, counts=counts: f"전체 ({n_ready:,}행)" if v == "전체" else f"{v} ({counts.get(v, 0):,}행)",
                                         help=f"'{cat_var}'변수에 대하여 분석할 세부 범주를 선택합니다. '전체'를 선택하면 모든 범주를 포함합니다."
                                     )
                                     selected_filters[cat_var] = selected
 
+                            # 적용 전에 현재 선택 조합의 행 수 미리 보기
+                            pending_spec = {
+                                var: sorted(map(str, vals)) for var, vals in selected_filters.items()
+                                if "전체" not in vals and len(vals) > 0
+                            }
+                            pending_rows = category_index.select_positions(cat_index, pending_spec)
+                            st.caption(
+                                f"선택한 조합: {n_ready if pending_rows is None else len(pending_rows):,}행 / 전체 {n_ready:,}행"
+                            )
+
                             # 버튼을 오른쪽 정렬으로 배치
                             st.divider()
                             col1, col2, col3 = st.columns([3, 1, 1], gap="small")
@@ -1128,25 +1460,23 @@ with main_container:
                                 )
                             
                             if apply_button:
-                                # 필터링 적용
-                                filtered_df = st.session_state.df_ready.copy()
+                                # 필터 조건 정리
                                 applied_filters = []
+                                applied_filter_spec = pending_spec
                                 for var, vals in selected_filters.items():
                                     if "전체" not in vals and len(vals) > 0:
-                                        filtered_df = filtered_df[filtered_df[var].isin(vals)]
                                         applied_filters.append(f"**{var}**: {', '.join(map(str, vals))}")
                                 
-                                # 필터 카운터 증가 및 필터링된 데이터셋 저장
-                                st.session_state.category_filter_counter += 1
-                                filter_key = f"df_ready_categoryfilter{st.session_state.category_filter_counter}"
-                                st.session_state[filter_key] = filtered_df
-                                st.session_state.current_filtered_df_key = filter_key
+                                # 필터링된 데이터는 복사본 대신 레지스트리에 행 선택만 보관 (이전에 쓴 조건이면 재사용)
+                                filtered_df = filter_registry.filtered_view(st.session_state.df_ready, applied_filter_spec)
+                                st.session_state.current_filtered_df_key = filter_registry.spec_key(applied_filter_spec)
                                 
                                 # 5단계 분석을 처음부터 재수행하기 위해 초기화
                                 st.session_state.analysis_stage = 1
                                 st.session_state.baseline_r2 = None
                                 st.session_state.filters_applied = True
                                 st.session_state.applied_filters = applied_filters
+                                st.session_state.applied_filter_spec = applied_filter_spec
                                 
                                 # 성공 메시지 표시
                                 if applied_filters:
@@ -1195,9 +1525,20 @@ with main_container:
                     
                     # 필터링된 데이터 사용 (버튼 누른 후) 또는 범주형 없으면 전체 데이터 사용
                     if st.session_state.get("current_filtered_df_key"):
-                        filtered_df = st.session_state[st.session_state.current_filtered_df_key]
+                        filtered_df = filter_registry.filtered_view(
+                            st.session_state.df_ready, st.session_state.get("applied_filter_spec")
+                        )
                     else:
                         filtered_df = st.session_state.df_ready
+
+                    # 큰 데이터는 5단계 계산을 백그라운드 작업으로 (끝날 때까지 진행 상황만 표시)
+                    bg_job = job_runner.submit_stage5(filtered_df, y_column, x_columns)
+                    if bg_job is not None and bg_job.status != "done":
+                        render_background_job(bg_job.key)
+                        st.stop()
+                    if bg_job is not None and bg_job.errors:
+                        st.warning("백그라운드 계산 중 일부 단계가 실패해 다시 계산합니다: "
+                                   + ", ".join(label for label, _ in bg_job.errors))
                     
                     # --- [개선된 로직 시작] ---
                     
@@ -1316,6 +1657,27 @@ with main_container:
 
                         # 분리된 파일 3의 함수 호출
                         perform_variable_check(filtered_df, x_columns)
+
+                    # [4단계: 범주별 일괄 분석] (범주형 X가 있을 때만, 필터와 무관하게 전체 데이터 기준)
+                    if st.session_state.analysis_stage >= 3 and categorical_x:
+                        st.markdown("<div id='section-category-batch'></div>", unsafe_allow_html=True)
+                        st.markdown("<hr style='margin: 2rem 0;'>", unsafe_allow_html=True)
+                        st.markdown("""
+                        <div style="background: linear-gradient(135deg, #E2E3F3 0%, #D1D3EE 100%); 
+                                    border-left: 5px solid #5A5FC8; 
+                                    padding: 1rem 1.5rem; 
+                                    border-radius: 8px; 
+                                    margin-bottom: 1.5rem;
+                                    box-shadow: 0 2px 4px rgba(90, 95, 200, 0.2);">
+                        <h3 style="margin: 0; color: #2C3E50; font-size: 1.8em; font-weight: 600;">
+                            ④ 범주별 일괄 분석
+                        </h3>
+                        <div style="font-size: 16px; line-height: 1.6; color: #2c3e50;">
+                            범주(예: 생산 라인, 설비)마다 필터를 하나씩 바꿔 가며 다시 분석하지 않아도, 범주별로 상관·선형회귀·머신러닝 비교를 한 번에 수행해 나란히 비교합니다.
+                            <br>범주에 따라 R²나 주요 변수, 계수의 부호(영향 방향)가 달라진다면 범주별로 다른 운전 전략이 필요할 수 있습니다.
+                        </div>
+                        """, unsafe_allow_html=True)
+                        perform_category_batch_analysis(st.session_state.df_ready, y_column, x_columns, categorical_x)
                     
                 else:
                     st.warning("분석을 위한 변수가 선택되지 않았습니다. 2단계에서 변수를 선택해주세요.")
\ No newline at end of file
@@ -0,0 +1,267 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import NearestNeighbors
+
+# ==============================
+# 결측치 대체 엔진 (변수마다 대체 방법을 골라 적용)
+# ==============================
+# 센서 데이터처럼 결측이 흩어져 있으면 행 삭제로 30~60%의 행이 사라지므로
+# 변수마다 대체 방법을 골라 채웁니다.
+# - 시간 기준: 앞 값 / 뒤 값 채우기, 선형 보간은 시간 열 순서(없으면 행 순서)로 적용
+#   앞 값 채우기로 못 채운 맨 앞 구간은 뒤 값으로, 뒤 값 채우기로 못 채운 맨 끝 구간은 앞 값으로 채움
+# - KNN: KNN을 고른 변수들이 모두 있는 행(최대 KNN_MAX_REFERENCE행 표본)으로 이웃 색인을 한 번 만들고,
+#   결측 행을 KNN_CHUNK_ROWS행씩 나눠 이웃 평균으로 채움 (거리는 KNN 대상이 아닌 수치형 변수로 계산)
+# - 변수별 처리는 스레드 풀에서 병렬 실행, 변수마다 방법별로 채운 칸 수를 기록
+# 설정: ANALYZER_IMPUTE_WORKERS, ANALYZER_KNN_NEIGHBORS, ANALYZER_KNN_CHUNK_ROWS, ANALYZER_KNN_MAX_REFERENCE
+
+MAX_WORKERS = int(os.environ.get("ANALYZER_IMPUTE_WORKERS", os.cpu_count() or 1))
+KNN_NEIGHBORS = int(os.environ.get("ANALYZER_KNN_NEIGHBORS", "5"))
+KNN_CHUNK_ROWS = int(float(os.environ.get("ANALYZER_KNN_CHUNK_ROWS", "50000")))
+KNN_MAX_REFERENCE = int(float(os.environ.get("ANALYZER_KNN_MAX_REFERENCE", "200000")))
+
+# 방법 키 -> 화면 이름 (순서 = 선택지 순서)
+STRATEGIES = {
+    "mean": "평균값",
+    "median": "중앙값",
+    "ffill": "앞 값 채우기",
+    "bfill": "뒤 값 채우기",
+    "interpolate": "선형 보간",
+    "knn": "KNN (유사 행 평균)",
+    "none": "그대로 두기",
+}
+# 수치형이 아닌 변수에 쓸 수 있는 방법
+NON_NUMERIC_STRATEGIES = ("ffill", "bfill", "none")
+
+
+def available_strategies(series: pd.Series) -> list:
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return list(STRATEGIES)
+    return list(NON_NUMERIC_STRATEGIES)
+
+
+def default_strategy(series: pd.Series, has_time: bool) -> str:
+    """시간 열이 있으면 수치형은 선형 보간, 없으면 중앙값. 수치형이 아니면 앞 값 채우기."""
+    if "interpolate" not in available_strategies(series):
+        return "ffill"
+    return "interpolate" if has_time else "median"
+
+
+def time_values(df: pd.DataFrame, df_subset: pd.DataFrame, time_column):
+    """
+    df_subset 행 순서에 맞춘 시간 값 (datetime → int64 ns, 숫자는 그대로).
+    시간 열이 없거나 행이 맞지 않으면 None (행 순서를 시간 순서로 사용).
+    """
+    if not time_column or df is None or time_column not in df.columns or len(df) != len(df_subset):
+        return None
+    col = df[time_column]
+    if not pd.api.types.is_datetime64_any_dtype(col) and not pd.api.types.is_numeric_dtype(col):
+        col = pd.to_datetime(col, errors="coerce")
+    if pd.api.types.is_datetime64_any_dtype(col):
+        values = col.dt.tz_localize(None) if getattr(col.dt, "tz", None) is not None else col
+        return values.to_numpy(dtype="datetime64[ns]").astype(np.int64).astype(np.float64)
+    return col.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _time_order(times, n_rows: int) -> np.ndarray:
+    if times is None:
+        return np.arange(n_rows)
+    # 시간 값이 없는 행(NaT)은 맨 뒤로
+    return np.argsort(np.where(np.isnan(times), np.inf, times), kind="stable")
+
+
+# -------------------------------
+# 변수 하나에 대한 방법
+# -------------------------------
+def _fill_directional(series: pd.Series, order: np.ndarray, first: str):
+    """first("ffill"/"bfill")로 채우고 남은 끝 구간은 반대 방향으로. {방법: 채운 칸 수}."""
+    ordered = series.iloc[order]
+    missing = ordered.isna().to_numpy()
+    if first == "ffill":
+        step1 = ordered.ffill()
+        step2, second = step1.bfill(), "bfill"
+    else:
+        step1 = ordered.bfill()
+        step2, second = step1.ffill(), "ffill"
+    filled_first = missing & step1.notna().to_numpy()
+    filled_second = missing & ~filled_first & step2.notna().to_numpy()
+    # 원래 행 순서로 되돌림
+    restored = step2.iloc[np.argsort(order, kind="stable")]
+    return restored, {first: int(filled_first.sum()), second: int(filled_second.sum())}
+
+
+def _interpolate(values: np.ndarray, order: np.ndarray, times):
+    """시간(없으면 행 위치)에 대한 선형 보간. 관측 범위 밖은 가장 가까운 끝 값(앞/뒤 값 채우기)."""
+    ordered = values[order]
+    x = np.arange(len(order), dtype=np.float64) if times is None else times[order]
+    missing = np.isnan(ordered)
+    known = ~missing & ~np.isnan(x)
+    if not known.any():
+        return values, {}
+    xp, fp = x[known], ordered[known]
+    targets = missing & ~np.isnan(x)
+    ordered = ordered.copy()
+    ordered[targets] = np.interp(x[targets], xp, fp)
+
+    counts = {
+        "interpolate": int((targets & (x >= xp[0]) & (x <= xp[-1])).sum()),
+        "bfill": int((targets & (x < xp[0])).sum()),
+        "ffill": int((targets & (x > xp[-1])).sum()),
+    }
+    filled = np.empty_like(values)
+    filled[order] = ordered
+    return filled, counts
+
+
+def _fill_column(series: pd.Series, strategy: str, order: np.ndarray, times):
+    """(채운 Series, {방법: 채운 칸 수}). KNN은 impute()에서 따로 처리."""
+    if strategy == "none":
+        return series, {}
+    if strategy in ("ffill", "bfill"):
+        return _fill_directional(series, order, strategy)
+
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    missing = np.isnan(values)
+    if strategy == "interpolate":
+        filled, counts = _interpolate(values, order, times)
+    else:
+        fill_value = np.nanmean(values) if strategy == "mean" else np.nanmedian(values)
+        filled = np.where(missing, fill_value, values)
+        counts = {strategy: int(missing.sum()) if not np.isnan(fill_value) else 0}
+    return _restore_dtype(filled, series), counts
+
+
+def _restore_dtype(filled: np.ndarray, series: pd.Series) -> pd.Series:
+    """원래 정수형 열은 채운 값이 모두 정수일 때만 원래 dtype으로, 아니면 float64."""
+    out = pd.Series(filled, index=series.index, name=series.name)
+    dtype = series.dtype
+    if dtype == np.float64:
+        return out
+    if pd.api.types.is_integer_dtype(dtype):
+        remaining = np.isnan(filled)
+        known = filled[~remaining]
+        if not np.array_equal(known, np.round(known)):
+            return out
+        if remaining.any() and not pd.api.types.is_extension_array_dtype(dtype):
+            return out   # numpy 정수형은 결측을 담을 수 없음
+        return out.astype(dtype)
+    if pd.api.types.is_float_dtype(dtype):
+        return out.astype(dtype)
+    return out
+
+
+# -------------------------------
+# KNN (여러 변수를 한 번에)
+# -------------------------------
+def _knn_fill(df: pd.DataFrame, targets: list, executor):
+    """{변수: (채운 Series, {방법: 칸 수})}. 이웃 색인은 한 번만 만들고 결측 행을 묶음 단위로 조회."""
+    numeric = [c for c in df.columns
+               if pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])]
+    features = [c for c in numeric if c not in targets] or list(targets)
+
+    # 표준화 후 빈 칸은 0 (= 평균)으로 두고 거리 계산
+    X = np.column_stack([df[c].to_numpy(dtype=np.float64, na_value=np.nan) for c in features])
+    mean, std = np.nanmean(X, axis=0), np.nanstd(X, axis=0)
+    X = np.nan_to_num((X - mean) / np.where(std > 0, std, 1.0), nan=0.0)
+
+    T = np.column_stack([df[c].to_numpy(dtype=np.float64, na_value=np.nan) for c in targets])
+    missing = np.isnan(T)
+    reference = np.flatnonzero(~missing.any(axis=1))
+    query = np.flatnonzero(missing.any(axis=1))
+
+    if len(reference) < KNN_NEIGHBORS:
+        # 이웃을 찾을 완전한 행이 부족하면 평균값으로
+        return {c: _fill_column(df[c], "mean", None, None) for c in targets}
+
+    if len(reference) > KNN_MAX_REFERENCE:
+        reference = np.sort(np.random.default_rng(42).choice(reference, KNN_MAX_REFERENCE, replace=False))
+    index = NearestNeighbors(n_neighbors=KNN_NEIGHBORS).fit(X[reference])
+    reference_values = T[reference]
+
+    def _chunk(rows):
+        _, neighbors = index.kneighbors(X[rows])
+        return rows, reference_values[neighbors].mean(axis=1)
+
+    filled = T.copy()
+    chunks = [query[i:i + KNN_CHUNK_ROWS] for i in range(0, len(query), KNN_CHUNK_ROWS)]
+    for rows, estimates in executor.map(_chunk, chunks):
+        block = filled[rows]
+        np.copyto(block, estimates, where=np.isnan(block))
+        filled[rows] = block
+
+    return {
+        c: (_restore_dtype(filled[:, j], df[c]), {"knn": int(missing[:, j].sum())})
+        for j, c in enumerate(targets)
+    }
+
+
+# -------------------------------
+# 전체
+# -------------------------------
+def impute(df: pd.DataFrame, plan: dict, times=None):
+    """
+    plan {변수: 방법 키}대로 결측치를 채운 새 DataFrame과 변수별 기록을 반환합니다. (원본은 변경하지 않음)
+    times: df 행 순서에 맞춘 시간 값 (time_values()), None이면 행 순서를 시간 순서로 사용.
+    기록: [{"column", "strategy", "missing", "filled": {방법: 칸 수}, "remaining", "seconds"}, ...]
+    """
+    plan = {c: s for c, s in plan.items() if c in df.columns and s in STRATEGIES}
+    order = _time_order(times, len(df))
+    knn_targets = [c for c, s in plan.items() if s == "knn"]
+    results = {}
+
+    def _run(col):
+        t0 = time.perf_counter()
+        filled, counts = _fill_column(df[col], plan[col], order, times)
+        return col, filled, counts, time.perf_counter() - t0
+
+    with ThreadPoolExecutor(max_workers=max(1, MAX_WORKERS), thread_name_prefix="analyzer-impute") as executor:
+        for col, filled, counts, seconds in executor.map(_run, [c for c in plan if c not in knn_targets]):
+            results[col] = (filled, counts, seconds)
+        if knn_targets:
+            t0 = time.perf_counter()
+            knn = _knn_fill(df, knn_targets, executor)
+            seconds = time.perf_counter() - t0
+            for col, (filled, counts) in knn.items():
+                results[col] = (filled, counts, seconds)
+
+    out = pd.DataFrame(
+        {col: results[col][0] if col in results else df[col] for col in df.columns},
+        index=df.index,
+    )
+    log = []
+    for col in plan:
+        filled, counts, seconds = results[col]
+        log.append({
+            "column": col,
+            "strategy": plan[col],
+            "missing": int(df[col].isna().sum()),
+            "filled": {s: n for s, n in counts.items() if n},
+            "remaining": int(filled.isna().sum()),
+            "seconds": seconds,
+        })
+    return out, log
+
+
+def log_table(log: list) -> pd.DataFrame:
+    """변수별 기록 표 (방법별 채운 칸 수는 열로 펼침)."""
+    rows = []
+    for entry in log:
+        row = {
+            "변수": entry["column"],
+            "선택한 방법": STRATEGIES[entry["strategy"]],
+            "결측 수": entry["missing"],
+        }
+        for strategy, label in STRATEGIES.items():
+            if strategy != "none":
+                row[label] = entry["filled"].get(strategy, 0)
+        row["남은 결측"] = entry["remaining"]
+        row["소요(초)"] = round(entry["seconds"], 3)
+        rows.append(row)
+    table = pd.DataFrame(rows)
+    if table.empty:
+        return table
+    # 아무 변수에도 쓰이지 않은 방법 열은 숨김
+    used = [label for s, label in STRATEGIES.items() if s != "none" and table[label].any()]
+    return table[["변수", "선택한 방법", "결측 수"] + used + ["남은 결측", "소요(초)"]]
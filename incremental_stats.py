@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+# ==============================
+# 행 추가(append) 시 전체 재계산 없이 갱신되는 요약 통계
+# ==============================
+# 수치형 열마다 개수/합/제곱합, 열 쌍마다 교차합을 누적해
+# 평균·표준편차·결측 수·Pearson 상관(쌍별 결측 제외, df.corr와 동일한 정의)을 새 행만으로 갱신합니다.
+
+
+class IncrementalProfile:
+    """행 묶음 단위로 누적되는 열 요약."""
+
+    def __init__(self, columns, numeric_columns):
+        self.columns = list(columns)
+        self.numeric_columns = list(numeric_columns)
+        p = len(self.numeric_columns)
+        self.n_rows = 0
+        self.missing = np.zeros(len(self.columns), dtype=np.int64)
+        # 큰 값에서의 자릿수 손실을 줄이기 위해 첫 묶음의 평균만큼 이동한 값으로 누적
+        self.shift = None
+        self.pair_n = np.zeros((p, p))
+        self.pair_sx = np.zeros((p, p))    # [i, j]: i, j 모두 유효한 행에서 x_i 합
+        self.pair_sxx = np.zeros((p, p))   # [i, j]: i, j 모두 유효한 행에서 x_i² 합
+        self.pair_sxy = np.zeros((p, p))   # [i, j]: i, j 모두 유효한 행에서 x_i·x_j 합
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame):
+        numeric = [c for c in df.columns
+                   if pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])]
+        profile = cls(df.columns, numeric)
+        profile.update(df)
+        return profile
+
+    def update(self, chunk: pd.DataFrame):
+        """새 행 묶음을 누적합니다."""
+        if len(chunk) == 0:
+            return self
+        self.n_rows += len(chunk)
+        self.missing += chunk[self.columns].isna().sum().to_numpy(dtype=np.int64)
+        if not self.numeric_columns:
+            return self
+
+        X = chunk[self.numeric_columns].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(X)
+        if self.shift is None:
+            counts = valid.sum(axis=0)
+            sums = np.where(valid, X, 0.0).sum(axis=0)
+            self.shift = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+        X0 = np.where(valid, X - self.shift, 0.0)
+        M = valid.astype(np.float64)
+        self.pair_n += M.T @ M
+        self.pair_sx += X0.T @ M
+        self.pair_sxx += (X0 ** 2).T @ M
+        self.pair_sxy += X0.T @ X0
+        return self
+
+    def missing_counts(self) -> pd.Series:
+        return pd.Series(self.missing, index=self.columns)
+
+    def describe(self) -> pd.DataFrame:
+        """수치형 열의 개수/평균/표준편차(ddof=1)."""
+        n = np.diag(self.pair_n)
+        sx = np.diag(self.pair_sx)
+        sxx = np.diag(self.pair_sxx)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = sx / n
+            var = (sxx - n * mean ** 2) / (n - 1)
+        shift = self.shift if self.shift is not None else np.zeros(len(n))
+        return pd.DataFrame({
+            'count': n.astype(np.int64),
+            'mean': mean + shift,
+            'std': np.sqrt(np.clip(var, 0, None)),
+        }, index=self.numeric_columns)
+
+    def pearson(self) -> pd.DataFrame:
+        """쌍별 결측 제외 Pearson 상관행렬 (df.corr(method='pearson')과 같은 정의)."""
+        n = self.pair_n
+        sx, sy = self.pair_sx, self.pair_sx.T
+        sxx, syy = self.pair_sxx, self.pair_sxx.T
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = n * self.pair_sxy - sx * sy
+            var_x = n * sxx - sx ** 2
+            var_y = n * syy - sy ** 2
+            corr = cov / np.sqrt(var_x * var_y)
+        corr[(n < 2) | (var_x <= 0) | (var_y <= 0)] = np.nan
+        corr = np.clip(corr, -1.0, 1.0)
+        np.fill_diagonal(corr, np.where(np.isnan(np.diag(corr)), np.nan, 1.0))
+        return pd.DataFrame(corr, index=self.numeric_columns, columns=self.numeric_columns)
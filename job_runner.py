@@ -0,0 +1,194 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+import result_store
+from step5_1_linear_regression import compute_linear_models, compute_dcor_matrix
+from step5_2_machine_learning import train_compare_models
+from step5_3_variable_feedback import compute_vif, compute_lasso_importance, compute_shap_importance
+
+# ==============================
+# 백그라운드 작업 실행기 (5단계 분석을 스크립트 스레드 밖에서 계산)
+# ==============================
+# 큰 데이터에서 선형회귀·머신러닝·변수 점검을 스크립트 스레드에서 돌리면 몇 분 동안 화면이 멈추고,
+# 새로고침하면 계산도 함께 사라집니다.
+# 여기서는 서버 프로세스 전체가 공유하는 작업 표와 작업자 스레드 풀에서 단계별로 계산해
+# 결과 저장소(result_store)에 화면과 같은 키로 저장합니다. 화면은 다음 실행에서 저장소 적중으로 바로 그립니다.
+# - 작업 키: (df_ready 시그니처, Y, X, 범주 필터) → 재실행·새로고침 후 같은 데이터를 다시 올려도 같은 작업을 찾음
+# - 진행률: 단계별 상태(대기/실행/완료/오류/취소)와 소요 시간
+# - 취소: 현재 단계가 끝나면 나머지 단계를 건너뜀 (sklearn 학습 도중에는 중단할 수 없음)
+# - 저장소에 이미 있는 단계는 작업에 넣지 않으므로, 취소 후 다시 실행하면 남은 단계만 계산
+
+MAX_WORKERS = int(os.environ.get("ANALYZER_JOB_WORKERS", "1"))
+# 이 행 수 이상이면 5단계 분석을 백그라운드 작업으로 실행 (작으면 기존처럼 바로 계산)
+BACKGROUND_MIN_ROWS = int(os.environ.get("ANALYZER_BACKGROUND_MIN_ROWS", "50000"))
+# 끝난 작업은 이 개수까지만 표에 남김 (오래된 것부터 제거)
+_MAX_FINISHED_JOBS = 64
+
+_lock = threading.Lock()
+_jobs = OrderedDict()   # 작업 키 -> Job  ※ 순서 = 등록 순
+_executor = None
+
+
+class Job:
+    """단계 목록 [(이름, 계산 함수), ...]을 순서대로 실행하는 작업. 상태는 작업자 스레드가 갱신합니다."""
+
+    def __init__(self, key: str, title: str, steps: list):
+        self.key = key
+        self.title = title
+        self.steps = [{"label": label, "status": "pending", "seconds": None, "error": None} for label, _ in steps]
+        self._fns = [fn for _, fn in steps]
+        self.status = "queued"   # queued → running → done | cancelled
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self._cancel = threading.Event()
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("queued", "running")
+
+    @property
+    def progress(self) -> float:
+        """끝난(완료·오류) 단계 비율 0~1."""
+        finished = sum(step["status"] in ("done", "error") for step in self.steps)
+        return finished / len(self.steps) if self.steps else 1.0
+
+    @property
+    def current_step(self):
+        return next((step["label"] for step in self.steps if step["status"] == "running"), None)
+
+    @property
+    def errors(self) -> list:
+        return [(step["label"], step["error"]) for step in self.steps if step["error"]]
+
+    def cancel(self):
+        """현재 단계가 끝나면 멈춥니다. (대기 중이면 시작하지 않음)"""
+        self._cancel.set()
+
+    def _run(self):
+        self.started = time.time()
+        self.status = "running"
+        for step, fn in zip(self.steps, self._fns):
+            if self._cancel.is_set():
+                step["status"] = "cancelled"
+                continue
+            step["status"] = "running"
+            t0 = time.perf_counter()
+            try:
+                fn()
+                step["status"] = "done"
+            except Exception as e:
+                # 한 단계가 실패해도 나머지 단계는 계속 (화면에서 해당 단계만 다시 계산·오류 표시)
+                step["status"] = "error"
+                step["error"] = f"{type(e).__name__}: {e}"
+            step["seconds"] = time.perf_counter() - t0
+        self.status = "cancelled" if self._cancel.is_set() else "done"
+        self.finished = time.time()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="analyzer-job")
+    return _executor
+
+
+def _prune():
+    finished = [key for key, job in _jobs.items() if not job.active]
+    for key in finished[:max(0, len(finished) - _MAX_FINISHED_JOBS)]:
+        del _jobs[key]
+
+
+def submit(key: str, title: str, steps: list) -> Job:
+    """작업을 등록합니다. 같은 키의 작업이 이미 있으면(실행 중·완료 모두) 그 작업을 돌려줍니다."""
+    with _lock:
+        job = _jobs.get(key)
+        if job is not None:
+            return job
+        job = _jobs[key] = Job(key, title, steps)
+        _prune()
+    _get_executor().submit(job._run)
+    return job
+
+
+def get(key: str):
+    with _lock:
+        return _jobs.get(key)
+
+
+def forget(key: str):
+    """작업 표에서 지웁니다. (실행 중이면 취소 후 지움) 다음 submit은 새 작업을 만듭니다."""
+    with _lock:
+        job = _jobs.pop(key, None)
+    if job is not None:
+        job.cancel()
+
+
+def job_stats() -> dict:
+    with _lock:
+        statuses = [job.status for job in _jobs.values()]
+    return {status: statuses.count(status) for status in ("queued", "running", "done", "cancelled")}
+
+
+# -------------------------------
+# 5단계 분석 작업
+# -------------------------------
+def _stage5_steps(df, y_col, x_cols, scope) -> list:
+    """[(이름, 저장소 키, 계산 함수)]. 키·계산은 화면(step5_1~3)의 result_store.cached_result 호출과 같습니다."""
+    signature, filters = scope["signature"], scope["filters"]
+
+    def step(label, stage, x, compute, params=None):
+        key = result_store.make_key(signature, y_col, x, filters, stage, params)
+        return label, key, lambda: result_store.cached_result(stage, y_col, x, compute, params=params, scope=scope)
+
+    steps = [step("선형 회귀 (OLS / ElasticNet)", "linear", x_cols, lambda: compute_linear_models(df, y_col, x_cols))]
+
+    # perform_linear_regression의 상관 히트맵과 같은 열
+    corr_cols = [c for c in [y_col] + list(x_cols)
+                 if pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])]
+    if len(corr_cols) > 1:
+        for method, label in (("pearson", "Pearson"), ("spearman", "Spearman"), ("kendall", "Kendall")):
+            steps.append(step(f"상관계수 ({label})", "corr", x_cols,
+                              lambda method=method: df[corr_cols].corr(method=method), {"method": method}))
+        steps.append(step("거리 상관 (dCor)", "corr", x_cols,
+                          lambda: compute_dcor_matrix(df[corr_cols], corr_cols), {"method": "dcor"}))
+
+    numeric_x_cols = df[x_cols].select_dtypes(include=np.number).columns.tolist()
+    if numeric_x_cols:
+        def _ml():
+            # perform_ml_analysis_and_simulator와 같은 분할, 세션 캐시는 스크립트 스레드 전용이라 원본 함수 호출
+            X_train, X_test, y_train, y_test = train_test_split(
+                df[numeric_x_cols], df[y_col], test_size=0.2, random_state=42)
+            return train_compare_models.__wrapped__(X_train, y_train, X_test, y_test)
+
+        steps += [
+            step("머신러닝 모델 비교", "ml", numeric_x_cols, _ml),
+            step("다중공선성 (VIF)", "vif", numeric_x_cols, lambda: compute_vif(df, numeric_x_cols)),
+            step("LASSO 변수 선택", "lasso", numeric_x_cols, lambda: compute_lasso_importance(df, numeric_x_cols, y_col)),
+            step("SHAP 기여도", "shap", numeric_x_cols, lambda: compute_shap_importance(df, numeric_x_cols, y_col)),
+        ]
+    return steps
+
+
+def submit_stage5(df, y_col, x_cols):
+    """
+    큰 데이터(BACKGROUND_MIN_ROWS 이상)면 5단계 분석 작업을 등록하고 Job을 돌려줍니다.
+    작은 데이터, 정제 전(저장소 범위 없음), 또는 모든 단계가 이미 저장소에 있으면 None (화면에서 바로 계산·표시).
+    """
+    scope = result_store.current_scope()
+    if scope is None or len(df) < BACKGROUND_MIN_ROWS:
+        return None
+    key = result_store.make_key(scope["signature"], y_col, x_cols, scope["filters"], "stage5-job")
+    job = get(key)
+    if job is not None:
+        return job
+    steps = [(label, fn) for label, step_key, fn in _stage5_steps(df, y_col, list(x_cols), scope)
+             if not result_store.has(step_key)]
+    if not steps:
+        return None
+    return submit(key, "5단계 데이터 분석", steps)
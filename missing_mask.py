@@ -0,0 +1,193 @@
+import numpy as np
+import pandas as pd
+
+# ==============================
+# 결측 단계 마스크 (셀마다 결측/오류 종류를 4비트 코드로 보관)
+# ==============================
+# 로더는 결측·오류 토큰을 모두 NaN으로 바꾸므로 원래 어떤 값이었는지(빈칸인지, #DIV/0!인지)가 사라집니다.
+# 여기서는 정규화할 때 셀마다 코드를 매겨 원본 문자열 없이 코드만 보관합니다.
+# - 코드: 0 정상, 1 빈칸, 2 1단계(결측 표기), 3 2단계(엑셀 오류), 4 3단계(확장 오류)
+# - 판정: 열의 고유 문자열마다 한 번만 분류한 뒤 셀로 펼침 (factorize → take)
+# - 보관: 코드 두 개를 한 바이트에 (4비트씩) 압축, 결측이 없는 열은 보관하지 않음
+# - 단계별 개수와 결측 지도는 이 코드에서 계산
+
+VALID, BLANK, STAGE1, STAGE2, STAGE3 = 0, 1, 2, 3, 4
+CODE_LABELS = {
+    BLANK: "빈칸",
+    STAGE1: "1단계 (결측 표기)",
+    STAGE2: "2단계 (엑셀 오류)",
+    STAGE3: "3단계 (확장 오류)",
+}
+
+# 토큰은 양끝 공백을 뺀 대문자로 비교
+STAGE1_TOKENS = frozenset({
+    "NA", "N/A", "NAN", "-NAN", "NONE", "NULL", "<NA>",
+    "-", "--", "—",
+    "1.#IND", "1.#QNAN", "-1.#IND", "-1.#QNAN",
+})
+STAGE2_TOKENS = frozenset({
+    "#DIV/0!", "#N/A", "#N/A N/A", "#NA", "#NAME?", "#NUM!", "#REF!", "#VALUE!", "#NODATA",
+})
+STAGE3_TOKENS = frozenset({
+    "#NULL!", "#SPILL!", "#CALC!", "#BUSY!", "#UNKNOWN!", "#FIELD!",
+    "#GETTING_DATA", "#CONNECT!", "#BLOCKED!", "#EXTERNAL!", "#PYTHON!",
+})
+
+# 확대·축소로 바뀌는 행 범위별 블록 요약을 이 개수까지 마스크에 보관
+_MAX_SUMMARIES = 8
+
+
+def classify_text(stripped: pd.Series) -> np.ndarray:
+    """양끝 공백을 뺀 문자열마다 코드 (uint8). 빈 문자열은 빈칸, 토큰은 단계 코드, 나머지는 정상."""
+    upper = stripped.str.upper()
+    codes = np.zeros(len(stripped), dtype=np.uint8)
+    codes[upper.isin(STAGE1_TOKENS).to_numpy()] = STAGE1
+    codes[upper.isin(STAGE2_TOKENS).to_numpy()] = STAGE2
+    codes[upper.isin(STAGE3_TOKENS).to_numpy()] = STAGE3
+    codes[(stripped == "").to_numpy()] = BLANK
+    return codes
+
+
+def _pack(codes: np.ndarray) -> np.ndarray:
+    if len(codes) % 2:
+        codes = np.append(codes, np.uint8(VALID))
+    return (codes[0::2] << 4) | codes[1::2]
+
+
+def _unpack(packed: np.ndarray, n_rows: int) -> np.ndarray:
+    codes = np.empty(len(packed) * 2, dtype=np.uint8)
+    codes[0::2] = packed >> 4
+    codes[1::2] = packed & 0x0F
+    return codes[:n_rows]
+
+
+class MissingMask:
+    """열별 셀 코드. 열 이름은 DataFrame 열 순서와 같게 유지합니다. (hub에서 열 이름을 다듬으면 columns도 교체)"""
+
+    def __init__(self, columns, n_rows: int):
+        self.columns = list(columns)
+        self.n_rows = n_rows
+        self._packed = {}   # 열 위치 -> 4비트 압축 코드 (결측이 없는 열은 없음)
+        self._summaries = {}   # 블록 요약 캐시 (열, 시작, 끝, 블록 수) -> 결과, 코드가 바뀌면 비움
+
+    def update(self, position: int, codes: np.ndarray):
+        """열 코드를 합칩니다. 같은 셀을 여러 번 판정하면 더 구체적인 코드(큰 값)를 유지."""
+        codes = np.asarray(codes, dtype=np.uint8)
+        self._summaries.clear()
+        if position in self._packed:
+            codes = np.maximum(codes, self.codes_at(position))
+        if codes.any():
+            self._packed[position] = _pack(codes)
+        else:
+            self._packed.pop(position, None)
+
+    def update_from_nulls(self, df: pd.DataFrame):
+        """코드가 없는 NaN 셀(파서가 빈칸으로 읽은 셀)을 빈칸으로 기록합니다."""
+        for i in range(df.shape[1]):
+            nulls = df.iloc[:, i].isna().to_numpy()
+            if nulls.any():
+                self.update(i, nulls.astype(np.uint8) * BLANK)
+
+    def codes_at(self, position: int) -> np.ndarray:
+        packed = self._packed.get(position)
+        if packed is None:
+            return np.zeros(self.n_rows, dtype=np.uint8)
+        return _unpack(packed, self.n_rows)
+
+    def codes(self, column) -> np.ndarray:
+        return self.codes_at(self.columns.index(column))
+
+    def _codes_range(self, position: int, start: int, stop: int) -> np.ndarray:
+        """start~stop 행 코드. 압축 배열에서 필요한 바이트만 풉니다."""
+        packed = self._packed.get(position)
+        if packed is None:
+            return np.zeros(stop - start, dtype=np.uint8)
+        first = start // 2
+        codes = _unpack(packed[first:(stop + 1) // 2], stop - first * 2)
+        return codes[start - first * 2:]
+
+    def matrix(self, columns=None) -> np.ndarray:
+        """(행, 열) 코드 배열. 결측 지도용."""
+        columns = self.columns if columns is None else list(columns)
+        return np.column_stack([self.codes(c) for c in columns]) if columns else np.zeros((self.n_rows, 0), np.uint8)
+
+    def stage_counts(self, columns=None) -> pd.DataFrame:
+        """열(행) × 코드(열) 개수표. 결측이 없는 열도 0으로 포함."""
+        columns = self.columns if columns is None else list(columns)
+        counts = {}
+        for c in columns:
+            position = self.columns.index(c)
+            if position in self._packed:
+                tally = np.bincount(self.codes_at(position), minlength=len(CODE_LABELS) + 1)
+            else:
+                tally = np.zeros(len(CODE_LABELS) + 1, dtype=np.int64)
+            counts[c] = {label: int(tally[code]) for code, label in CODE_LABELS.items()}
+        return pd.DataFrame.from_dict(counts, orient="index", columns=list(CODE_LABELS.values()))
+
+    def block_summary(self, columns, start: int, stop: int, n_blocks: int):
+        """
+        start~stop 행을 n_blocks개 이하의 행 블록으로 묶은 요약 (결측 지도용).
+        반환: (블록 시작 행 (블록+1,), 결측 비율 (블록, 열) float32, 가장 많은 코드 (블록, 열) uint8)
+        블록마다 셀을 세지 않고 코드 배열을 (블록, 블록 크기)로 reshape해 한 번에 합산합니다.
+        """
+        key = (tuple(columns), start, stop, n_blocks)
+        if key in self._summaries:
+            return self._summaries[key]
+        n = max(0, stop - start)
+        size = max(1, -(-n // max(1, n_blocks)))
+        n_blocks = -(-n // size)
+        edges = np.minimum(start + np.arange(n_blocks + 1) * size, stop)
+        block_rows = np.diff(edges)
+        fraction = np.zeros((n_blocks, len(columns)), dtype=np.float32)
+        dominant = np.zeros((n_blocks, len(columns)), dtype=np.uint8)
+        for j, c in enumerate(columns):
+            position = self.columns.index(c)
+            if position not in self._packed:
+                continue
+            # 마지막 블록은 정상(0)으로 채워 크기를 맞춘 뒤 실제 행 수로 나눔
+            codes = self._codes_range(position, start, stop)
+            blocks = np.pad(codes, (0, n_blocks * size - n)).reshape(n_blocks, size)
+            missing = np.count_nonzero(blocks, axis=1)
+            fraction[:, j] = missing / block_rows
+            top = int(codes.max()) if n else VALID
+            if top <= BLANK:
+                dominant[:, j] = np.where(missing > 0, top, VALID)
+                continue
+            # 코드별 개수는 열에 나오는 가장 큰 코드까지만 셈 (빈칸만 있는 열은 위에서 끝남)
+            counts = np.stack([np.count_nonzero(blocks == code, axis=1) for code in range(BLANK, top + 1)], axis=1)
+            dominant[:, j] = np.where(missing > 0, counts.argmax(axis=1) + BLANK, VALID)
+        if len(self._summaries) >= _MAX_SUMMARIES:
+            self._summaries.pop(next(iter(self._summaries)))
+        self._summaries[key] = (edges, fraction, dominant)
+        return edges, fraction, dominant
+
+    def rows_from(self, start: int) -> "MissingMask":
+        """start 행부터의 마스크 (새 MissingMask)."""
+        out = MissingMask(self.columns, max(0, self.n_rows - start))
+        for position in self._packed:
+            out.update(position, self.codes_at(position)[start:])
+        return out
+
+    def append(self, other: "MissingMask"):
+        """뒤에 추가된 행(other, 같은 열 순서)의 코드를 이어 붙입니다."""
+        self._summaries.clear()
+        positions = set(self._packed) | set(other._packed)
+        merged = {p: np.concatenate([self.codes_at(p), other.codes_at(p)]) for p in positions}
+        self.n_rows += other.n_rows
+        self._packed = {p: _pack(codes) for p, codes in merged.items() if codes.any()}
+
+    @property
+    def nbytes(self) -> int:
+        return sum(packed.nbytes for packed in self._packed.values())
+
+    # --- 업로드 캐시 저장용 ---
+    def to_arrays(self) -> dict:
+        arrays = {f"c{position}": packed for position, packed in self._packed.items()}
+        arrays["n_rows"] = np.array([self.n_rows])
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, columns, arrays) -> "MissingMask":
+        mask = cls(columns, int(arrays["n_rows"][0]))
+        mask._packed = {int(name[1:]): arrays[name] for name in arrays if name.startswith("c")}
+        return mask
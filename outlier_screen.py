@@ -0,0 +1,369 @@
+"""
+이상치 점검 (중앙값/MAD 또는 분위수 경계, 청크 단위로 한 번만 읽음)
+
+메모리에 다 올릴 수 없는 파일도 청크 단위로 경계를 계산하고 걸러 Parquet으로 저장할 수 있습니다.
+
+사용 예:
+    python outlier_screen.py data/unit01.parquet --columns 온도 압력 --method mad --k 3.5 --action drop --out screened.parquet
+"""
+import os
+import sys
+import math
+import argparse
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# ==============================
+# 이상치 점검 (모델링 전 선택 단계)
+# ==============================
+# 센서 이상으로 튄 값 몇 개가 OLS 계수와 R² 등급을 좌우하지 않도록 경계를 벗어난 값을 표시·제외·자르기 합니다.
+# - 경계: 열마다 분위수 스케치를 청크 단위로 누적해 데이터를 한 번만 읽고 계산
+#   · MAD: 중앙값 ± k × 1.4826 × MAD
+#   · 분위수(IQR): Q1 − k × IQR ~ Q3 + k × IQR
+# - 스케치: 열마다 크기가 정해진 가중 표본 (KLL 방식 압축). 값이 SKETCH_SIZE개 이하인 열은 정확한 값
+# - 적용: 표시만(개수만 집계) / 행 제외 / 경계값으로 자르기
+
+CHUNK_ROWS = int(float(os.environ.get("ANALYZER_OUTLIER_CHUNK_ROWS", "200000")))
+SKETCH_SIZE = int(float(os.environ.get("ANALYZER_OUTLIER_SKETCH_SIZE", "4096")))
+
+METHODS = {
+    "mad": "중앙값 ± k·MAD",
+    "iqr": "분위수 (Q1/Q3 ± k·IQR)",
+}
+DEFAULT_K = {"mad": 3.5, "iqr": 1.5}
+ACTIONS = {
+    "flag": "표시만",
+    "drop": "행 제외",
+    "clip": "경계값으로 자르기",
+}
+# 정규분포에서 MAD를 표준편차 척도로 맞추는 상수
+_MAD_SCALE = 1.4826
+# 파일로 저장할 때 '표시만'이면 추가하는 열
+FLAG_COLUMN = "이상치"
+
+
+def numeric_columns(df: pd.DataFrame) -> list:
+    """점검 대상이 될 수 있는 수치형 열 (bool 제외)."""
+    return [
+        col for col, dtype in df.dtypes.items()
+        if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+    ]
+
+
+# -------------------------------
+# 분위수 스케치
+# -------------------------------
+class QuantileSketch:
+    """
+    한 열의 근사 분위수. 단계 i의 값은 가중치 2^i를 가지며, 단계가 SKETCH_SIZE를 넘으면
+    정렬 후 하나 건너 하나씩(시작 위치는 무작위) 남겨 다음 단계로 올립니다.
+    """
+
+    def __init__(self, size: int = SKETCH_SIZE, seed: int = 0):
+        self.size = size
+        self.count = 0
+        self._levels = []
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values: np.ndarray):
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.count += len(values)
+        level = 0
+        if len(values) > self.size:
+            # 큰 청크는 한 번 정렬한 뒤 2^level 간격으로 건너뛰어 바로 해당 단계에 넣음 (반복 압축과 같은 결과)
+            level = math.ceil(math.log2(len(values) / self.size))
+            step = 2 ** level
+            values = np.sort(values)[self._rng.integers(step)::step]
+        self._add(level, values)
+        return self
+
+    def _add(self, level: int, values: np.ndarray):
+        while len(self._levels) <= level:
+            self._levels.append(np.empty(0))
+        self._levels[level] = np.concatenate([self._levels[level], values])
+        while len(self._levels[level]) > self.size:
+            full = np.sort(self._levels[level])
+            self._levels[level] = np.empty(0)
+            level += 1
+            if len(self._levels) <= level:
+                self._levels.append(np.empty(0))
+            self._levels[level] = np.concatenate([self._levels[level], full[self._rng.integers(2)::2]])
+
+    def _weighted(self):
+        items = np.concatenate(self._levels) if self._levels else np.empty(0)
+        weights = np.concatenate([np.full(len(v), 2.0 ** i) for i, v in enumerate(self._levels)]) if self._levels else np.empty(0)
+        return items, weights
+
+    @staticmethod
+    def _weighted_quantiles(items, weights, qs):
+        order = np.argsort(items, kind="stable")
+        cumulative = np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative, np.asarray(qs) * cumulative[-1], side="left")
+        return items[order][np.minimum(positions, len(items) - 1)]
+
+    def summary(self) -> dict:
+        """개수, Q1, 중앙값, Q3, MAD. 값이 없으면 개수 외에는 NaN."""
+        if self.count == 0:
+            return {"count": 0, "q1": np.nan, "median": np.nan, "q3": np.nan, "mad": np.nan}
+        items, weights = self._weighted()
+        q1, median, q3 = self._weighted_quantiles(items, weights, [0.25, 0.5, 0.75])
+        # MAD는 같은 가중 표본에서 |값 − 중앙값|의 가중 중앙값으로 근사
+        mad = self._weighted_quantiles(np.abs(items - median), weights, [0.5])[0]
+        return {"count": self.count, "q1": q1, "median": median, "q3": q3, "mad": mad}
+
+
+class OutlierProfile:
+    """열별 분위수 스케치. update(청크)로 누적하고 summary()로 열별 요약표를 얻습니다."""
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.n_rows = 0
+        self._sketches = {col: QuantileSketch() for col in self.columns}
+
+    def update(self, chunk: pd.DataFrame):
+        self.n_rows += len(chunk)
+        for col in self.columns:
+            values = pd.to_numeric(chunk[col], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+            self._sketches[col].update(values)
+        return self
+
+    def summary(self) -> pd.DataFrame:
+        return pd.DataFrame.from_dict(
+            {col: sketch.summary() for col, sketch in self._sketches.items()},
+            orient="index", columns=["count", "q1", "median", "q3", "mad"]
+        ).astype({"count": np.int64})
+
+
+# -------------------------------
+# 청크 읽기 / 경계
+# -------------------------------
+def iter_chunks(source, columns=None, chunk_rows: int = CHUNK_ROWS, dtype=None):
+    """DataFrame 또는 파일 경로(.parquet / .csv)를 chunk_rows행씩 DataFrame으로 돌려줍니다.
+    dtype은 CSV에만 적용됩니다 (read_csv의 dtype)."""
+    if isinstance(source, pd.DataFrame):
+        frame = source if columns is None else source[list(columns)]
+        for start in range(0, len(frame), chunk_rows):
+            yield frame.iloc[start:start + chunk_rows]
+        return
+    if str(source).lower().endswith(".parquet"):
+        if pq is None:
+            raise ImportError("Parquet 파일을 읽으려면 pyarrow가 필요합니다.")
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+        return
+    yield from pd.read_csv(source, usecols=columns, chunksize=chunk_rows, dtype=dtype)
+
+
+def fit_profile(source, columns, chunk_rows: int = CHUNK_ROWS) -> OutlierProfile:
+    """데이터를 한 번 읽어 열별 스케치를 만듭니다."""
+    profile = OutlierProfile(columns)
+    for chunk in iter_chunks(source, columns, chunk_rows):
+        profile.update(chunk)
+    return profile
+
+
+def bounds(summary: pd.DataFrame, method: str = "mad", k: float = None) -> pd.DataFrame:
+    """열별 하한·상한. 척도(MAD·IQR)가 0이거나 값이 없는 열은 NaN (점검하지 않음)."""
+    k = DEFAULT_K[method] if k is None else k
+    if method == "mad":
+        center, scale = summary["median"], _MAD_SCALE * summary["mad"]
+        lower, upper = center - k * scale, center + k * scale
+    elif method == "iqr":
+        scale = summary["q3"] - summary["q1"]
+        lower, upper = summary["q1"] - k * scale, summary["q3"] + k * scale
+    else:
+        raise ValueError(f"알 수 없는 경계 방법: {method}")
+    valid = scale > 0
+    return pd.DataFrame({"lower": lower.where(valid), "upper": upper.where(valid)})
+
+
+# -------------------------------
+# 적용
+# -------------------------------
+def screen_chunk(chunk: pd.DataFrame, limits: pd.DataFrame, action: str):
+    """
+    청크 하나에 경계를 적용합니다.
+    반환: (결과 청크, 열별 [아래 이탈 수, 위 이탈 수] 배열, 이상치가 있는 행 bool 배열)
+    """
+    counts = np.zeros((len(limits), 2), dtype=np.int64)
+    flagged = np.zeros(len(chunk), dtype=bool)
+    clipped = {}
+    for i, (col, lower, upper) in enumerate(limits.itertuples()):
+        if np.isnan(lower):
+            continue
+        s = chunk[col]
+        low, high = (s < lower).to_numpy(), (s > upper).to_numpy()
+        counts[i] = low.sum(), high.sum()
+        flagged |= low | high
+        if action == "clip" and counts[i].any():
+            if pd.api.types.is_integer_dtype(s.dtype):
+                # 정수 열은 경계를 안쪽 정수로 맞춰 dtype 유지
+                lower, upper = math.ceil(lower), math.floor(upper)
+            clipped[col] = s.clip(lower, upper)
+
+    if action == "drop":
+        chunk = chunk[~flagged]
+    elif action == "clip" and clipped:
+        chunk = chunk.assign(**clipped)
+    return chunk, counts, flagged
+
+
+def _report(limits, counts, rows_in, rows_flagged, action) -> dict:
+    table = limits.rename(columns={"lower": "하한", "upper": "상한"})
+    table["아래 이탈"] = counts[:, 0]
+    table["위 이탈"] = counts[:, 1]
+    table["이탈 비율(%)"] = (counts.sum(axis=1) / rows_in * 100) if rows_in else 0.0
+    rows_out = rows_in - rows_flagged if action == "drop" else rows_in
+    return {"table": table, "rows_in": int(rows_in), "rows_flagged": int(rows_flagged), "rows_out": int(rows_out)}
+
+
+def apply_screen(df: pd.DataFrame, settings: dict, summary: pd.DataFrame = None):
+    """
+    메모리의 DataFrame에 이상치 점검 설정 {"method", "k", "action", "columns"}을 적용합니다.
+    summary(열별 요약표)를 주면 스케치 계산을 건너뜁니다. 반환: (결과 DataFrame, 보고서 dict)
+    """
+    columns = [c for c in settings["columns"] if c in df.columns]
+    if summary is None:
+        summary = fit_profile(df, columns).summary()
+    limits = bounds(summary.loc[columns], settings["method"], settings.get("k"))
+    df_out, counts, flagged = screen_chunk(df, limits, settings["action"])
+    return df_out, _report(limits, counts, len(df), int(flagged.sum()), settings["action"])
+
+
+# CSV 청크별로 추론된 dtype을 넓혀 합칠 때의 종류 → (Parquet 타입, read_csv dtype)
+_CSV_KINDS = {
+    "bool": (pa.bool_() if pa else None, None),
+    "int": (pa.int64() if pa else None, np.int64),
+    "float": (pa.float64() if pa else None, np.float64),
+    "str": (pa.string() if pa else None, str),
+}
+
+
+def _csv_kind(s: pd.Series) -> str:
+    if pd.api.types.is_bool_dtype(s.dtype):
+        return "bool"
+    if pd.api.types.is_integer_dtype(s.dtype):
+        return "int"
+    if pd.api.types.is_float_dtype(s.dtype):
+        return "float"
+    return "str"
+
+
+def _widen_kind(current, kind: str) -> str:
+    if current is None or current == kind:
+        return kind
+    if {current, kind} <= {"int", "float"}:
+        return "float"
+    return "str"
+
+
+def _fit_with_schema(source, columns, chunk_rows: int):
+    """
+    경계 계산용 스케치와 함께 출력 Parquet 스키마를 정합니다.
+    CSV는 청크마다 추론 dtype이 달라질 수 있어(앞 청크에서 비어 있는 문자열 열, 뒤에서 소수가 나오는 정수 열)
+    첫 번째 읽기에서 모든 열의 dtype을 넓혀 모으고, 두 번째 읽기는 그 dtype으로 고정합니다.
+    반환: (OutlierProfile, pyarrow 스키마, CSV용 read_csv dtype 또는 None)
+    """
+    if isinstance(source, pd.DataFrame):
+        return fit_profile(source, columns, chunk_rows), pa.Schema.from_pandas(source, preserve_index=False), None
+    if str(source).lower().endswith(".parquet"):
+        schema = pq.ParquetFile(source).schema_arrow
+        index_columns = {c for c in (schema.pandas_metadata or {}).get("index_columns", []) if isinstance(c, str)}
+        schema = pa.schema([f for f in schema if f.name not in index_columns])
+        return fit_profile(source, columns, chunk_rows), schema, None
+
+    profile = OutlierProfile(columns)
+    kinds = {}
+    for chunk in iter_chunks(source, chunk_rows=chunk_rows):
+        profile.update(chunk)
+        for col in chunk.columns:
+            kinds[col] = _widen_kind(kinds.get(col), _csv_kind(chunk[col]))
+    schema = pa.schema([(col, _CSV_KINDS[kind][0]) for col, kind in kinds.items()])
+    dtype = {col: _CSV_KINDS[kind][1] for col, kind in kinds.items() if _CSV_KINDS[kind][1] is not None}
+    return profile, schema, dtype
+
+
+def _to_numeric(s: pd.Series) -> pd.Series:
+    """점검 열을 numpy 수치 dtype으로. (Parquet의 Int64 등 pd.NA가 있는 확장 dtype은 NaN 실수로)"""
+    s = pd.to_numeric(s, errors="coerce")
+    if isinstance(s.dtype, np.dtype):
+        return s
+    if not s.hasnans:
+        return s.astype(s.dtype.numpy_dtype)
+    return pd.Series(s.to_numpy(dtype=np.float64, na_value=np.nan), index=s.index, name=s.name)
+
+
+def _screened_type(source_type, complete: bool):
+    """점검 열의 출력 타입. 수치로 바꿔 읽으므로 실수, 결측 없는 정수 열만 정수 유지 (자르기도 정수 경계)."""
+    if pa.types.is_floating(source_type) or (pa.types.is_integer(source_type) and complete):
+        return source_type
+    return pa.float64()
+
+
+def screen_file(source, out_path: str, settings: dict, chunk_rows: int = CHUNK_ROWS) -> dict:
+    """
+    파일을 두 번(경계 계산 / 적용) 청크 단위로 읽어 결과를 Parquet으로 저장합니다.
+    '표시만'이면 행을 그대로 두고 FLAG_COLUMN(bool) 열을 추가합니다. 반환: 보고서 dict
+    """
+    if pq is None:
+        raise ImportError("Parquet 파일로 저장하려면 pyarrow가 필요합니다.")
+    columns = list(settings["columns"])
+    profile, schema, dtype = _fit_with_schema(source, columns, chunk_rows)
+    summary = profile.summary()
+    limits = bounds(summary, settings["method"], settings.get("k"))
+    complete = summary["count"] == profile.n_rows
+    schema = pa.schema([pa.field(f.name, _screened_type(f.type, complete[f.name])) if f.name in columns else f
+                        for f in schema])
+    if settings["action"] == "flag":
+        schema = schema.append(pa.field(FLAG_COLUMN, pa.bool_()))
+
+    counts = np.zeros((len(limits), 2), dtype=np.int64)
+    rows_in = rows_flagged = 0
+    writer = pq.ParquetWriter(out_path, schema)
+    try:
+        for chunk in iter_chunks(source, chunk_rows=chunk_rows, dtype=dtype):
+            chunk = chunk.assign(**{col: _to_numeric(chunk[col]) for col in columns})
+            out, chunk_counts, flagged = screen_chunk(chunk, limits, settings["action"])
+            if settings["action"] == "flag":
+                out = out.assign(**{FLAG_COLUMN: flagged})
+            counts += chunk_counts
+            rows_in += len(chunk)
+            rows_flagged += int(flagged.sum())
+            writer.write_table(pa.Table.from_pandas(out, schema=schema, preserve_index=False))
+    finally:
+        writer.close()
+    return _report(limits, counts, rows_in, rows_flagged, settings["action"])
+
+
+# -------------------------------
+# CLI
+# -------------------------------
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="청크 단위 이상치 점검 (메모리보다 큰 파일용)")
+    parser.add_argument("path", help="CSV/Parquet 파일 경로")
+    parser.add_argument("--columns", nargs="+", required=True, help="점검할 수치형 열")
+    parser.add_argument("--method", choices=list(METHODS), default="mad", help="경계 방법 (기본: mad)")
+    parser.add_argument("--k", type=float, help="경계 배수 (기본: mad 3.5, iqr 1.5)")
+    parser.add_argument("--action", choices=list(ACTIONS), default="flag",
+                        help=f"flag=표시 열 추가, drop=행 제외, clip=경계값으로 자르기 (기본: flag → '{FLAG_COLUMN}' 열)")
+    parser.add_argument("--out", required=True, help="결과 Parquet 파일 경로")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help=f"청크 행 수 (기본: {CHUNK_ROWS})")
+    args = parser.parse_args(argv)
+
+    settings = {"method": args.method, "k": args.k, "action": args.action, "columns": args.columns}
+    report = screen_file(args.path, args.out, settings, args.chunk_rows)
+    print(report["table"].to_string())
+    print(f"입력 {report['rows_in']:,}행 · 이상치가 있는 행 {report['rows_flagged']:,}행 → 저장 {report['rows_out']:,}행 ({args.out})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
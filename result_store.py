@@ -0,0 +1,214 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+import joblib
+import streamlit as st
+
+# ==============================
+# 분석 결과 저장소 (세션·서버 재시작과 무관하게 디스크에 보관)
+# ==============================
+# 같은 데이터·같은 Y/X·같은 필터로 다시 분석하면 학습/계산 없이 저장된 결과를 바로 불러옵니다.
+# - 키: (df_ready 시그니처, Y, X 목록, 범주 필터, 분석 단계, 단계별 파라미터)
+# - 색인: SQLite (results.sqlite), 값: 키별 joblib 파일 (sklearn 모델·DataFrame 포함 가능)
+# - 만료: 생성 후 TTL이 지나면 삭제, 전체 크기가 상한을 넘으면 가장 오래 사용하지 않은 항목부터 삭제 (LRU)
+
+STORE_DIR = os.environ.get(
+    "ANALYZER_RESULT_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "results"),
+)
+MAX_STORE_BYTES = int(float(os.environ.get("ANALYZER_RESULT_MAX_MB", "4096")) * 1024 * 1024)
+TTL_SECONDS = float(os.environ.get("ANALYZER_RESULT_TTL_HOURS", "168")) * 3600
+
+# 저장 형식이나 분석 로직이 바뀌면 올려서 이전 결과를 무효화
+_STORE_VERSION = 1
+_DB_FILE = "results.sqlite"
+_lock = threading.Lock()
+# get()의 미스 표시 (None도 저장된 결과일 수 있으므로 별도 객체로 구분)
+_MISS = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    signature TEXT, y TEXT, x TEXT, filters TEXT, stage TEXT, params TEXT,
+    bytes INTEGER, created REAL, last_used REAL, hits INTEGER DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results(last_used);
+CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER);
+"""
+
+
+@contextmanager
+def _db():
+    """색인 DB 연결 (블록이 끝나면 commit 후 닫음)."""
+    os.makedirs(STORE_DIR, exist_ok=True)
+    conn = sqlite3.connect(os.path.join(STORE_DIR, _DB_FILE), timeout=30)
+    try:
+        conn.executescript(_SCHEMA)
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def _blob_path(key: str) -> str:
+    return os.path.join(STORE_DIR, f"{key}.joblib")
+
+
+def _remove_blob(key: str):
+    path = _blob_path(key)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _bump(conn, **increments):
+    for name, inc in increments.items():
+        conn.execute(
+            "INSERT INTO stats(name, value) VALUES(?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, inc),
+        )
+
+
+def _canonical(value) -> str:
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, default=str)
+
+
+def make_key(signature, y_column, x_columns, filters, stage, params=None) -> str:
+    """결과 키. X는 입력 순서를 유지합니다. (열 순서가 달라지면 모델 결과도 미세하게 달라짐)"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"v{_STORE_VERSION}".encode())
+    for part in (signature, y_column, list(x_columns), filters or {}, stage, params or {}):
+        h.update(b"\x00" + _canonical(part).encode("utf-8"))
+    return h.hexdigest()
+
+
+def current_scope():
+    """현재 세션의 (df_ready 시그니처, 적용된 범주 필터). 정제 전이면 None."""
+    signature = st.session_state.get("df_ready_sig")
+    if not signature:
+        return None
+    filters = st.session_state.get("applied_filter_spec") if st.session_state.get("current_filtered_df_key") else None
+    return {"signature": signature, "filters": filters or {}}
+
+
+def get(key: str, default=None):
+    """저장된 결과를 꺼냅니다. 없거나 만료됐으면 default."""
+    now = time.time()
+    with _lock, _db() as conn:
+        row = conn.execute("SELECT created FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None or now - row[0] > TTL_SECONDS or not os.path.exists(_blob_path(key)):
+            if row is not None:
+                conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                _remove_blob(key)
+                _bump(conn, expired=1)
+            _bump(conn, misses=1)
+            return default
+        try:
+            value = joblib.load(_blob_path(key))
+        except Exception:
+            # 깨진 항목은 지우고 미스로 처리
+            conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            _remove_blob(key)
+            _bump(conn, misses=1)
+            return default
+        conn.execute("UPDATE results SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+        _bump(conn, hits=1)
+    return value
+
+
+def has(key: str) -> bool:
+    """저장된 결과가 있는지만 확인합니다. (값을 불러오지 않고 적중/미스 통계도 바꾸지 않음)"""
+    if not os.path.exists(os.path.join(STORE_DIR, _DB_FILE)):
+        return False
+    with _lock, _db() as conn:
+        row = conn.execute("SELECT created FROM results WHERE key = ?", (key,)).fetchone()
+    return row is not None and time.time() - row[0] <= TTL_SECONDS and os.path.exists(_blob_path(key))
+
+
+def put(key: str, value, signature, y_column, x_columns, filters, stage, params=None) -> bool:
+    """결과를 저장합니다. 직렬화할 수 없는 값이면 False."""
+    os.makedirs(STORE_DIR, exist_ok=True)
+    path = _blob_path(key)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        joblib.dump(value, tmp_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+    os.replace(tmp_path, path)
+
+    now = time.time()
+    with _lock, _db() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO results(key, signature, y, x, filters, stage, params, bytes, created, last_used) "
+            "VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, str(signature), str(y_column), _canonical(list(x_columns)), _canonical(filters or {}),
+             stage, _canonical(params or {}), os.path.getsize(path), now, now),
+        )
+        _purge(conn, now)
+    return True
+
+
+def _purge(conn, now: float):
+    """TTL이 지난 항목을 지우고, 전체 크기가 상한을 넘으면 오래 사용하지 않은 항목부터 삭제."""
+    expired = [k for (k,) in conn.execute("SELECT key FROM results WHERE created < ?", (now - TTL_SECONDS,))]
+    for key in expired:
+        conn.execute("DELETE FROM results WHERE key = ?", (key,))
+        _remove_blob(key)
+
+    total = conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM results").fetchone()[0]
+    evicted = 0
+    if total > MAX_STORE_BYTES:
+        for key, size in conn.execute("SELECT key, bytes FROM results ORDER BY last_used").fetchall():
+            if total <= MAX_STORE_BYTES:
+                break
+            conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            _remove_blob(key)
+            total -= size
+            evicted += 1
+    if expired or evicted:
+        _bump(conn, expired=len(expired), evictions=evicted)
+
+
+def cached_result(stage: str, y_column, x_columns, compute, params=None, scope=None):
+    """
+    저장소에 결과가 있으면 불러오고, 없으면 compute()로 계산해 저장합니다.
+    scope(시그니처·필터)를 알 수 없으면(정제 전, 배치 실행 등) 저장소를 거치지 않고 바로 계산합니다.
+    """
+    scope = scope or current_scope()
+    if scope is None:
+        return compute()
+    key = make_key(scope["signature"], y_column, x_columns, scope["filters"], stage, params)
+    value = get(key, _MISS)
+    if value is _MISS:
+        value = compute()
+        put(key, value, scope["signature"], y_column, x_columns, scope["filters"], stage, params)
+    return value
+
+
+def store_stats() -> dict:
+    """저장소 적중률/용량 요약."""
+    if not os.path.exists(os.path.join(STORE_DIR, _DB_FILE)):
+        stats, entries, size = {}, 0, 0
+    else:
+        with _lock, _db() as conn:
+            stats = dict(conn.execute("SELECT name, value FROM stats").fetchall())
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM results").fetchone()
+    hits = stats.get("hits", 0)
+    misses = stats.get("misses", 0)
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / (hits + misses) if (hits + misses) else 0.0,
+        "evictions": stats.get("evictions", 0),
+        "expired": stats.get("expired", 0),
+        "entries": entries,
+        "bytes": size,
+        "max_bytes": MAX_STORE_BYTES,
+        "ttl_hours": TTL_SECONDS / 3600,
+    }
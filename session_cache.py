@@ -0,0 +1,187 @@
+import os
+import sys
+import pickle
+import hashlib
+import functools
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import streamlit as st
+from fingerprint import fingerprint
+
+# ==============================
+# 세션 범위 계산 캐시 (세션 ID, 데이터 시그니처) 네임스페이스
+# ==============================
+# st.cache_data / st.cache_resource 는 서버 프로세스 전체가 공유하므로 .clear() 하면
+# 동시에 접속한 다른 사용자의 학습 모델·dCor 행렬까지 모두 지워집니다.
+# 여기서는 (세션 ID, df_ready 시그니처)별로 항목을 묶어 초기화 시 해당 세션 것만 지웁니다.
+# - 전체 크기가 상한을 넘으면 가장 오래 사용하지 않은 항목부터 삭제 (LRU, 네임스페이스별 제거 횟수 집계)
+
+MAX_CACHE_BYTES = int(float(os.environ.get("ANALYZER_SESSION_CACHE_MAX_MB", "1024")) * 1024 * 1024)
+# 항목이 없는 네임스페이스 통계를 이 개수 이상 쌓지 않음
+_MAX_IDLE_NAMESPACES = 256
+
+_lock = threading.RLock()
+_entries = OrderedDict()   # (namespace, key) -> (value, size)  ※ 순서 = 최근 사용 순
+_stats = {}                # namespace -> {"entries", "bytes", "hits", "misses", "evictions", "invalidations"}
+
+
+def session_id() -> str:
+    """현재 Streamlit 세션 ID (스크립트 실행 컨텍스트가 없으면 'local')."""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx(suppress_warning=True)
+    except Exception:
+        ctx = None
+    return ctx.session_id if ctx is not None else "local"
+
+
+def current_namespace() -> tuple:
+    """(세션 ID, df_ready 시그니처). 정제 전 단계라 시그니처가 없으면 '-'."""
+    return session_id(), st.session_state.get("df_ready_sig") or "-"
+
+
+def _hash_value(h, value):
+    if isinstance(value, pd.DataFrame):
+        h.update(b"df" + fingerprint(value).encode("utf-8"))
+    elif isinstance(value, pd.Series):
+        h.update(b"s" + repr(value.name).encode("utf-8") + fingerprint(value).encode("utf-8"))
+    elif isinstance(value, np.ndarray):
+        h.update(b"nd")
+        h.update(repr((value.dtype.str, value.shape)).encode("utf-8"))
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        h.update(b"[")
+        for v in value:
+            _hash_value(h, v)
+        h.update(b"]")
+    elif isinstance(value, dict):
+        h.update(b"{")
+        for k in sorted(value, key=repr):
+            _hash_value(h, k)
+            _hash_value(h, value[k])
+        h.update(b"}")
+    else:
+        h.update(repr(value).encode("utf-8"))
+
+
+def _make_key(name: str, args, kwargs) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(name.encode("utf-8"))
+    _hash_value(h, args)
+    _hash_value(h, kwargs)
+    return h.hexdigest()
+
+
+def _sizeof(value) -> int:
+    """항목 크기 추정 (바이트). 직렬화할 수 없으면 얕은 크기."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=False).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=False))
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+def _ns_stats(namespace) -> dict:
+    stats = _stats.get(namespace)
+    if stats is None:
+        stats = _stats[namespace] = {"entries": 0, "bytes": 0, "hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+    return stats
+
+
+def _drop(entry_key, counter: str):
+    namespace = entry_key[0]
+    _, size = _entries.pop(entry_key)
+    stats = _ns_stats(namespace)
+    stats["entries"] -= 1
+    stats["bytes"] -= size
+    stats[counter] += 1
+
+
+def _evict(max_bytes: int):
+    total = sum(s["bytes"] for s in _stats.values())
+    while total > max_bytes and _entries:
+        entry_key, (_, size) = next(iter(_entries.items()))
+        _drop(entry_key, "evictions")
+        total -= size
+
+
+def _prune_idle_stats():
+    idle = [ns for ns, s in _stats.items() if s["entries"] == 0]
+    for ns in idle[:max(0, len(idle) - _MAX_IDLE_NAMESPACES)]:
+        del _stats[ns]
+
+
+def memoize(stage: str, spinner: str = None):
+    """
+    현재 세션·데이터 네임스페이스에 결과를 캐시하는 데코레이터.
+    - 인자는 밑줄(_)로 시작해도 모두 내용 기준으로 해시합니다. (st.cache_data와 다름)
+    - spinner가 있으면 캐시 미스로 실제 계산할 때만 표시합니다.
+    - 원본 함수는 __wrapped__ 로 호출할 수 있습니다.
+    """
+    def decorator(fn):
+        name = f"{stage}:{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            namespace = current_namespace()
+            entry_key = (namespace, _make_key(name, args, kwargs))
+            with _lock:
+                stats = _ns_stats(namespace)
+                if entry_key in _entries:
+                    _entries.move_to_end(entry_key)
+                    stats["hits"] += 1
+                    return _entries[entry_key][0]
+                stats["misses"] += 1
+
+            if spinner:
+                with st.spinner(spinner):
+                    value = fn(*args, **kwargs)
+            else:
+                value = fn(*args, **kwargs)
+
+            size = _sizeof(value)
+            with _lock:
+                stats = _ns_stats(namespace)
+                if entry_key in _entries:
+                    # 같은 세션의 다른 실행이 먼저 넣은 경우 교체
+                    stats["entries"] -= 1
+                    stats["bytes"] -= _entries.pop(entry_key)[1]
+                _entries[entry_key] = (value, size)
+                stats["entries"] += 1
+                stats["bytes"] += size
+                _evict(MAX_CACHE_BYTES)
+            return value
+        return wrapper
+    return decorator
+
+
+def clear_session(session: str = None, keep_signature: str = None) -> int:
+    """세션의 네임스페이스를 비웁니다. (다른 세션 항목은 그대로) 지운 항목 수를 반환."""
+    session = session or session_id()
+    with _lock:
+        targets = [k for k in _entries if k[0][0] == session and k[0][1] != keep_signature]
+        for entry_key in targets:
+            _drop(entry_key, "invalidations")
+        _prune_idle_stats()
+    return len(targets)
+
+
+def cache_stats(session: str = None) -> list:
+    """네임스페이스별 항목 수/크기/적중/제거 통계. session을 주면 해당 세션만."""
+    with _lock:
+        rows = []
+        for (sid, signature), s in _stats.items():
+            if session is not None and sid != session:
+                continue
+            rows.append({"session": sid, "signature": signature, **s})
+    return rows
+
+
+def total_bytes() -> int:
+    with _lock:
+        return sum(s["bytes"] for s in _stats.values())
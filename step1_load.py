@@ -2,79 +2,462 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import re
+import io
+import os
+import codecs
+import time
+import pickle
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import missing_mask
+from missing_mask import MissingMask
+
+# pyarrow가 설치되어 있으면 멀티스레드 컬럼 기반 CSV 파서를 사용 (없으면 pandas C 엔진)
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.compute as pc
+except ImportError:
+    pa = None
+    pa_csv = None
+    pc = None
 
 # -------------------------------
 # 내부 유틸 (결측치/숫자 처리용)
 # -------------------------------
 
-# [FIX-NA] 엑셀/CSV에서 자주 보이는 오류·결측 토큰을 전역 패턴으로 정의
-_NA_TOKENS = [
-    r'#NODATA', r'#DIV/0!', r'#VALUE!', r'#REF!', r'#NAME\?', r'#NULL!',
-    r'N/?A', r'NA', r'NaN', r'nan', r'None', r'NULL', r'—', r'-{1,2}'
-]
-_NA_REGEX = re.compile(r'^\s*(?:' + '|'.join(_NA_TOKENS) + r')\s*$', re.IGNORECASE)
+# [FIX-NA] 엑셀/CSV에서 자주 보이는 오류·결측 토큰은 missing_mask에서 단계별로 정의
+
+def _factorize_text(s: pd.Series):
+    """문자열로 변환한 뒤 고유값 단위로 분해합니다. (codes, 양끝 공백이 제거된 고유값 Series)"""
+    codes, uniques = pd.factorize(s.astype(str), sort=False)
+    return codes, pd.Series(uniques, dtype=object).str.strip()
+
+
+def _nanify_uniques(uniques: pd.Series, unique_codes: np.ndarray = None) -> np.ndarray:
+    """고유값마다 한 번씩만 빈 문자열/오류·결측 토큰 여부를 판정해 NaN으로 바꾼 배열을 반환합니다."""
+    if unique_codes is None:
+        unique_codes = missing_mask.classify_text(uniques)
+    values = uniques.to_numpy(dtype=object).copy()
+    values[unique_codes != missing_mask.VALID] = np.nan
+    return values
 
-def _strip_and_nanify(df: pd.DataFrame) -> pd.DataFrame:
-    """문자열 양끝 공백 제거 + 오류/결측 토큰을 NaN으로 통일."""
+
+def _normalize_text_series(s: pd.Series):
+    """한 열의 문자열 정리 + 토큰 NaN 처리 (셀 단위 regex 대신 factorize → 고유값 판정 → take).
+    반환: (정리된 Series, 셀별 결측 단계 코드)"""
+    codes, uniques = _factorize_text(s)
+    unique_codes = missing_mask.classify_text(uniques)
+    cell_codes = unique_codes.take(codes)
+    cell_codes[s.isna().to_numpy()] = missing_mask.BLANK   # 원래 비어 있던 셀
+    values = _nanify_uniques(uniques, unique_codes).take(codes)
+    return pd.Series(values, index=s.index, name=s.name, dtype=object), cell_codes
+
+
+def _strip_and_nanify(df: pd.DataFrame, mask: MissingMask = None) -> pd.DataFrame:
+    """문자열 양끝 공백 제거 + 오류/결측 토큰을 NaN으로 통일. mask가 있으면 셀별 결측 단계 코드를 기록."""
     out = df.copy()
-    for c in out.columns:
-        if out[c].dtype == object:
-            s = out[c].astype(str).str.strip()
-            s = s.replace({'': np.nan})
-            s = s.apply(lambda x: (np.nan if (isinstance(x, str) and _NA_REGEX.match(x)) else x))
-            out[c] = s
+    object_positions = [i for i in range(out.shape[1]) if out.iloc[:, i].dtype == object]
+    if not object_positions:
+        return out
+
+    # 열끼리는 서로 독립이므로 object 열 전체를 스레드 풀에서 병렬 처리
+    columns = [out.iloc[:, i] for i in object_positions]
+    workers = min(len(columns), os.cpu_count() or 1)
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            normalized = list(executor.map(_normalize_text_series, columns))
+    else:
+        normalized = [_normalize_text_series(c) for c in columns]
+
+    for i, (s, cell_codes) in zip(object_positions, normalized):
+        out.isetitem(i, s)
+        if mask is not None:
+            mask.update(i, cell_codes)
     return out
 
 def _coerce_numeric_series(s: pd.Series) -> pd.Series:
     """쉼표/공백/유니코드 마이너스 등을 정리해 숫자로 강제 변환."""
-    if s.dtype != object:
+    if s.dtype != object and not isinstance(s.dtype, pd.CategoricalDtype):
         return pd.to_numeric(s, errors='coerce')
-    ss = s.astype(str).str.strip()
-    ss = ss.str.replace(',', '', regex=False)          # 천단위 구분 쉼표 제거
-    ss = ss.str.replace('\u2212', '-', regex=False)    # 유니코드 마이너스 → 일반 -
-    ss = ss.replace({'': np.nan})
-    ss = ss.apply(lambda x: np.nan if (isinstance(x, str) and _NA_REGEX.match(x)) else x)
-    return pd.to_numeric(ss, errors='coerce')
+    # 고유값 단위로만 정리/변환한 뒤 원래 위치로 펼침
+    codes, uniques = _factorize_text(s)
+    uniques = uniques.str.replace(',', '', regex=False)          # 천단위 구분 쉼표 제거
+    uniques = uniques.str.replace('\u2212', '-', regex=False)    # 유니코드 마이너스 → 일반 -
+    numeric = pd.to_numeric(pd.Series(_nanify_uniques(uniques), dtype=object), errors='coerce').to_numpy()
+    return pd.Series(numeric.take(codes), index=s.index, name=s.name)
 
 
 # -------------------------------
 # 1) 파일 로더
 # -------------------------------
 
-def load_data(uploaded_file):
-    """파일을 업로드하고 데이터를 로드합니다."""
+# [FIX-3] 파서는 빈칸만 결측으로 읽고, 오류·결측 토큰은 _finalize_text_column에서 단계별로 판정해 NaN으로
+# (파서가 토큰을 바로 NaN으로 바꾸면 결측 단계 정보가 사라짐)
+
+# 인코딩 후보 (우선순위 순) 및 인코딩 감지에 사용할 샘플 크기
+_CSV_ENCODINGS = ['utf-8', 'cp949', 'euc-kr', 'latin1']
+_ENCODING_SAMPLE_BYTES = 64 * 1024
+
+
+def _sniff_encoding(raw: bytes) -> str:
+    """앞부분 바이트 샘플만 디코딩해 보고 인코딩을 추정합니다. (파일 전체를 다시 파싱하지 않음)"""
+    if raw.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    sample = raw[:_ENCODING_SAMPLE_BYTES]
+    if len(raw) > len(sample):
+        # 멀티바이트 문자가 샘플 경계에서 잘리지 않도록 마지막 줄바꿈까지만 사용
+        cut = sample.rfind(b'\n')
+        if cut > 0:
+            sample = sample[:cut]
+    for encoding in _CSV_ENCODINGS:
+        try:
+            sample.decode(encoding)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return 'latin1'
+
+
+def _decode_csv_bytes(raw: bytes, encoding: str):
+    """추정된 인코딩으로 전체를 한 번만 디코딩합니다. 샘플 이후 구간에서 실패하면 다음 후보로 넘어갑니다."""
+    base = 'utf-8' if encoding == 'utf-8-sig' else encoding
+    candidates = [encoding] + _CSV_ENCODINGS[_CSV_ENCODINGS.index(base) + 1:]
+    for candidate in candidates:
+        try:
+            return raw.decode(candidate), candidate
+        except UnicodeDecodeError:
+            continue
+    # latin1은 모든 바이트를 디코딩할 수 있으므로 여기까지 오지 않음
+    return raw.decode('latin1'), 'latin1'
+
+
+def _finalize_text_column(s: pd.Series, thousands: bool = True):
+    """파서가 문자열로 읽은 열에 skipinitialspace / thousands / 결측 토큰 규칙을 적용합니다.
+    thousands=False(엑셀)면 천단위 쉼표를 지우지 않아 "1,234" 같은 문자열은 문자로 남습니다.
+    반환: (열, 셀별 결측 단계 코드)"""
+    # 고유값 단위로 공백·천단위 쉼표 정리 → 숫자 변환, 숫자가 아닌 고유값만 토큰 판정
+    codes, uniques = pd.factorize(s, sort=False)
+    uniques = pd.Series(uniques, dtype=object)
+    stripped = uniques.str.strip()
+    # 엑셀에서 읽은 열은 숫자·문자가 섞여 있으므로 문자열이 아닌 값은 그대로
+    stripped = stripped.where(stripped.notna(), uniques)
+    if thousands:
+        without_commas = stripped.str.replace(',', '', regex=False)
+        stripped_numeric = without_commas.where(without_commas.notna(), stripped)
+    else:
+        stripped_numeric = stripped
+    unique_numeric = pd.to_numeric(stripped_numeric, errors='coerce')
+    unique_codes = np.zeros(len(uniques), dtype=np.uint8)
+    text = np.flatnonzero(unique_numeric.isna().to_numpy())
+    unique_codes[text] = missing_mask.classify_text(stripped.iloc[text])
+
+    nulls = codes < 0
+    cell_codes = unique_codes.take(codes)
+    cell_codes[nulls] = missing_mask.BLANK
+    na_mask = cell_codes != missing_mask.VALID
+
+    # 결측이 아닌 값이 모두 숫자라면 숫자 열로 (C 엔진 thousands=',' 동작)
+    if not (unique_codes == missing_mask.VALID)[text].any():
+        values = unique_numeric.to_numpy()
+        if na_mask.any():
+            values = values.astype(np.float64)
+        numeric = values.take(codes)
+        if na_mask.any():
+            numeric[na_mask] = np.nan
+        return pd.Series(numeric, index=s.index, name=s.name), cell_codes
+    return s.mask(na_mask, np.nan), cell_codes
+
+
+def _finalize_text_columns(df: pd.DataFrame, cell_codes: dict = None, thousands: bool = True) -> pd.DataFrame:
+    """문자열 열마다 _finalize_text_column 적용. cell_codes가 있으면 {열 위치: 셀별 결측 단계 코드} 기록."""
+    for i in range(df.shape[1]):
+        if df.iloc[:, i].dtype == object:
+            column, codes = _finalize_text_column(df.iloc[:, i], thousands)
+            df.isetitem(i, column)
+            if cell_codes is not None:
+                cell_codes[i] = codes
+    return df
+
+
+def _finalize_arrow_column(column):
+    """_finalize_text_column과 같은 규칙을 pyarrow compute로 적용합니다. (셀마다 파이썬 문자열 연산을 하지 않음)"""
+    trimmed = pc.utf8_trim_whitespace(column)
+    upper = pc.utf8_upper(trimmed)
+    cell_codes = np.where(column.is_null().to_numpy(), missing_mask.BLANK, missing_mask.VALID).astype(np.uint8)
+    for code, tokens in ((missing_mask.STAGE1, missing_mask.STAGE1_TOKENS),
+                         (missing_mask.STAGE2, missing_mask.STAGE2_TOKENS),
+                         (missing_mask.STAGE3, missing_mask.STAGE3_TOKENS)):
+        cell_codes[pc.is_in(upper, value_set=pa.array(sorted(tokens))).fill_null(False).to_numpy()] = code
+    cell_codes[pc.equal(trimmed, '').fill_null(False).to_numpy()] = missing_mask.BLANK
+    na_mask = pa.array(cell_codes != missing_mask.VALID)
+    null = pa.scalar(None, pa.string())
+
+    # 천단위 쉼표를 제거했을 때 결측이 아닌 값이 모두 숫자라면 숫자 열로 (정수로 읽히면 정수)
+    cleaned = pc.if_else(na_mask, null, pc.replace_substring(trimmed, ',', ''))
+    for numeric_type in (pa.int64(), pa.float64()):
+        try:
+            return pc.cast(cleaned, numeric_type), cell_codes
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            continue
+    return pc.if_else(na_mask, null, column), cell_codes
+
+
+def _read_csv_arrow(data: bytes, encoding: str, cell_codes: dict = None):
+    """pyarrow 멀티스레드 파서로 CSV를 읽습니다. pandas와 결과가 달라질 수 있는 경우에는 None을 반환합니다.
+    UTF-8이 아닌 인코딩은 pyarrow가 읽으면서 블록 단위로 변환하므로 전체 텍스트 사본을 만들지 않습니다."""
+    # BOM은 pyarrow가 UTF-8 입력에서 건너뜀
+    read_encoding = 'utf8' if encoding in ('utf-8', 'utf-8-sig') else encoding
+    convert_options = dict(
+        null_values=[''],
+        strings_can_be_null=True,
+        quoted_strings_can_be_null=True,
+    )
+
+    # 날짜/시간 자동 변환은 pandas C 엔진과 다르므로, 샘플에서 날짜로 추정된 열은 문자열로 고정
+    sample = data[:_ENCODING_SAMPLE_BYTES]
+    if len(data) > len(sample):
+        sample = sample[:sample.rfind(b'\n') + 1]
+    sample_schema = pa_csv.read_csv(
+        io.BytesIO(sample),
+        read_options=pa_csv.ReadOptions(encoding=read_encoding),
+        convert_options=pa_csv.ConvertOptions(**convert_options),
+    ).schema
+    column_types = {
+        field.name: pa.string() for field in sample_schema
+        if pa.types.is_temporal(field.type)
+    }
+
+    table = pa_csv.read_csv(
+        io.BytesIO(data),
+        read_options=pa_csv.ReadOptions(use_threads=True, encoding=read_encoding),
+        convert_options=pa_csv.ConvertOptions(column_types=column_types, **convert_options),
+    )
+    if any(pa.types.is_binary(f.type) or pa.types.is_large_binary(f.type) for f in table.schema):
+        # 샘플 이후 구간에 UTF-8이 아닌 바이트가 있으면 pyarrow는 바이너리 열로 읽으므로 다음 인코딩 후보로 넘김
+        return None
+    names = table.column_names
+    if len(set(names)) != len(names) or any(not str(n).strip() for n in names):
+        # 중복/빈 헤더는 pandas의 이름 보정 규칙(a.1, Unnamed: n)을 따르도록 C 엔진에 맡김
+        return None
+
+    # 샘플 이후에 날짜로 추정된 열이 남아 있으면 문자열로 되돌림
+    for i, field in enumerate(table.schema):
+        if pa.types.is_temporal(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(pa.string()))
+
+    for i, field in enumerate(table.schema):
+        if pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+            column, codes = _finalize_arrow_column(table.column(i))
+            table = table.set_column(i, field.name, column)
+            if cell_codes is not None:
+                cell_codes[i] = codes
+    return table.to_pandas()
+
+
+def _read_csv_pandas(text: str, cell_codes: dict = None) -> pd.DataFrame:
+    """pandas C 엔진 경로 (pyarrow 미설치 또는 pyarrow로 처리할 수 없는 파일)."""
+    df = pd.read_csv(
+        io.StringIO(text),
+        na_values=[''],
+        keep_default_na=False,
+        skipinitialspace=True,
+        thousands=','   # 천단위 쉼표 인식
+    )
+    return _finalize_text_columns(df, cell_codes)
+
+
+def _format_load_timings(timings: dict, n_rows: int = None) -> str:
+    text = "⏱ " + " · ".join(f"{phase} {sec:.2f}s" for phase, sec in timings.items())
+    parse_sec = next((sec for phase, sec in timings.items() if phase.startswith('파싱')), None)
+    if n_rows and parse_sec:
+        text += f" · 파싱 처리량 {n_rows / parse_sec:,.0f} rows/s"
+    return text
+
+
+# -------------------------------
+# 엑셀: 시트 목록을 먼저 보여주고 선택된 시트만 파싱
+# -------------------------------
+
+def _excel_engine() -> str:
+    """python-calamine(Rust 기반)이 있으면 사용, 없으면 openpyxl(read-only 스트리밍)."""
+    try:
+        import python_calamine  # noqa: F401
+        return 'calamine'
+    except ImportError:
+        return 'openpyxl'
+
+
+def list_excel_sheets(uploaded_file):
+    """시트 이름과 크기(데이터 행 수, 열 수)를 셀을 파싱하지 않고 가져옵니다.
+    크기는 시트의 dimension 정보를 사용하며, 없으면 None."""
+    from openpyxl import load_workbook
+
+    uploaded_file.seek(0)
+    wb = load_workbook(uploaded_file, read_only=True, data_only=True, keep_links=False)
+    try:
+        sheets = []
+        for ws in wb.worksheets:
+            n_rows = ws.max_row - 1 if ws.max_row else None  # 헤더 행 제외
+            sheets.append((ws.title, n_rows, ws.max_column))
+        return sheets
+    finally:
+        wb.close()
+        uploaded_file.seek(0)
+
+
+_XLSX_NS = {
+    'main': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main',
+    'rel': 'http://schemas.openxmlformats.org/package/2006/relationships',
+}
+_XLSX_R_ID = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'
+_XLSX_ERROR_CELL = re.compile(rb'<c\b([^>]*\bt="e"[^>]*)>(.*?)</c>', re.S)
+_XLSX_CELL_REF = re.compile(rb'\br="([A-Z]+)(\d+)"')
+_XLSX_CELL_VALUE = re.compile(rb'<v>([^<]*)</v>')
+
+
+def _xlsx_sheet_xml(zf: zipfile.ZipFile, sheet_name) -> bytes:
+    """시트 이름(또는 순서 번호)에 해당하는 워크시트 XML."""
+    workbook = ET.fromstring(zf.read('xl/workbook.xml'))
+    sheets = workbook.findall('main:sheets/main:sheet', _XLSX_NS)
+    sheet = sheets[sheet_name] if isinstance(sheet_name, int) else next(s for s in sheets if s.get('name') == sheet_name)
+    rels = ET.fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+    target = next(r.get('Target') for r in rels.findall('rel:Relationship', _XLSX_NS) if r.get('Id') == sheet.get(_XLSX_R_ID))
+    return zf.read(target.lstrip('/') if target.startswith('/') else f'xl/{target}')
+
+
+def _excel_error_codes(uploaded_file, sheet_name, shape) -> dict:
+    """
+    엑셀 오류 셀(#DIV/0! 등, 셀 형식이 '오류')의 결측 단계 코드 {열 위치: 셀별 코드}.
+    pandas는 오류 셀을 빈칸과 같은 NaN으로 읽으므로 시트 XML에서 오류 셀만 찾습니다.
+    (머리글이 1행, 데이터가 A열부터 시작하는 시트 기준, 오류 셀이 없으면 바로 반환)
+    """
+    try:
+        uploaded_file.seek(0)
+        with zipfile.ZipFile(uploaded_file) as zf:
+            data = _xlsx_sheet_xml(zf, sheet_name)
+    except (zipfile.BadZipFile, KeyError, StopIteration, IndexError, ET.ParseError):
+        return {}
+    finally:
+        uploaded_file.seek(0)
+    if b't="e"' not in data:
+        return {}
+
+    n_rows, n_cols = shape
+    cells = {}
+    for match in _XLSX_ERROR_CELL.finditer(data):
+        ref, value = _XLSX_CELL_REF.search(match.group(1)), _XLSX_CELL_VALUE.search(match.group(2))
+        if ref is None:
+            continue
+        col = 0
+        for letter in ref.group(1):
+            col = col * 26 + letter - 64
+        row, col = int(ref.group(2)) - 2, col - 1
+        if 0 <= row < n_rows and 0 <= col < n_cols:
+            cells[(row, col)] = value.group(1).decode('utf-8', 'replace') if value else ''
+
+    codes = {}
+    if cells:
+        stages = missing_mask.classify_text(pd.Series(list(cells.values()), dtype=object).str.strip())
+        # 목록에 없는 오류 형식은 3단계(확장 오류)로
+        stages[stages < missing_mask.STAGE2] = missing_mask.STAGE3
+        for ((row, col), stage) in zip(cells, stages):
+            codes.setdefault(col, np.zeros(n_rows, dtype=np.uint8))[row] = stage
+    return codes
+
+
+def _parse_file(uploaded_file, sheet_name, timings: dict, cell_codes: dict = None) -> pd.DataFrame:
+    """CSV/엑셀을 DataFrame으로 파싱만 합니다. (값 정규화 전, 단계별 소요 시간은 timings에 기록)
+    cell_codes가 있으면 CSV 파싱 중 판정한 {열 위치: 셀별 결측 단계 코드}를 기록합니다."""
+    if uploaded_file.name.endswith('.csv'):
+        t0 = time.perf_counter()
+        uploaded_file.seek(0)
+        raw = uploaded_file.read()
+        timings['읽기'] = time.perf_counter() - t0
+
+        # 바이트 샘플로 인코딩만 추정하고, 변환은 pyarrow가 읽으면서 처리
+        encoding = _sniff_encoding(raw)
+
+        t0 = time.perf_counter()
+        decode_sec = 0.0
+        df = None
+        if pa_csv is not None:
+            try:
+                df = _read_csv_arrow(raw, encoding, cell_codes)
+            except (pa.ArrowInvalid, UnicodeDecodeError):
+                # 행마다 열 수가 다른 파일, 샘플 이후 구간의 디코딩 실패 등은 C 엔진으로 재시도
+                df = None
+        if df is None:
+            if cell_codes is not None:
+                cell_codes.clear()
+            # 대체 경로에서만 전체를 파이썬으로 디코딩 (실패하면 다음 인코딩 후보로)
+            t1 = time.perf_counter()
+            text, encoding = _decode_csv_bytes(raw, encoding)
+            decode_sec = time.perf_counter() - t1
+            timings[f'디코딩({encoding})'] = decode_sec
+            try:
+                df = _read_csv_pandas(text, cell_codes)
+            except pd.errors.ParserError as e:
+                raise pd.errors.ParserError(f"(인코딩: {encoding}) {e}") from e
+        timings[f'파싱({encoding})'] = time.perf_counter() - t0 - decode_sec
+    else:
+        # 엑셀도 동일 컨셉: 읽은 뒤 문자열 정리→숫자 강제변환(대상 컬럼)
+        t0 = time.perf_counter()
+        uploaded_file.seek(0)
+        engine = _excel_engine()
+        # 결측 토큰은 문자열로 읽어 단계별로 판정 (빈 셀만 결측)
+        df = pd.read_excel(uploaded_file, sheet_name=sheet_name, engine=engine, keep_default_na=False, na_values=[''])
+        # 엑셀은 원래 천단위 쉼표를 숫자로 읽지 않았으므로 쉼표 정리 없이 판정
+        _finalize_text_columns(df, cell_codes, thousands=False)
+        if cell_codes is not None:
+            for position, codes in _excel_error_codes(uploaded_file, sheet_name, df.shape).items():
+                cell_codes[position] = np.maximum(cell_codes.get(position, codes), codes)
+        timings[f'파싱({engine})'] = time.perf_counter() - t0
+    return df
+
+
+def _build_mask(df: pd.DataFrame, cell_codes: dict, normalize) -> tuple:
+    """파싱 중 판정한 코드로 마스크를 만들고 normalize(df, mask)로 정규화. (정규화된 df, 마스크)"""
+    mask = MissingMask(df.columns, len(df))
+    for position, codes in cell_codes.items():
+        mask.update(position, codes)
+    df = normalize(df, mask)
+    # 파서가 숫자 열로 바로 읽은 열의 결측은 빈칸
+    mask.update_from_nulls(df)
+    return df, mask
+
+
+def read_table(uploaded_file, sheet_name=0, timings: dict = None, with_mask: bool = False):
+    """파싱 + 값 정규화까지 수행한 DataFrame을 돌려줍니다. (Streamlit 비의존, 배치 실행에서도 사용)
+    with_mask=True 이면 (DataFrame, 셀별 결측 단계 마스크)를 돌려줍니다."""
+    if timings is None:
+        timings = {}
+    cell_codes = {}
+    df = _parse_file(uploaded_file, sheet_name, timings, cell_codes)
+
+    # [FIX-3] 값 내부 공백·결측·오류 토큰 정규화 (셀별 결측 단계도 함께 판정)
+    t0 = time.perf_counter()
+    df, mask = _build_mask(df, cell_codes, _strip_and_nanify)
+    timings['정규화'] = time.perf_counter() - t0
+    return (df, mask) if with_mask else df
+
+
+def load_data(uploaded_file, sheet_name=0):
+    """파일을 업로드하고 데이터를 로드합니다. 엑셀은 sheet_name 시트만 읽습니다."""
+    timings = {}
     try:
-        if uploaded_file.name.endswith('.csv'):
-            encodings = ['utf-8', 'cp949', 'euc-kr', 'latin1']
-            df = None
-            for encoding in encodings:
-                try:
-                    uploaded_file.seek(0)
-                    # [FIX-3] 오류 토큰을 바로 NaN으로, 쉼표 천단위도 인식
-                    df = pd.read_csv(
-                        uploaded_file,
-                        encoding=encoding,
-                        na_values=['', ' ', '#NODATA', '#DIV/0!', '#VALUE!', '#REF!', '#NAME?', '#NULL!', 'N/A', 'NA', 'NaN', 'nan', 'None', 'NULL', '-', '--', '—', ' - '],
-                        keep_default_na=True,
-                        skipinitialspace=True,
-                        thousands=','   # 천단위 쉼표 인식
-                    )
-                    break
-                except UnicodeDecodeError:
-                    continue
-                except Exception:
-                    continue
-            if df is None:
-                st.error("지원되는 인코딩으로 파일을 읽을 수 없습니다. 파일 인코딩을 확인해주세요.")
-                return None
-        else:
-            # 엑셀도 동일 컨셉: 읽은 뒤 문자열 정리→숫자 강제변환(대상 컬럼)
-            df = pd.read_excel(uploaded_file)
-
-        # [FIX-3] 값 내부 공백·결측·오류 토큰 정규화
-        df = _strip_and_nanify(df)
+        try:
+            df, mask = read_table(uploaded_file, sheet_name, timings, with_mask=True)
+        except pd.errors.ParserError as e:
+            st.error(f"CSV 파일을 해석할 수 없습니다. 파일 형식을 확인해주세요.\n\n{str(e)}")
+            return None
 
+        st.session_state.load_timings = timings
+        st.session_state.missing_mask = mask
         st.success("파일이 성공적으로 로드되었습니다.")
+        st.caption(_format_load_timings(timings, len(df)))
         return df
     except Exception as e:
         st.error(f"데이터 처리 중 오류가 발생했습니다: {str(e)}")
@@ -84,124 +467,356 @@ def load_data(uploaded_file):
 # 2) 컬럼 타입 분석
 # -------------------------------
 
-def analyze_column_types(df):
-    """각 열의 데이터 타입을 대분류와 소분류로 분석합니다."""
+# 타입 추론 1차 표본 크기 (non-null 값이 이보다 적은 열은 표본 없이 바로 전체 확인)
+_TYPE_SAMPLE_SIZE = 2000
+
+_BOOLEAN_PATTERNS = {'0', '1', '-', 'O', 'X', '', ' - '}
+_DATE_PATTERNS = [
+    r'^\d{4}-\d{1,2}-\d{1,2}$',
+    r'^\d{4}/\d{1,2}/\d{1,2}$',
+    r'^\d{4}\.\d{1,2}\.\d{1,2}$',
+    r'^\d{1,2}/\d{1,2}/\d{4}$',
+    r'^\d{1,2}-\d{1,2}-\d{4}$',
+    r'^\d{4}-\d{1,2}-\d{1,2} \d{1,2}:\d{1,2}:\d{1,2}$',
+    r'^\d{4}-\d{1,2}-\d{1,2} \d{1,2}:\d{1,2}$',
+    r'^\d{4}/\d{1,2}/\d{1,2} \d{1,2}:\d{1,2}:\d{1,2}$',
+    r'^\d{4}/\d{1,2}/\d{1,2} \d{1,2}:\d{1,2}$',
+]
+_FLEXIBLE_DATE_PATTERNS = [
+    r'^\d{4}년\d{1,2}월\d{1,2}일',
+    r'^\d{4}.\d{1,2}.\d{1,2}',
+    r'^\d{1,2}/\d{1,2}/\d{2,4}',
+]
+
+
+def _spread_sample(s: pd.Series, size: int) -> pd.Series:
+    """행 전체 구간(앞/중간/끝)에 고르게 퍼진 위치에서 표본을 뽑습니다."""
+    positions = np.unique(np.linspace(0, len(s) - 1, size).astype(np.int64))
+    return s.iloc[positions]
+
+
+def _normalize_boolean(s: pd.Series) -> pd.Series:
+    """불리언 열 값을 '0'/'1' 문자열로 정규화합니다."""
+    return s.astype(str).str.strip().str.upper().replace({'': '0', '0': '0', '-': '0', 'X': '0', '1': '1', 'O': '1', ' - ': '0'})
+
+
+def _is_boolean_text(t: pd.Series) -> bool:
+    return bool(t.str.strip().str.upper().isin(_BOOLEAN_PATTERNS).all())
+
+
+def _is_digit_text(t: pd.Series) -> bool:
+    return bool(t.str.match(r'^\d+$').all())
+
+
+def _staged_all(check, sample_text, distinct_text) -> bool:
+    """check(문자열 Series)가 열의 모든 값에 대해 참인지 판정합니다.
+    표본은 전체의 부분집합이므로 표본에서 실패하면 전체도 실패 → 전체 확인 생략.
+    표본을 통과한 후보만 전체 고유값으로 확정하므로 결과는 전체 검사와 동일합니다."""
+    if sample_text is not None and not check(sample_text):
+        return False
+    return check(distinct_text())
+
+
+# 병렬 분석: 열 수가 이 값 이상일 때만 프로세스 풀 사용 (작은 파일은 프로세스 기동 비용이 더 큼)
+_PARALLEL_MIN_COLUMNS = 200
+_type_pool = None  # (워커 수, ProcessPoolExecutor)
+
+
+def _classify_column(series: pd.Series, exact: bool = False):
+    """한 열의 타입을 판정합니다.
+    반환: (분석 정보 dict, 분류 목록 이름, 불리언 정규화된 Series 또는 None)"""
+    col_dtype = series.dtype
+    non_null_values = series.dropna()
+
+    if len(non_null_values) == 0:
+        return {'main_category': 'Empty', 'sub_category': 'Empty', 'is_numeric': False}, 'empty', None
+
+    # 1차: 표본으로 후보를 걸러내고, 2차: 남은 후보만 전체 고유값으로 확정
+    sample_text = None
+    if not exact and len(non_null_values) > _TYPE_SAMPLE_SIZE:
+        sample_text = _spread_sample(non_null_values, _TYPE_SAMPLE_SIZE).astype(str)
+
+    distinct = {}  # 고유값은 처음 필요할 때 한 번만 계산
+
+    def distinct_text():
+        if 'text' not in distinct:
+            distinct['text'] = pd.Series(pd.unique(non_null_values.astype(str)), dtype=object)
+        return distinct['text']
+
+    # Boolean 패턴 감지: [0, 1, -, O, X, 공백] 조합만 있는 경우 (모든 타입에서 먼저 확인)
+    if _staged_all(_is_boolean_text, sample_text, distinct_text):
+        # Boolean으로 분류하고 값 정규화 (원본 열 교체는 호출 측에서)
+        normalized = _normalize_boolean(series)
+        return {'main_category': '범주형', 'sub_category': '불리언', 'is_numeric': False}, 'categorical', normalized
+
+    # 정수/실수/날짜/불린: 기존 로직 유지
+    if col_dtype in ['int64', 'int32', 'int16', 'int8']:
+        return {'main_category': '수치형', 'sub_category': '정수', 'is_numeric': True}, 'numeric', None
+
+    if col_dtype in ['float64', 'float32', 'float16']:
+        return {'main_category': '수치형', 'sub_category': '실수', 'is_numeric': True}, 'numeric', None
+
+    if 'datetime' in str(col_dtype):
+        return {'main_category': '날짜형', 'sub_category': '날짜시간', 'is_numeric': False}, 'date', None
+
+    if col_dtype == 'bool':
+        return {'main_category': '범주형', 'sub_category': '불리언', 'is_numeric': False}, 'categorical', None
+
+    # object(문자열/혼합형) 처리
+    # [FIX-2] 카테고리 판단 전에 "숫자 강제 변환"을 먼저 시도
+    coerced = _coerce_numeric_series(series)
+    # non-null 중 몇 %가 숫자로 안전 변환되는지(유연성 확보)
+    convertible_frac = (coerced.notna().sum() / len(non_null_values))
+
+    if convertible_frac >= 0.90:
+        # 숫자로 보는 것이 타당
+        sub = '실수' if ((coerced.dropna() % 1) != 0).any() else '정수'
+        return {'main_category': '수치형', 'sub_category': sub, 'is_numeric': True}, 'numeric', None
+
+    # 날짜 패턴/카테고리/텍스트 판정 로직
+    is_date_like = any(
+        _staged_all(lambda t, p=pattern: bool(t.str.match(p).all()), sample_text, distinct_text)
+        for pattern in _DATE_PATTERNS
+    )
+
+    is_digit = None
+    if not is_date_like:
+        is_digit = _staged_all(_is_digit_text, sample_text, distinct_text)
+        if is_digit:
+            try:
+                numeric_values = distinct_text().astype(float)
+                if (numeric_values >= 42000).all() and (numeric_values <= 48000).all():
+                    is_date_like = True
+            except:
+                pass
+
+    if not is_date_like:
+        is_date_like = any(
+            _staged_all(lambda t, p=pattern: bool(t.str.match(p).all()), sample_text, distinct_text)
+            for pattern in _FLEXIBLE_DATE_PATTERNS
+        )
+
+    if is_date_like:
+        return {'main_category': '날짜형', 'sub_category': '날짜', 'is_numeric': False}, 'datelike', None
+    if len(non_null_values.unique()) / len(non_null_values) < 0.1:
+        return {'main_category': '범주형', 'sub_category': '범주', 'is_numeric': False}, 'categorical', None
+    if is_digit if is_digit is not None else _is_digit_text(distinct_text()):
+        return {'main_category': '범주형', 'sub_category': '식별자', 'is_numeric': False}, 'categorical', None
+    return {'main_category': '범주형', 'sub_category': '텍스트', 'is_numeric': False}, 'categorical', None
+
+
+def _classify_batch(frame: pd.DataFrame, exact: bool):
+    """워커 프로세스용: 열 묶음을 순서대로 판정합니다."""
+    return [_classify_column(frame.iloc[:, i], exact) for i in range(frame.shape[1])]
+
+
+def _get_type_pool(workers: int):
+    """워커 기동 비용을 한 번만 치르도록 프로세스 풀을 재사용합니다."""
+    global _type_pool
+    if _type_pool is None or _type_pool[0] != workers:
+        _shutdown_type_pool()
+        _type_pool = (workers, ProcessPoolExecutor(max_workers=workers))
+    return _type_pool[1]
+
+
+def _shutdown_type_pool():
+    global _type_pool
+    if _type_pool is not None:
+        _type_pool[1].shutdown(wait=False, cancel_futures=True)
+        _type_pool = None
+
+
+def _classify_columns_parallel(df: pd.DataFrame, exact: bool, workers: int):
+    # 워커당 여러 묶음으로 나눠 열마다 다른 처리 시간을 고르게 분산
+    n_batches = min(df.shape[1], workers * 4)
+    batches = [b for b in np.array_split(np.arange(df.shape[1]), n_batches) if len(b)]
+    pool = _get_type_pool(workers)
+    futures = [pool.submit(_classify_batch, df.iloc[:, b], exact) for b in batches]
+    results = []
+    for future in futures:
+        results.extend(future.result())
+    return results
+
+
+def analyze_column_types(df, exact=False, n_jobs=1):
+    """각 열의 데이터 타입을 대분류와 소분류로 분석합니다.
+    exact=True 이면 표본 단계를 건너뛰고 모든 판정을 전체 데이터로 수행합니다.
+    n_jobs != 1 이면 열을 여러 프로세스에 나눠 분석합니다 (-1: 모든 코어)."""
     column_analysis = {}
-    numeric_columns = []
-    categorical_columns = []
-    date_columns = []
-    datelike_columns = []  # 패턴 매칭으로 추정된 날짜형
-    empty_columns = []  # Empty 컬럼들을 별도로 관리
-
-    for col in df.columns:
-        col_dtype = df[col].dtype
-        non_null_values = df[col].dropna()
-
-        if len(non_null_values) == 0:
-            column_analysis[col] = {'main_category': 'Empty', 'sub_category': 'Empty', 'is_numeric': False}
-            empty_columns.append(col)
-            continue
+    buckets = {'numeric': [], 'categorical': [], 'date': [], 'datelike': [], 'empty': []}
+
+    workers = (os.cpu_count() or 1) if n_jobs is None or n_jobs < 0 else n_jobs
+    results = None
+    if workers > 1 and df.shape[1] >= _PARALLEL_MIN_COLUMNS:
+        try:
+            results = _classify_columns_parallel(df, exact, workers)
+        except (BrokenProcessPool, OSError, pickle.PicklingError):
+            # 풀 생성/전송이 불가능한 환경이면 직렬로 계산
+            _shutdown_type_pool()
+            results = None
+    if results is None:
+        results = [_classify_column(df.iloc[:, i], exact) for i in range(df.shape[1])]
+
+    for i, (col, (info, bucket, normalized)) in enumerate(zip(df.columns, results)):
+        column_analysis[col] = info
+        buckets[bucket].append(col)
+        if normalized is not None:
+            # 원본 데이터프레임의 해당 컬럼도 정규화된 값으로 업데이트 (부모 프로세스에서 반영)
+            if isinstance(df.iloc[:, i].dtype, pd.CategoricalDtype):
+                normalized = normalized.astype('category')  # compact_dtypes 결과 유지
+            df.isetitem(i, normalized)
+
+    return (column_analysis, buckets['numeric'], buckets['categorical'],
+            buckets['date'], buckets['datelike'], buckets['empty'])
+
+# -------------------------------
+# 2-1) 메모리 절약: dtype 축소 (선택)
+# -------------------------------
+
+# float32 왕복 오차가 (최대-최소) 범위의 이 비율 이하일 때만 float32로 축소
+_FLOAT32_RTOL = 1e-6
+# 고유값 수 / non-null 수 가 이 값 미만인 범주형 문자열 열만 category로 변환
+_CATEGORY_MAX_RATIO = 0.5
+
+
+def _float32_safe(s: pd.Series) -> bool:
+    """float32로 바꿔도 값 범위 대비 오차가 무시할 수준인지 확인합니다."""
+    values = s.to_numpy(dtype=np.float64)
+    finite = values[np.isfinite(values)]
+    if finite.size == 0:
+        return True
+    if np.abs(finite).max() > np.finfo(np.float32).max:
+        return False
+    error = np.abs(finite.astype(np.float32).astype(np.float64) - finite).max()
+    spread = finite.max() - finite.min()
+    return error == 0 if spread == 0 else error <= _FLOAT32_RTOL * spread
 
-        # Boolean 패턴 감지: [0, 1, -, O, X, 공백] 조합만 있는 경우 (모든 타입에서 먼저 확인)
-        unique_values = set(non_null_values.astype(str).str.strip().str.upper())
-        boolean_patterns = {'0', '1', '-', 'O', 'X', '', ' - '}
-        
-        if unique_values.issubset(boolean_patterns):
-            # Boolean으로 분류하고 값 정규화
-            column_analysis[col] = {'main_category': '범주형', 'sub_category': '불리언', 'is_numeric': False}
-            
-            # 값 정규화: 0/1로 변환
-            normalized_values = non_null_values.astype(str).str.strip().str.upper()
-            normalized_values = normalized_values.replace({'': '0', '0': '0', '-': '0', 'X': '0', '1': '1', 'O': '1', ' - ': '0'})
-            
-            # 원본 데이터프레임의 해당 컬럼도 정규화된 값으로 업데이트
-            df[col] = df[col].astype(str).str.strip().str.upper().replace({'': '0', '0': '0', '-': '0', 'X': '0', '1': '1', 'O': '1', ' - ': '0'})
-            
-            categorical_columns.append(col)
+
+def compact_dtypes(df: pd.DataFrame, column_analysis: dict):
+    """실수 열은 정밀도가 허용될 때 float32로, 고유값이 적은 범주형 문자열 열은 category로 바꿉니다.
+    수치형으로 판정된 문자열 열(콤마 숫자 등)과 날짜형 열은 그대로 둡니다.
+    반환: (압축된 DataFrame, {'before': 바이트, 'after': 바이트, 'columns': 변환된 열 목록})"""
+    before = int(df.memory_usage(deep=True).sum())
+    compacted = df.copy(deep=False)
+    changed = []
+    for i, col in enumerate(df.columns):
+        s = df.iloc[:, i]
+        info = column_analysis.get(col, {})
+        if s.dtype == np.float64:
+            if _float32_safe(s):
+                compacted.isetitem(i, s.astype(np.float32))
+                changed.append(col)
+        elif s.dtype == object and info.get('main_category') == '범주형':
+            n_valid = s.notna().sum()
+            if n_valid and s.nunique(dropna=True) / n_valid < _CATEGORY_MAX_RATIO:
+                compacted.isetitem(i, s.astype('category'))
+                changed.append(col)
+    after = int(compacted.memory_usage(deep=True).sum())
+    return compacted, {'before': before, 'after': after, 'columns': changed}
+
+
+# -------------------------------
+# 2-2) 데이터 추가 (append): 기존 파일 뒤에 행이 추가된 파일에서 새 행만 처리
+# -------------------------------
+
+def _align_appended_column(new: pd.Series, base: pd.Series, info: dict) -> pd.Series:
+    """새 행의 열을 기존 열과 같은 표현(불리언 정규화, dtype)으로 맞춥니다."""
+    if info.get('sub_category') == '불리언' and not pd.api.types.is_bool_dtype(base):
+        new = _normalize_boolean(new)
+    if isinstance(base.dtype, pd.CategoricalDtype):
+        return new.astype(object)
+    if _is_number_dtype(base) and (_is_number_dtype(new) or new.isna().all()):
+        # 새 행이 모두 결측이어도 object로 섞이지 않게 수치 dtype 유지.
+        # 정수 열에 빈칸/소수가 들어오면 실수로 올림 (기존 행은 concat에서 같이 승격)
+        if pd.api.types.is_float_dtype(base):
+            return new.astype(base.dtype)
+        if new.isna().all():
+            return new.astype(np.float64)
+        return new.astype(np.result_type(base.dtype, new.dtype))
+    return new
+
+
+def _is_number_dtype(s: pd.Series) -> bool:
+    return pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s)
+
+
+def _same_row(new: pd.DataFrame, base: pd.DataFrame) -> bool:
+    """겹쳐 읽은 행(new)과 기존 마지막 행(base)이 같은지 비교합니다. (둘 다 1행)
+    수치 열은 값으로 비교하므로 정수 열이 실수로 승격돼도(3 → 3.0) 같은 행으로 봅니다."""
+    for i in range(base.shape[1]):
+        x, y = new.iloc[0, i], base.iloc[0, i]
+        if pd.isna(x) or pd.isna(y):
+            if not (pd.isna(x) and pd.isna(y)):
+                return False
+        elif _is_number_dtype(base.iloc[:, i]):
+            x = pd.to_numeric(pd.Series([x]), errors='coerce').iloc[0]
+            if pd.isna(x) or not np.isclose(float(x), float(y), rtol=_FLOAT32_RTOL, atol=0.0):
+                return False
+        elif str(x) != str(y):
+            return False
+    return True
+
+
+def load_appended_rows(uploaded_file, base_df: pd.DataFrame, column_types: tuple, sheet_name=0):
+    """기존 데이터(base_df) 뒤에 행이 추가된 파일을 읽어 새 행만 정규화/타입 확인합니다.
+    열 구성이 다르거나 기존 행의 연장이 아니면 ValueError.
+    반환: (전체 DataFrame, 새 행 DataFrame, 갱신된 타입 분석 튜플, 타입을 다시 판정한 열 목록, 새 행의 결측 단계 마스크)"""
+    column_analysis = column_types[0]
+    cell_codes = {}
+    raw = _parse_file(uploaded_file, sheet_name, {}, cell_codes)
+    raw.columns = raw.columns.astype(str).str.strip()
+    if list(raw.columns) != list(base_df.columns):
+        added = [c for c in raw.columns if c not in base_df.columns]
+        removed = [c for c in base_df.columns if c not in raw.columns]
+        detail = f" (추가: {added[:5]}, 누락: {removed[:5]})" if added or removed else " (열 순서가 다름)"
+        raise ValueError("열 구성이 기존 데이터와 다릅니다." + detail)
+    n_old = len(base_df)
+    if len(raw) <= n_old:
+        raise ValueError(f"추가된 행이 없습니다. (기존 {n_old:,}행, 새 파일 {len(raw):,}행)")
+
+    # 마지막 기존 행 1개를 겹쳐서 함께 정규화 (같은 파일의 연장인지 확인용)
+    tail, tail_mask = _build_mask(
+        raw.iloc[n_old - 1:], {p: codes[n_old - 1:] for p, codes in cell_codes.items()}, _strip_and_nanify)
+    tail.index = pd.RangeIndex(n_old - 1, n_old - 1 + len(tail))
+
+    # 새 행만으로 타입 확인 → 기존 판정과 어긋나는 열만 전체 열로 다시 판정
+    recheck = []
+    for i, col in enumerate(tail.columns):
+        info, _, _ = _classify_column(tail.iloc[1:, i])
+        if info['main_category'] == 'Empty':
             continue
+        base_info = column_analysis.get(col, {})
+        if info['main_category'] != base_info.get('main_category') or \
+                (base_info.get('sub_category') == '불리언') != (info['sub_category'] == '불리언'):
+            recheck.append(col)
+
+    for i, col in enumerate(tail.columns):
+        tail.isetitem(i, _align_appended_column(tail.iloc[:, i], base_df.iloc[:, i], column_analysis.get(col, {})))
+    if not _same_row(tail.iloc[:1], base_df.iloc[-1:]):
+        raise ValueError("기존 데이터 뒤에 행만 추가된 파일이 아닙니다. (마지막 기존 행이 일치하지 않음)")
+    tail = tail.iloc[1:]
+
+    full = pd.concat([base_df, tail])
+    for i in range(full.shape[1]):
+        if isinstance(base_df.iloc[:, i].dtype, pd.CategoricalDtype):
+            full.isetitem(i, full.iloc[:, i].astype('category'))
+
+    # 열 분류 목록 갱신 (다시 판정한 열만 교체, 순서는 원래 열 순서 유지)
+    names = ['numeric', 'categorical', 'date', 'datelike', 'empty']
+    bucket_of = {col: name for name, cols in zip(names, column_types[1:]) for col in cols}
+    column_analysis = dict(column_analysis)
+    for col in recheck:
+        i = full.columns.get_loc(col)
+        info, bucket, normalized = _classify_column(full.iloc[:, i])
+        column_analysis[col] = info
+        bucket_of[col] = bucket
+        if normalized is not None:
+            full.isetitem(i, normalized)
+    buckets = {name: [c for c in full.columns if bucket_of.get(c) == name] for name in names}
+    updated_types = (column_analysis, buckets['numeric'], buckets['categorical'],
+                     buckets['date'], buckets['datelike'], buckets['empty'])
+    return full, full.iloc[len(base_df):], updated_types, recheck, tail_mask.rows_from(1)
 
-        # 정수/실수/날짜/불린: 기존 로직 유지
-        if col_dtype in ['int64', 'int32', 'int16', 'int8']:
-            column_analysis[col] = {'main_category': '수치형', 'sub_category': '정수', 'is_numeric': True}
-            numeric_columns.append(col)
-
-        elif col_dtype in ['float64', 'float32', 'float16']:
-            column_analysis[col] = {'main_category': '수치형', 'sub_category': '실수', 'is_numeric': True}
-            numeric_columns.append(col)
-
-        elif 'datetime' in str(col_dtype):
-            column_analysis[col] = {'main_category': '날짜형', 'sub_category': '날짜시간', 'is_numeric': False}
-            date_columns.append(col)
-
-        elif col_dtype == 'bool':
-            column_analysis[col] = {'main_category': '범주형', 'sub_category': '불리언', 'is_numeric': False}
-            categorical_columns.append(col)
-
-        # object(문자열/혼합형) 처리
-        else:
-            # [FIX-2] 카테고리 판단 전에 "숫자 강제 변환"을 먼저 시도
-            coerced = _coerce_numeric_series(df[col])
-            # non-null 중 몇 %가 숫자로 안전 변환되는지(유연성 확보)
-            convertible_frac = (coerced.notna().sum() / len(non_null_values))
-
-            if convertible_frac >= 0.90:
-                # 숫자로 보는 것이 타당
-                sub = '실수' if ((coerced.dropna() % 1) != 0).any() else '정수'
-                column_analysis[col] = {'main_category': '수치형', 'sub_category': sub, 'is_numeric': True}
-                numeric_columns.append(col)
-                continue
-
-            # 날짜 패턴/카테고리/텍스트 판정 로직
-            is_date_like = False
-            date_patterns = [
-                r'^\d{4}-\d{1,2}-\d{1,2}$',
-                r'^\d{4}/\d{1,2}/\d{1,2}$',
-                r'^\d{4}\.\d{1,2}\.\d{1,2}$',
-                r'^\d{1,2}/\d{1,2}/\d{4}$',
-                r'^\d{1,2}-\d{1,2}-\d{4}$',
-                r'^\d{4}-\d{1,2}-\d{1,2} \d{1,2}:\d{1,2}:\d{1,2}$',
-                r'^\d{4}-\d{1,2}-\d{1,2} \d{1,2}:\d{1,2}$',
-                r'^\d{4}/\d{1,2}/\d{1,2} \d{1,2}:\d{1,2}:\d{1,2}$',
-                r'^\d{4}/\d{1,2}/\d{1,2} \d{1,2}:\d{1,2}$',
-            ]
-            for pattern in date_patterns:
-                if non_null_values.astype(str).str.match(pattern).all():
-                    is_date_like = True
-                    break
-
-            if not is_date_like and non_null_values.astype(str).str.match(r'^\d+$').all():
-                try:
-                    numeric_values = non_null_values.astype(float)
-                    if (numeric_values >= 42000).all() and (numeric_values <= 48000).all():
-                        is_date_like = True
-                except:
-                    pass
-
-            if not is_date_like:
-                flexible_patterns = [
-                    r'^\d{4}년\d{1,2}월\d{1,2}일',
-                    r'^\d{4}.\d{1,2}.\d{1,2}',
-                    r'^\d{1,2}/\d{1,2}/\d{2,4}',
-                ]
-                for pattern in flexible_patterns:
-                    if non_null_values.astype(str).str.match(pattern).all():
-                        is_date_like = True
-                        break
-
-            if is_date_like:
-                column_analysis[col] = {'main_category': '날짜형', 'sub_category': '날짜', 'is_numeric': False}
-                datelike_columns.append(col)
-            elif len(non_null_values.unique()) / len(non_null_values) < 0.1:
-                column_analysis[col] = {'main_category': '범주형', 'sub_category': '범주', 'is_numeric': False}
-                categorical_columns.append(col)
-            elif non_null_values.astype(str).str.match(r'^\d+$').all():
-                column_analysis[col] = {'main_category': '범주형', 'sub_category': '식별자', 'is_numeric': False}
-                categorical_columns.append(col)
-            else:
-                column_analysis[col] = {'main_category': '범주형', 'sub_category': '텍스트', 'is_numeric': False}
-                categorical_columns.append(col)
-
-    return column_analysis, numeric_columns, categorical_columns, date_columns, datelike_columns, empty_columns
 
 def get_emoji_for_type(type_name):
     emoji_map = {
@@ -215,7 +830,7 @@ def get_emoji_for_type(type_name):
 # 3) 데이터 요약 표시 (원형 유지)
 # -------------------------------
 
-def display_data_info(df, numeric_columns, categorical_columns, date_columns, datelike_columns, empty_columns, filename=None):
+def display_data_info(df, numeric_columns, categorical_columns, date_columns, datelike_columns, empty_columns, filename=None, memory_report=None, missing_mask=None):
     variable_types = []
     if len(numeric_columns) > 0:
         variable_types.append(f"🔢 수치형 {len(numeric_columns)}개")
@@ -231,13 +846,25 @@ def display_data_info(df, numeric_columns, categorical_columns, date_columns, da
     explanation = ""
     if len(categorical_columns) > 0 or len(numeric_columns) > 0 or len(date_columns) > 0 or len(datelike_columns) > 0 or len(empty_columns) > 0:
         explanation = '<span style="font-size: 13px; color: #1a1a1a; line-height: 1.8;"><strong>변수 유형 설명:</strong><br/>• <strong>🔢 수치형</strong>: 정수, 실수 등 숫자 데이터 (예: 온도, 압력, 유량)<br/>• <strong>🏷️ 범주형</strong>: 텍스트, 불리언(0/1), 식별자 등 (예: 제품명, 상태, ID)<br/>• <strong>📅 날짜형</strong>: 날짜, 날짜+시간 데이터 (예: 측정일시, 생산일)</span>'
+    memory_html = ""
+    if memory_report:
+        before_mb = memory_report['before'] / 1024 ** 2
+        after_mb = memory_report['after'] / 1024 ** 2
+        saved = 1 - memory_report['after'] / memory_report['before'] if memory_report['before'] else 0
+        memory_html = f'<p style="margin: 2px 0 7px 0;"><strong>메모리:</strong> {before_mb:,.1f} MB → {after_mb:,.1f} MB ({saved:.0%} 절감, {len(memory_report["columns"])}개 열 변환)</p>'
+    missing_html = ""
+    if missing_mask is not None and missing_mask.n_rows == len(df):
+        totals = missing_mask.stage_counts().sum()
+        if totals.any():
+            stages = " · ".join(f"{label} {int(n):,}개" for label, n in totals.items() if n)
+            missing_html = f'<p style="margin: 2px 0 7px 0;"><strong>결측·오류 셀:</strong> {stages}</p>'
     st.markdown(f"""
     <div style="background: linear-gradient(135deg, #D4EDDA 0%, #C3E6CB 100%); padding: 20px; border-radius: 10px; border-left: 5px solid #28A745; margin: 20px 0; box-shadow: 0 2px 4px rgba(40, 167, 69, 0.2);">
         <h3 style="margin: 0 0 15px 0; color: #155724; font-weight: bold;">📊 데이터 정보</h3>
         <div style="font-size: 16px; line-height: 1.6; color: #1a1a1a;">
             <p style="margin: 2px 0;"><strong>파일명:</strong> {filename if filename else '알 수 없음'}</p>
             <p style="margin: 2px 0;"><strong>데이터 크기:</strong> {df.shape[1]}열 × {df.shape[0]}행</p>
-            <p style="margin: 2px 0 7px 0;"><strong>변수(열) 종류:</strong> {variable_types_str}</p>
+            <p style="margin: 2px 0 7px 0;"><strong>변수(열) 종류:</strong> {variable_types_str}</p>{memory_html}{missing_html}
             <p style="margin: 2px 0;">{explanation}</p>
         </div>
     </div>
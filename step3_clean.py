@@ -1,6 +1,253 @@
+import os
+import time
 import streamlit as st
 import pandas as pd
 import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+import session_cache
+import imputation
+import outlier_screen
+from missing_mask import MissingMask, CODE_LABELS, BLANK
+
+# 결측 지도의 최대 행 블록 수 (화면 크기와 무관하게 이 이상은 보내지 않음)
+MISSING_MAP_BLOCKS = int(os.environ.get("ANALYZER_MISSING_MAP_BLOCKS", "200"))
+_STAGE_COLORS = {1: "#9e9e9e", 2: "#4e79a7", 3: "#f28e2b", 4: "#e15759"}
+
+
+def _numeric_columns_with_missing(df):
+    # select_dtypes/df[cols]는 열을 복사하므로 dtype만 보고 열별로 확인 (bool은 수치형에서 제외)
+    return [
+        col for col, dtype in df.dtypes.items()
+        if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype) and df[col].hasnans
+    ]
+
+
+def impute_mean(df_subset):
+    """수치형 열의 결측치를 열 평균으로 채운 새 DataFrame. (원본은 변경하지 않음)
+
+    - 결측이 있는 수치형 열 전체를 하나의 2차원 float 배열로 만들어 평균 계산·채우기를 한 번에 수행
+    - 원래 정수형(numpy int / Int64 등)이던 열은 채운 값이 모두 정수일 때만 원래 dtype으로 복원,
+      평균이 정수가 아니면 float64로 둠
+    """
+    cols = _numeric_columns_with_missing(df_subset)
+    if not cols:
+        return df_subset.copy()
+
+    # (열, 행) 배열: 열마다 값이 연속이라 열별 합계가 pandas mean()과 같은 순서로 계산됨
+    values = np.vstack([df_subset[col].to_numpy(dtype=np.float64, na_value=np.nan) for col in cols])
+    missing = np.isnan(values)
+    np.copyto(values, 0.0, where=missing)
+    means = values.sum(axis=1) / (values.shape[1] - missing.sum(axis=1))
+    np.copyto(values, means[:, None], where=missing)
+
+    filled = dict(zip(cols, values))
+    dtypes = df_subset.dtypes
+    for col in cols:
+        original_dtype = dtypes[col]
+        if original_dtype == np.float64:
+            continue
+        # 정수 여부는 열 단위 배열 연산으로 확인 (값마다 is_integer() 호출하지 않음)
+        column = filled[col]
+        if pd.api.types.is_float_dtype(original_dtype) or (
+                pd.api.types.is_integer_dtype(original_dtype) and np.array_equal(column, np.round(column))):
+            filled[col] = pd.Series(column, index=df_subset.index).astype(original_dtype)
+
+    # 결측이 없던 열은 그대로 두고 새 DataFrame으로 (dict 입력이라 값은 복사됨)
+    return pd.DataFrame(
+        {col: filled[col] if col in filled else df_subset[col] for col in df_subset.columns},
+        index=df_subset.index,
+    )
+
+
+@session_cache.memoize("clean")
+def _timed_impute_mean(df_subset):
+    """(처리 결과, 소요 초). 결측치 처리 화면을 그릴 때 미리 계산해 두어 버튼 클릭 시 바로 적용."""
+    t0 = time.perf_counter()
+    df_cleaned = impute_mean(df_subset)
+    return df_cleaned, time.perf_counter() - t0
+
+
+def apply_imputation(df_subset, settings, df=None):
+    """변수별 대체 설정 {"plan": {변수: 방법 키}, "time_column": 시간 열}을 적용합니다. (처리 결과, 변수별 기록)
+
+    시간 열은 원본 데이터(df)에서 읽으며, 없으면 행 순서를 시간 순서로 사용합니다.
+    """
+    times = imputation.time_values(df, df_subset, settings.get("time_column"))
+    return imputation.impute(df_subset, settings["plan"], times)
+
+
+def clean_dataframe(df_subset, method, imputation_settings=None, df=None):
+    """UI 없이 결측치 처리 방법을 적용합니다. (데이터 추가 후 재적용 등)
+
+    Args:
+        df_subset (pd.DataFrame): 처리할 데이터프레임
+        method (str): "행 삭제" / "평균값 대체" / "변수별 대체" / "처리 불필요"
+        imputation_settings (dict): "변수별 대체"의 설정 (apply_imputation 참고)
+        df (pd.DataFrame): 시간 열을 읽을 원본 데이터 ("변수별 대체"에서만 사용)
+
+    Returns:
+        pd.DataFrame: 처리된 데이터프레임 (원본은 변경하지 않음)
+    """
+    if method == "행 삭제":
+        return df_subset.dropna()
+
+    if method == "평균값 대체":
+        return impute_mean(df_subset)
+    if method == "변수별 대체" and imputation_settings:
+        return apply_imputation(df_subset, imputation_settings, df)[0]
+    return df_subset.copy()
+
+
+def _imputation_ui(df_subset, columns_with_missing):
+    """Option 3: 변수마다 대체 방법을 고르는 표와 적용 버튼."""
+    st.markdown("**Option 3: 변수별 방법 선택**")
+    st.markdown("변수마다 평균값·중앙값·시간순 채우기·선형 보간·KNN 중에서 대체 방법을 고릅니다. 행은 삭제하지 않습니다.")
+
+    df = st.session_state.get("df")
+    time_candidates = [
+        c for c in st.session_state.get("date_columns", []) + st.session_state.get("datelike_columns", [])
+        if df is not None and c in df.columns and len(df) == len(df_subset)
+    ]
+    row_order = "(행 순서)"
+    time_column = st.selectbox(
+        "시간 기준 열", [row_order] + time_candidates, key="impute_time_column",
+        help="앞 값·뒤 값 채우기와 선형 보간을 이 열의 시간 순서로 적용합니다. (행 순서 = 파일의 행 순서)"
+    )
+    time_column = None if time_column == row_order else time_column
+
+    labels = imputation.STRATEGIES
+    keys_by_label = {label: key for key, label in labels.items()}
+    plan_df = pd.DataFrame({
+        "변수": columns_with_missing,
+        "결측 수": [int(df_subset[c].isna().sum()) for c in columns_with_missing],
+        "방법": [labels[imputation.default_strategy(df_subset[c], time_column is not None)] for c in columns_with_missing],
+    })
+    edited = st.data_editor(
+        plan_df,
+        column_config={"방법": st.column_config.SelectboxColumn("방법", options=list(labels.values()), required=True)},
+        disabled=["변수", "결측 수"], hide_index=True, width='stretch',
+        key=f"impute_plan_{time_column or 'rows'}"
+    )
+
+    # 수치형이 아닌 변수에 수치형 전용 방법을 고르면 앞 값 채우기로
+    plan, adjusted = {}, []
+    for col, label in zip(edited["변수"], edited["방법"]):
+        strategy = keys_by_label.get(label, "none")
+        if strategy not in imputation.available_strategies(df_subset[col]):
+            strategy = imputation.default_strategy(df_subset[col], time_column is not None)
+            adjusted.append(col)
+        plan[col] = strategy
+    if adjusted:
+        st.caption(f"ℹ️ 수치형이 아닌 변수는 앞 값·뒤 값 채우기만 쓸 수 있어 '{labels['ffill']}'로 적용합니다: {', '.join(map(str, adjusted))}")
+
+    if st.button("🧩 변수별 방법으로 대체", type="primary", width='stretch'):
+        settings = {"plan": plan, "time_column": time_column}
+        with st.spinner("결측치를 대체하는 중..."):
+            df_cleaned, log = apply_imputation(df_subset, settings, df)
+        st.session_state.df_ready = df_cleaned
+        st.session_state.imputation_settings = settings
+        st.session_state.imputation_log = log
+        st.session_state.cleaning_method = "변수별 대체"
+        st.session_state.cleaning_completed = True
+        st.rerun()
+
+
+def _source_mask(df_subset, columns):
+    """(업로드 시 기록한 마스크, columns에 대응하는 원본 열 이름). 마스크가 없거나 행·열이 맞지 않으면 (None, None)."""
+    mask = st.session_state.get("missing_mask")
+    source_columns = st.session_state.get("subset_source_columns")
+    if mask is None or mask.n_rows != len(df_subset) or not source_columns:
+        return None, None
+    source_of = dict(zip(df_subset.columns, source_columns))
+    if any(source_of.get(c) not in mask.columns for c in columns):
+        return None, None
+    return mask, [source_of[c] for c in columns]
+
+
+@session_cache.memoize("clean")
+def _null_mask(df_subset):
+    """업로드 마스크가 없을 때 현재 NaN만으로 만든 마스크 (종류 구분 없이 빈칸). 지도를 다시 그릴 때마다 만들지 않도록 캐시."""
+    mask = MissingMask(list(df_subset.columns), len(df_subset))
+    mask.update_from_nulls(df_subset)
+    return mask
+
+
+def _stage_counts(df_subset, columns):
+    """df_subset 열(columns 순서)별 결측 단계 개수표. 마스크가 없거나 행이 맞지 않으면 None."""
+    mask, source_names = _source_mask(df_subset, columns)
+    if mask is None:
+        return None
+    return mask.stage_counts(source_names)
+
+
+def _light(color, weight=0.8):
+    """색을 흰색 쪽으로 섞은 색 (결측 비율이 낮은 블록)."""
+    rgb = [int(color[i:i + 2], 16) for i in (1, 3, 5)]
+    return "#" + "".join(f"{round(v + (255 - v) * weight):02x}" for v in rgb)
+
+
+def _missing_map_figure(edges, fraction, dominant, labels, percentages):
+    """위: 열별 결측 비율 막대, 아래: 행 블록 × 열 결측 지도 (색 = 가장 많은 결측 종류, 진하기 = 블록 결측 비율)."""
+    # 코드 k 블록은 (k-1, k] 구간 값으로 그림 → 구간마다 연한 색~진한 색 띠로 된 색 척도 하나로 종류와 비율을 함께 표시
+    bands = len(_STAGE_COLORS)
+    z = np.where(dominant > 0, dominant - 1 + 0.2 + 0.8 * fraction, np.nan)
+    colorscale = []
+    for k, color in enumerate(_STAGE_COLORS.values()):
+        colorscale += [[k / bands, _light(color)], [(k + 1) / bands, color]]
+
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.2, 0.8], vertical_spacing=0.03)
+    fig.add_trace(go.Bar(
+        x=labels, y=percentages, marker_color="#9e9e9e",
+        hovertemplate="%{x}<br>전체 결측 %{y:.1f}%<extra></extra>"
+    ), row=1, col=1)
+    fig.add_trace(go.Heatmap(
+        x=labels, y=edges[:-1], z=z, customdata=fraction * 100,
+        zmin=0, zmax=bands, colorscale=colorscale, showscale=False, xgap=1,
+        hovertemplate="%{x}<br>%{y:,}행부터<br>블록 결측 %{customdata:.1f}%<extra></extra>"
+    ), row=2, col=1)
+    fig.update_yaxes(title_text="결측 %", range=[0, 100], row=1, col=1)
+    fig.update_yaxes(title_text="행", autorange="reversed", row=2, col=1)
+    fig.update_xaxes(type="category", row=2, col=1)
+    fig.update_layout(height=460, margin=dict(l=10, r=10, t=10, b=10), showlegend=False, plot_bgcolor="white")
+    return fig
+
+
+@st.fragment
+def _missingness_map(df_subset, df_preview, labels, percentages):
+    """
+    행 블록으로 묶은 결측 지도. 셀을 그대로 보내지 않고 최대 MISSING_MAP_BLOCKS개 블록만 그립니다.
+    행 범위를 좁히면 그 범위만 다시 묶어 블록이 작아집니다. (fragment라 범위를 바꿔도 이 부분만 다시 실행)
+    """
+    columns = list(df_preview.columns)
+    mask, names = _source_mask(df_subset, columns)
+    if mask is None:
+        # 업로드 마스크가 없으면 현재 NaN만으로 (종류 구분 없이 빈칸으로 표시)
+        mask, names = _null_mask(df_subset), columns
+
+    n_rows = len(df_preview)
+    start, stop = st.slider(
+        "행 범위", 0, n_rows, (0, n_rows), key=f"missing_map_range_{n_rows}",
+        help="범위를 좁히면 블록이 작아져 더 자세히 볼 수 있습니다."
+    )
+    if stop <= start:
+        st.info("행 범위를 1행 이상으로 지정하세요.")
+        return
+    edges, fraction, dominant = mask.block_summary(names, start, stop, MISSING_MAP_BLOCKS)
+
+    st.plotly_chart(_missing_map_figure(edges, fraction, dominant, labels, percentages),
+                    width='stretch', key="missing_map")
+    legend = " ".join(
+        f'<span style="color:{_STAGE_COLORS[code]}">■</span> {label}'
+        for code, label in CODE_LABELS.items() if code == BLANK or (dominant == code).any()
+    )
+    block_rows = int(edges[1] - edges[0]) if len(edges) > 1 else 0
+    st.markdown(
+        f'<span style="font-size: 0.85em; color: #666;">{legend} · 행 {start:,}~{stop:,} · 블록당 {block_rows:,}행 '
+        f'(진할수록 블록 안 결측 비율이 높음)</span>',
+        unsafe_allow_html=True
+    )
+
 
 def data_cleaner(df_subset):
     """
@@ -62,9 +309,17 @@ def data_cleaner(df_subset):
         role_row = ["역할"] + role_row
         missing_count_row = ["결측 수"] + missing_count_row
         missing_pct_row = ["결측 비율"] + missing_pct_row
-        
+        rows = [role_row, missing_count_row, missing_pct_row]
+
+        # 결측 단계별 개수 (업로드 시 기록한 셀별 코드, 원본 열 이름 기준)
+        stage_counts = _stage_counts(df_subset, list(df_preview.columns))
+        if stage_counts is not None:
+            for label in stage_counts.columns:
+                if stage_counts[label].any():
+                    rows.append([label] + [f"{n:,}" for n in stage_counts[label]])
+
         # 데이터프레임 생성
-        missing_detail_df = pd.DataFrame([role_row, missing_count_row, missing_pct_row], columns=[""] + list(df_preview.columns))
+        missing_detail_df = pd.DataFrame(rows, columns=[""] + list(df_preview.columns))
         
         # Y 변수 열에 대한 시각적 구분을 위해 컬럼명에 표시
         display_columns = {}
@@ -78,6 +333,18 @@ def data_cleaner(df_subset):
         missing_detail_df.columns = ["구분"] + [display_columns[col] for col in df_preview.columns]
         
         st.dataframe(missing_detail_df, width='stretch', hide_index=True)
+
+        # 결측 지도는 펼쳤을 때만 계산 (펼치거나 접으면 다시 실행, 펼친 상태는 세션에 유지)
+        try:
+            map_panel = st.expander("🗺️ 결측 지도", expanded=False, key="missing-map-open", on_change="rerun")
+            map_open = bool(getattr(map_panel, "open", False))
+        except TypeError:
+            # 펼침 상태를 알 수 없는 Streamlit 버전: 항상 그림
+            map_panel, map_open = st.expander("🗺️ 결측 지도", expanded=False), True
+        with map_panel:
+            if map_open:
+                _missingness_map(df_subset, df_preview, list(missing_detail_df.columns[1:]),
+                                 [float(missing_percentages[col]) for col in df_preview.columns])
         
         # 결측치 처리 방법 선택 (아직 처리하지 않은 경우에만 표시)
         if not st.session_state.cleaning_completed:
@@ -89,7 +356,7 @@ def data_cleaner(df_subset):
                 st.markdown("**Option 1: 행 삭제**")
                 st.markdown("결측치가 있는 행을 완전히 제거합니다.")
                 if st.button("🗑️ 결측치가 있는 행 삭제", type="primary", width='stretch'):
-                    df_cleaned = df_subset.dropna()
+                    df_cleaned = clean_dataframe(df_subset, "행 삭제")
                     st.session_state.df_ready = df_cleaned
                     st.session_state.cleaning_method = "행 삭제"
                     st.session_state.cleaning_completed = True
@@ -99,43 +366,22 @@ def data_cleaner(df_subset):
                 st.markdown("**Option 2: 평균값으로 대체**")
                 st.markdown("수치형 변수의 결측치를 해당 변수의 평균값으로 채웁니다.")
                 if st.button("🔢 평균값으로 대체", type="primary", width='stretch'):
-                    df_cleaned = df_subset.copy()
-                    
-                    # 수치형 변수만 선택
-                    numeric_cols = df_cleaned.select_dtypes(include=[np.number]).columns
-                    numeric_cols_with_missing = [col for col in numeric_cols if df_cleaned[col].isnull().sum() > 0]
-                    
-                    if numeric_cols_with_missing:
-                        for col in numeric_cols_with_missing:
-                            # 원본 데이터 타입 저장
-                            original_dtype = df_cleaned[col].dtype
-                            
-                            # 평균값 계산 및 결측치 채우기
-                            mean_val = df_cleaned[col].mean()
-                            df_cleaned[col].fillna(mean_val, inplace=True)
-                            
-                            # 원본 데이터 타입 복원
-                            if pd.api.types.is_integer_dtype(original_dtype):
-                                # 정수형인 경우
-                                if pd.api.types.is_nullable_integer_dtype(original_dtype):
-                                    # pandas nullable integer dtype (Int64, Int32 등)인 경우
-                                    # 이 dtype은 float 값을 자동으로 처리할 수 있음
-                                    df_cleaned[col] = df_cleaned[col].astype(original_dtype)
-                                else:
-                                    # numpy integer dtype인 경우
-                                    # 모든 값이 정수인지 확인
-                                    if df_cleaned[col].apply(lambda x: x.is_integer() if hasattr(x, 'is_integer') else x == int(x)).all():
-                                        # 반올림 후 원본 dtype으로 변환
-                                        df_cleaned[col] = df_cleaned[col].round().astype(original_dtype)
-                                    # 정수가 아닌 값이 있으면 float로 유지 (안전성)
-                            # float dtype은 그대로 유지
-                        
-                        st.session_state.df_ready = df_cleaned
+                    if _numeric_columns_with_missing(df_subset):
+                        st.session_state.df_ready, _ = _timed_impute_mean(df_subset)
                         st.session_state.cleaning_method = "평균값 대체"
                         st.session_state.cleaning_completed = True
                         st.rerun()
                     else:
                         st.info("수치형 변수에 결측치가 없습니다.")
+                mean_timing = st.empty()
+
+            # 버튼을 먼저 그린 뒤 평균값 대체 결과를 미리 계산 (클릭 시에는 캐시에서 바로 적용)
+            if _numeric_columns_with_missing(df_subset):
+                _, seconds = _timed_impute_mean(df_subset)
+                mean_timing.caption(f"⏱ 평균값 대체 {seconds:.2f}s (미리 계산됨, {len(df_subset):,}행)")
+
+            st.markdown("---")
+            _imputation_ui(df_subset, list(variables_with_missing.index))
         
         # 결측치 처리 완료 후
         if st.session_state.cleaning_completed and st.session_state.df_ready is not None:
@@ -150,4 +396,97 @@ def data_cleaner(df_subset):
         st.session_state.df_ready = df_subset.copy()
         st.session_state.cleaning_method = "처리 불필요"
         st.session_state.cleaning_completed = True
-        return df_subset 
\ No newline at end of file
+        return df_subset 
+
+
+# ==============================
+# 이상치 점검 (선택 단계, 결측 처리 결과에 적용)
+# ==============================
+@session_cache.memoize("clean", spinner="열별 중앙값·분위수 계산 중...")
+def _outlier_summary(df_cleaned, columns):
+    """수치형 열 전체의 (개수, Q1, 중앙값, Q3, MAD). 변수·방법·k를 바꿔도 다시 계산하지 않음."""
+    return outlier_screen.fit_profile(df_cleaned, columns).summary()
+
+
+def apply_outlier_screen(df_cleaned, settings):
+    """결측 처리 결과에 이상치 점검 설정을 적용합니다. 반환: (df_ready, 보고서)"""
+    summary = _outlier_summary(df_cleaned, outlier_screen.numeric_columns(df_cleaned))
+    return outlier_screen.apply_screen(df_cleaned, settings, summary)
+
+
+def outlier_status(settings, report):
+    """적용된 이상치 점검 한 줄 요약."""
+    return (f"{outlier_screen.ACTIONS[settings['action']]} · {outlier_screen.METHODS[settings['method']]} "
+            f"(k={settings['k']:g}) · 이상치가 있는 행 {report['rows_flagged']:,}개 · "
+            f"{report['rows_in']:,}행 → {report['rows_out']:,}행")
+
+
+def outlier_screener(df_cleaned):
+    """
+    경계 설정과 미리보기(열별 이탈 수, 행 수 변화). 결측 처리 결과(df_cleaned)는 바꾸지 않습니다.
+
+    Returns:
+        dict | None: 적용 버튼이면 설정, 해제 버튼이면 빈 dict, 누르지 않았으면 None
+    """
+    columns = outlier_screen.numeric_columns(df_cleaned)
+    if not columns:
+        st.info("점검할 수치형 변수가 없습니다.")
+        return None
+
+    applied = st.session_state.get("outlier_settings") or {}
+    report = st.session_state.get("outlier_report")
+    if applied and report:
+        st.success(f"✅ 적용됨: {outlier_status(applied, report)}")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        methods = list(outlier_screen.METHODS)
+        method = st.selectbox(
+            "경계 방법", methods, index=methods.index(applied.get("method", "mad")),
+            format_func=outlier_screen.METHODS.get, key="outlier_method"
+        )
+    with col2:
+        default_k = applied["k"] if applied.get("method") == method else outlier_screen.DEFAULT_K[method]
+        k = st.number_input(
+            "배수 k", min_value=0.5, max_value=20.0, value=float(default_k), step=0.5,
+            key=f"outlier_k_{method}", help="클수록 경계가 넓어져 이상치로 보는 값이 줄어듭니다."
+        )
+    with col3:
+        actions = list(outlier_screen.ACTIONS)
+        action = st.selectbox(
+            "처리", actions, index=actions.index(applied.get("action", "flag")),
+            format_func=outlier_screen.ACTIONS.get, key="outlier_action",
+            help="표시만: 개수만 확인 / 행 제외: 이상치가 하나라도 있는 행 제외 / 경계값으로 자르기: 행은 두고 값만 경계로 맞춤"
+        )
+    selected = st.multiselect(
+        "점검할 변수", columns, default=[c for c in applied.get("columns", columns) if c in columns],
+        key="outlier_columns"
+    )
+    if not selected:
+        st.info("점검할 변수를 하나 이상 고르세요.")
+        return {} if applied and st.button("↩️ 이상치 점검 해제", key="outlier_reset") else None
+
+    settings = {"method": method, "k": float(k), "action": action, "columns": selected}
+    # 미리보기는 '표시만'으로 계산 (복사 없이 개수만)
+    _, preview = apply_outlier_screen(df_cleaned, {**settings, "action": "flag"})
+    table = preview["table"].copy()
+    table.index.name = "변수"
+    st.dataframe(table.round(3), width='stretch')
+
+    n_rows, n_flagged = preview["rows_in"], preview["rows_flagged"]
+    share = n_flagged / n_rows * 100 if n_rows else 0.0
+    if action == "drop":
+        impact = f"행 제외 시 {n_rows:,}행 → **{n_rows - n_flagged:,}행** ({share:.1f}% 제외)"
+    else:
+        impact = f"행 수는 {n_rows:,}행 그대로"
+    st.markdown(f"이상치가 있는 행: **{n_flagged:,}개** ({share:.1f}%) · {impact}")
+    st.caption("경계를 계산할 수 없는 변수(척도 0, 값 없음)는 하한·상한이 비어 있고 점검하지 않습니다.")
+
+    col_apply, col_reset = st.columns(2)
+    with col_apply:
+        if st.button("🧯 이상치 점검 적용", type="primary", width='stretch', key="outlier_apply"):
+            return settings
+    with col_reset:
+        if applied and st.button("↩️ 이상치 점검 해제", width='stretch', key="outlier_reset"):
+            return {}
+    return None
@@ -3,6 +3,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.font_manager as fm
 import pandas as pd
+import session_cache
 
 # matplotlib 백엔드 설정 (Streamlit 호환성)
 plt.switch_backend('Agg')
@@ -123,11 +124,20 @@ def detect_extreme_distribution(data):
     
     return is_extreme, max_ratio, second_ratio, valley_ratio
 
-def perform_eda_analysis(df_ready, y_column, x_columns):
-    """데이터 탐색 분석을 수행하는 함수"""
-    
-    # 변수별 분포 분석 (히스토그램만)
-    st.markdown('<h4 style="margin: 10px 0; color: #333;">📊 변수별 분포 분석</h4>', unsafe_allow_html=True)
+# ==============================
+# 계산 계층 (Streamlit 출력 없음, 결과는 내용 해시로 캐시)
+# ==============================
+# 다시 그릴 때는 compute_eda_profile이 session_cache에서 바로 반환되므로 렌더링 비용만 듭니다.
+
+@session_cache.memoize("eda", spinner="변수별 분포 분석 중...")
+def compute_eda_profile(df_ready, y_column, x_columns):
+    """
+    Y + X 변수별 분포 분석 결과 (그림·출력 없이 데이터만). 변수마다 dict 하나:
+    {"name", "is_numeric", "histogram", "narrative", "categories"} (해당 없거나 유효값이 없으면 None)
+    - histogram: 구간별 빈도 %, 중위 50% 구간, 평균, 그룹 별 대푯값 선 위치 (수치형)
+    - categories: {"percentages", "narrative"} (범주형)
+    """
+    profiles = []
 
     # 모든 변수들 (Y + X) - 수치형과 범주형 모두 포함
     all_cols = [y_column] + x_columns
@@ -135,60 +145,38 @@ def perform_eda_analysis(df_ready, y_column, x_columns):
     if len(all_cols) > 0:
         for idx, col in enumerate(all_cols):
             # 변수 타입 확인 (수치형 vs 범주형)
-            is_numeric = df_ready[col].dtype in ['int64', 'float64']
+            is_numeric = pd.api.types.is_numeric_dtype(df_ready[col]) and not pd.api.types.is_bool_dtype(df_ready[col])
+            profile = {"name": col, "is_numeric": is_numeric, "histogram": None, "narrative": None, "categories": None}
+            profiles.append(profile)
             
-            # 변수별 제목 추가
-            if col == y_column:
-                st.markdown(f'<h5 style="margin: 10px 0; color: #666;">{col} (Y 변수)</h5>', unsafe_allow_html=True)
-            else:
-                x_idx = idx - 1  # Y변수 제외하고 X변수 순서 계산
-                # 한글 순번 생성
-                korean_numbers = ["첫번째", "두번째", "세번째", "네번째", "다섯번째", "여섯번째", "일곱번째", "여덟번째", "아홉번째", "열번째"]
-                if x_idx < len(korean_numbers):
-                    order_text = korean_numbers[x_idx]
+            if is_numeric:
+                # 원본 시리즈 취득 후 숫자 변환 (문자열형 숫자 처리)
+                raw_series = df_ready[col]
+                if raw_series.dtype == 'O':
+                    cleaned = (raw_series.astype(str)
+                                 .str.strip()
+                                 .str.replace(',', '', regex=False)
+                                 .str.replace(' ', '', regex=False)
+                                 .str.replace('\u00a0', '', regex=False))
+                    # 점(.)이 여러 개인 경우 천 단위 구분자로 판단하여 모두 제거
+                    cleaned = cleaned.apply(lambda s: s.replace('.', '') if s.count('.') > 1 else s)
+                    # 숫자, 음수부호, 소수점만 남기기 (그 외 문자는 제거)
+                    cleaned = cleaned.str.replace(r'[^0-9\.-]', '', regex=True)
+                    data = pd.to_numeric(cleaned, errors='coerce').dropna()
                 else:
-                    order_text = f"{x_idx + 1}번째"
-                st.markdown(f'<h5 style="margin: 10px 0; color: #666;">{col} ({order_text} X 변수)</h5>', unsafe_allow_html=True)
-            
-            # 각 변수별로 좌우 컬럼 레이아웃
-            col1, col2 = st.columns([1, 1])
-            
-            with col1:
-                # 히스토그램 차트
-                fig, ax = plt.subplots(figsize=(8, 6))
-                
-                if is_numeric:
-                    # 수치형 변수 처리
-                    # 원본 시리즈 취득 후 숫자 변환 (문자열형 숫자 처리)
-                    raw_series = df_ready[col]
-                    if raw_series.dtype == 'O':
-                        cleaned = (raw_series.astype(str)
-                                     .str.strip()
-                                     .str.replace(',', '', regex=False)
-                                     .str.replace(' ', '', regex=False)
-                                     .str.replace('\u00a0', '', regex=False))
-                        # 점(.)이 여러 개인 경우 천 단위 구분자로 판단하여 모두 제거
-                        cleaned = cleaned.apply(lambda s: s.replace('.', '') if s.count('.') > 1 else s)
-                        # 숫자, 음수부호, 소수점만 남기기 (그 외 문자는 제거)
-                        cleaned = cleaned.str.replace(r'[^0-9\.-]', '', regex=True)
-                        data = pd.to_numeric(cleaned, errors='coerce').dropna()
-                    else:
-                        data = raw_series.dropna()
-                
-                if is_numeric and len(data) > 0:
-                    # 기본 통계량 계산 (히스토그램 그리기 전에)
+                    data = raw_series.dropna()
+
+                if len(data) > 0:
+                    # 기본 통계량 계산
                     mean_val = data.mean()
                     q25 = data.quantile(0.25)
                     q75 = data.quantile(0.75)
-                    
-                    # 히스토그램 그리기
+
+                    # 히스토그램 (빈도 %)
                     weights = np.ones(len(data)) / len(data) * 100
-                    n, bins, patches = ax.hist(data, bins=30, alpha=0.7, 
-                                             color='skyblue' if col == y_column else 'lightcoral', 
-                                             edgecolor='black', weights=weights)
-                    ax.set_ylim(0, 100)
-                    
-                    # 중위 50% 구간 영역 표시 (Q25-Q75) - 최소 너비 보장
+                    counts, edges = np.histogram(data, bins=30, weights=weights)
+
+                    # 중위 50% 구간 영역 (Q25-Q75) - 최소 너비 보장
                     iqr = q75 - q25
                     data_range = data.max() - data.min()
                     bin_width = data_range / 30  # 히스토그램 한 칸의 너비
@@ -206,14 +194,7 @@ def perform_eda_analysis(df_ready, y_column, x_columns):
                     else:
                         q25_adjusted = q25
                         q75_adjusted = q75
-                    
-                    ax.axvspan(q25_adjusted, q75_adjusted, alpha=0.2, color='lightblue', 
-                              label='중위 50% 구간')
-                    
-                    # 평균선 표시 (진한 세로선)
-                    ax.axvline(mean_val, color='darkblue', linewidth=2, 
-                              label='평균')
-                    
+
                     # 그룹 별 대푯값 표시 (네러티브와 동일한 기준 적용)
                     # 네러티브에서 사용하는 그룹 감지 로직과 동일하게 적용
                     hist, bin_edges = np.histogram(data, bins=30)
@@ -329,105 +310,36 @@ def perform_eda_analysis(df_ready, y_column, x_columns):
                     elif extreme_concentration == 1 or skewness_based_extreme == 1:
                         show_group_lines = True
                     
-                    # 그룹 별 대푯값 표시 (평균선보다 옅은 색)
+                    # 그룹 별 대푯값 선 위치 (첫 번째 선에만 범례 표시)
+                    group_lines = []
                     if show_group_lines:
                         if len(peak_values) >= 2:
-                            # 피크 기반 그룹 대푯값 표시
-                            for i, peak in enumerate(peak_values):
-                                ax.axvline(peak, color='steelblue', linewidth=1.5, linestyle='--', alpha=0.7,
-                                          label='그룹 별 대푯값' if i == 0 else '')
+                            # 피크 기반 그룹 대푯값
+                            group_lines = list(peak_values)
                         elif extreme_concentration == 1 or skewness_based_extreme == 1:
-                            # 극단적 분포 기반 그룹 대푯값 표시
+                            # 극단적 분포 기반 그룹 대푯값
                             if zero_concentration >= 0.5:
-                                # 0 근처와 나머지 분포의 대푯값
-                                ax.axvline(0, color='steelblue', linewidth=1.5, linestyle='--', alpha=0.7,
-                                          label='그룹 별 대푯값')
-                                # 나머지 분포의 대푯값 (0이 아닌 데이터의 평균)
+                                # 0 근처와 나머지 분포(0이 아닌 데이터의 평균)의 대푯값
+                                group_lines = [0]
                                 non_zero_data = data[data > zero_threshold]
                                 if len(non_zero_data) > 0:
-                                    non_zero_mean = non_zero_data.mean()
-                                    ax.axvline(non_zero_mean, color='steelblue', linewidth=1.5, linestyle='--', alpha=0.7)
+                                    group_lines.append(non_zero_data.mean())
                             elif lower_ratio >= 0.5:
                                 # 하위 극단과 나머지 분포의 대푯값
-                                lower_mean = data[data <= lower_20_percent].mean()
-                                upper_mean = data[data > lower_20_percent].mean()
-                                ax.axvline(lower_mean, color='steelblue', linewidth=1.5, linestyle='--', alpha=0.7,
-                                          label='그룹 별 대푯값')
-                                ax.axvline(upper_mean, color='steelblue', linewidth=1.5, linestyle='--', alpha=0.7)
+                                group_lines = [data[data <= lower_20_percent].mean(), data[data > lower_20_percent].mean()]
                             elif upper_ratio >= 0.5:
                                 # 상위 극단과 나머지 분포의 대푯값
-                                upper_mean = data[data >= upper_20_percent].mean()
-                                lower_mean = data[data < upper_20_percent].mean()
-                                ax.axvline(upper_mean, color='steelblue', linewidth=1.5, linestyle='--', alpha=0.7,
-                                          label='그룹 별 대푯값')
-                                ax.axvline(lower_mean, color='steelblue', linewidth=1.5, linestyle='--', alpha=0.7)
-                    
-                    # 그래프 꾸미기
-                    ax.set_xlabel(col, fontsize=14)
-                    ax.set_ylabel('빈도 (%)', fontsize=14)
-                    ax.grid(True, alpha=0.3)
-                    
-                    # x축, y축 틱 라벨 크기 설정
-                    ax.tick_params(axis='both', which='major', labelsize=14)
-                    
-                    # x축 값 포맷팅 (1000 이상은 쉼표 추가, 10 미만은 소수점 둘째자리)
-                    def format_x_ticks(x, pos):
-                        if x >= 1000:
-                            return f'{x:,.0f}'
-                        elif x >= 10:
-                            return f'{x:.1f}'
-                        else:
-                            return f'{x:.2f}'
-                    
-                    ax.xaxis.set_major_formatter(plt.FuncFormatter(format_x_ticks))
-                    
-                    # 범례 추가 (최대 3개 항목만 표시)
-                    handles, labels = ax.get_legend_handles_labels()
-                    if len(handles) > 3:
-                        handles = handles[:3]
-                        labels = labels[:3]
-                    ax.legend(handles, labels, loc='upper right', fontsize=10)
-                
-                elif not is_numeric:
-                    # 범주형 변수 처리
-                    raw_series = df_ready[col].dropna()
-                    
-                    if len(raw_series) > 0:
-                        # 범주별 카운트 계산 및 이름 오름차순 정렬
-                        category_counts = raw_series.value_counts()
-                        category_counts = category_counts.sort_index()  # 범주 이름 오름차순
-                        
-                        # 빈도를 퍼센트로 변환
-                        category_percentages = (category_counts / len(raw_series)) * 100
-                        
-                        # 막대 그래프 그리기
-                        bars = ax.bar(range(len(category_percentages)), 
-                                     category_percentages.values,
-                                     color='lightcoral' if col != y_column else 'skyblue',
-                                     edgecolor='black',
-                                     alpha=0.7)
-                        
-                        # x축 설정
-                        ax.set_xticks(range(len(category_percentages)))
-                        ax.set_xticklabels(category_percentages.index, rotation=45, ha='right', fontsize=12)
-                        
-                        # y축 설정 (0-100%)
-                        ax.set_ylim(0, 100)
-                        ax.set_ylabel('빈도 (%)', fontsize=14)
-                        ax.set_xlabel(col, fontsize=14)
-                        
-                        # 그리드 추가
-                        ax.grid(True, alpha=0.3, axis='y')
-                        
-                        # y축 틱 라벨 크기 설정
-                        ax.tick_params(axis='y', which='major', labelsize=14)
-                
-                plt.tight_layout()
-                st.pyplot(fig)
-            
-            with col2:
-                # 변수별 분포 내러티브 생성
-                if is_numeric and len(data) > 0:
+                                group_lines = [data[data >= upper_20_percent].mean(), data[data < upper_20_percent].mean()]
+
+                    histogram = {
+                        "counts": counts,
+                        "edges": edges,
+                        "mean": mean_val,
+                        "span": (q25_adjusted, q75_adjusted),
+                        "group_lines": group_lines,
+                    }
+                    
+                    # 변수별 분포 내러티브 생성
                     # 기본 통계량 계산
                     mean_val = data.mean()
                     std_val = data.std()
@@ -437,8 +349,6 @@ def perform_eda_analysis(df_ready, y_column, x_columns):
                     skewness = data.skew()
                     kurtosis = data.kurtosis()
                     
-                    # 변수 타입 및 숫자 포맷팅 정의
-                    var_type = "Y변수" if col == y_column else "X변수"
                     
                     # 숫자 포맷팅 (큰 숫자는 소수점 제거, 천 단위 이상은 쉼표 추가)
                     if mean_val >= 100:
@@ -1047,88 +957,212 @@ def perform_eda_analysis(df_ready, y_column, x_columns):
                         improvement_text = f"\n\n**✨ 분석 적합도 개선 방안**:\n{', '.join(improvement_suggestions)}"
                     
                     narrative = f"**💡 분석 적합도**: {suitability_score:.0f}점 - {analysis_suitability}\n\n**📊 분포 특성 분석**:\n평균은 **{mean_str}**이며 {variance_desc} {distribution_analysis}\n\n**📈 데이터 그룹**:\n{group_desc}{improvement_text}{data_transform_guide}"
+                    profile["histogram"] = histogram
+                    profile["narrative"] = narrative
+            else:
+                # 범주형 변수 (막대 그래프 비율과 나레이션)
+                raw_series = df_ready[col].dropna()
+                
+                if len(raw_series) > 0:
+                    # 범주별 카운트 계산 및 이름 오름차순 정렬
+                    category_counts = raw_series.value_counts()
+                    category_counts = category_counts[category_counts > 0]  # category dtype의 미사용 범주 제외
+                    category_counts = category_counts.sort_index()  # 범주 이름 오름차순
+                    
+                    # 빈도를 퍼센트로 변환
+                    category_percentages = (category_counts / len(raw_series)) * 100
+                    
+                    # 총 범주 개수
+                    total_categories = len(category_percentages)
+                    
+                    # 상위 분포 범주 찾기 (빈도 기준)
+                    top_categories = category_percentages.sort_values(ascending=False)
+                    
+                    # 분포 특성 분석
+                    # 1. 가장 많은 범주 3개
+                    top_3 = []
+                    for i, (cat, pct) in enumerate(top_categories.head(3).items()):
+                        if pct >= 100:
+                            pct_str = f"{pct:,.0f}"
+                        else:
+                            pct_str = f"{pct:.1f}"
+                        top_3.append(f"'{cat}' ({pct_str}%)")
+                    
+                    # 2. 분포 형태 분석
+                    # 집중도 분석
+                    top1_pct = top_categories.iloc[0]
+                    top2_pct = top_categories.iloc[1] if len(top_categories) > 1 else 0
+                    top3_pct = top_categories.iloc[2] if len(top_categories) > 2 else 0
+                    
+                    # 상위 3개 범주의 누적 비율
+                    top3_cumulative = top1_pct + top2_pct + top3_pct
+                    
+                    # 분포 형태 판단
+                    if top1_pct >= 70:
+                        distribution_type = "극도로 집중된 분포"
+                        distribution_desc = f"전체 데이터의 대부분({top1_pct:.1f}%)이 '{top_categories.index[0]}' 범주에 집중"
+                    elif top1_pct >= 50:
+                        distribution_type = "매우 집중된 분포"
+                        distribution_desc = f"전체 데이터의 절반 이상({top1_pct:.1f}%)이 '{top_categories.index[0]}' 범주에 집중"
+                    elif top3_cumulative >= 80 and len(top_categories) >= 3:
+                        distribution_type = "상위 범주 집중 분포"
+                        top3_names = "', '".join([str(c) for c in top_categories.head(3).index])
+                        distribution_desc = f"상위 3개 범주('{top3_names}')에 전체 데이터의 {top3_cumulative:.1f}%가 집중"
+                    elif top1_pct >= 30:
+                        distribution_type = "약간 치우친 분포"
+                        distribution_desc = f"'{top_categories.index[0]}' 범주에 {top1_pct:.1f}%가 분포하며, 나머지 범주들에도 고르게 분산"
+                    else:
+                        distribution_type = "균등한 분포"
+                        distribution_desc = f"전체 {total_categories}개 범주에 비교적 고르게 분포"
                     
-                    st.write(narrative)
-                elif not is_numeric:
-                    # 범주형 변수 나레이션
-                    raw_series = df_ready[col].dropna()
+                    # 3. 희소 범주 분석 (5% 미만)
+                    sparse_categories = category_percentages[category_percentages < 5]
+                    sparse_ratio = len(sparse_categories) / total_categories * 100 if total_categories > 0 else 0
                     
-                    if len(raw_series) > 0:
-                        # 범주별 카운트 계산 및 이름 오름차순 정렬
-                        category_counts = raw_series.value_counts()
-                        category_counts = category_counts.sort_index()  # 범주 이름 오름차순
-                        
-                        # 빈도를 퍼센트로 변환
-                        category_percentages = (category_counts / len(raw_series)) * 100
-                        
-                        # 총 범주 개수
-                        total_categories = len(category_percentages)
-                        
-                        # 상위 분포 범주 찾기 (빈도 기준)
-                        top_categories = category_percentages.sort_values(ascending=False)
-                        
-                        # 분포 특성 분석
-                        # 1. 가장 많은 범주 3개
-                        top_3 = []
-                        for i, (cat, pct) in enumerate(top_categories.head(3).items()):
-                            if pct >= 100:
-                                pct_str = f"{pct:,.0f}"
-                            else:
-                                pct_str = f"{pct:.1f}"
-                            top_3.append(f"'{cat}' ({pct_str}%)")
-                        
-                        # 2. 분포 형태 분석
-                        # 집중도 분석
-                        top1_pct = top_categories.iloc[0]
-                        top2_pct = top_categories.iloc[1] if len(top_categories) > 1 else 0
-                        top3_pct = top_categories.iloc[2] if len(top_categories) > 2 else 0
-                        
-                        # 상위 3개 범주의 누적 비율
-                        top3_cumulative = top1_pct + top2_pct + top3_pct
-                        
-                        # 분포 형태 판단
-                        if top1_pct >= 70:
-                            distribution_type = "극도로 집중된 분포"
-                            distribution_desc = f"전체 데이터의 대부분({top1_pct:.1f}%)이 '{top_categories.index[0]}' 범주에 집중"
-                        elif top1_pct >= 50:
-                            distribution_type = "매우 집중된 분포"
-                            distribution_desc = f"전체 데이터의 절반 이상({top1_pct:.1f}%)이 '{top_categories.index[0]}' 범주에 집중"
-                        elif top3_cumulative >= 80 and len(top_categories) >= 3:
-                            distribution_type = "상위 범주 집중 분포"
-                            top3_names = "', '".join([str(c) for c in top_categories.head(3).index])
-                            distribution_desc = f"상위 3개 범주('{top3_names}')에 전체 데이터의 {top3_cumulative:.1f}%가 집중"
-                        elif top1_pct >= 30:
-                            distribution_type = "약간 치우친 분포"
-                            distribution_desc = f"'{top_categories.index[0]}' 범주에 {top1_pct:.1f}%가 분포하며, 나머지 범주들에도 고르게 분산"
-                        else:
-                            distribution_type = "균등한 분포"
-                            distribution_desc = f"전체 {total_categories}개 범주에 비교적 고르게 분포"
-                        
-                        # 3. 희소 범주 분석 (5% 미만)
-                        sparse_categories = category_percentages[category_percentages < 5]
-                        sparse_ratio = len(sparse_categories) / total_categories * 100 if total_categories > 0 else 0
-                        
-                        if len(sparse_categories) > 0:
-                            sparse_desc = f"전체 {total_categories}개 범주 중 {len(sparse_categories)}개({sparse_ratio:.0f}%)가 5% 미만의 적은 데이터를 포함하고 있어, 이들 범주는 분석 시 신뢰도가 낮을 수 있습니다."
-                        else:
-                            sparse_desc = f"모든 범주가 5% 이상의 데이터를 포함하고 있어 범주별 분석 신뢰도가 높습니다."
-                        
-                        # 4. 범주 다양성 분석
-                        if total_categories <= 3:
-                            diversity_desc = f"총 {total_categories}개의 범주로 구성된 단순한 범주형 변수입니다."
-                        elif total_categories <= 7:
-                            diversity_desc = f"총 {total_categories}개의 범주로 구성되어 있으며, 적절한 다양성을 가진 변수입니다."
-                        elif total_categories <= 15:
-                            diversity_desc = f"총 {total_categories}개의 범주로 구성되어 있으며, 비교적 많은 범주를 포함하는 변수입니다."
-                        else:
-                            diversity_desc = f"총 {total_categories}개의 범주로 구성되어 있으며, 매우 많은 범주를 포함하는 변수입니다."
-                        
-                        # 최종 나레이션 구성
-                        narrative = f"**📊 분포 특성 분석**: {sparse_desc} {diversity_desc}\n\n**📈 분포 형태**: {distribution_type}입니다. {distribution_desc}되어 있습니다. {', '.join(top_3)} 순으로 데이터가 많이 분포되어 있습니다."
-                        
-                        st.write(narrative)
+                    if len(sparse_categories) > 0:
+                        sparse_desc = f"전체 {total_categories}개 범주 중 {len(sparse_categories)}개({sparse_ratio:.0f}%)가 5% 미만의 적은 데이터를 포함하고 있어, 이들 범주는 분석 시 신뢰도가 낮을 수 있습니다."
+                    else:
+                        sparse_desc = f"모든 범주가 5% 이상의 데이터를 포함하고 있어 범주별 분석 신뢰도가 높습니다."
+                    
+                    # 4. 범주 다양성 분석
+                    if total_categories <= 3:
+                        diversity_desc = f"총 {total_categories}개의 범주로 구성된 단순한 범주형 변수입니다."
+                    elif total_categories <= 7:
+                        diversity_desc = f"총 {total_categories}개의 범주로 구성되어 있으며, 적절한 다양성을 가진 변수입니다."
+                    elif total_categories <= 15:
+                        diversity_desc = f"총 {total_categories}개의 범주로 구성되어 있으며, 비교적 많은 범주를 포함하는 변수입니다."
                     else:
-                        st.warning(f"{col} 변수에 유효한 데이터가 없습니다.")
+                        diversity_desc = f"총 {total_categories}개의 범주로 구성되어 있으며, 매우 많은 범주를 포함하는 변수입니다."
+                    
+                    # 최종 나레이션 구성
+                    narrative = f"**📊 분포 특성 분석**: {sparse_desc} {diversity_desc}\n\n**📈 분포 형태**: {distribution_type}입니다. {distribution_desc}되어 있습니다. {', '.join(top_3)} 순으로 데이터가 많이 분포되어 있습니다."
+
+                    profile["categories"] = {"percentages": category_percentages, "narrative": narrative}
+    return profiles
+
+
+# ==============================
+# 렌더링
+# ==============================
+def _format_x_ticks(x, pos):
+    # x축 값 포맷팅 (1000 이상은 쉼표 추가, 10 미만은 소수점 둘째자리)
+    if x >= 1000:
+        return f'{x:,.0f}'
+    elif x >= 10:
+        return f'{x:.1f}'
+    else:
+        return f'{x:.2f}'
+
+
+def perform_eda_analysis(df_ready, y_column, x_columns):
+    """데이터 탐색 분석을 수행하는 함수"""
+    
+    # 변수별 분포 분석 (히스토그램만)
+    st.markdown('<h4 style="margin: 10px 0; color: #333;">📊 변수별 분포 분석</h4>', unsafe_allow_html=True)
+
+    # 모든 변수들 (Y + X) - 수치형과 범주형 모두 포함
+    all_cols = [y_column] + x_columns
+    
+    if len(all_cols) > 0:
+        profiles = compute_eda_profile(df_ready, y_column, x_columns)
+        for idx, (col, profile) in enumerate(zip(all_cols, profiles)):
+            is_numeric = profile["is_numeric"]
+            
+            # 변수별 제목 추가
+            if col == y_column:
+                st.markdown(f'<h5 style="margin: 10px 0; color: #666;">{col} (Y 변수)</h5>', unsafe_allow_html=True)
+            else:
+                x_idx = idx - 1  # Y변수 제외하고 X변수 순서 계산
+                # 한글 순번 생성
+                korean_numbers = ["첫번째", "두번째", "세번째", "네번째", "다섯번째", "여섯번째", "일곱번째", "여덟번째", "아홉번째", "열번째"]
+                if x_idx < len(korean_numbers):
+                    order_text = korean_numbers[x_idx]
+                else:
+                    order_text = f"{x_idx + 1}번째"
+                st.markdown(f'<h5 style="margin: 10px 0; color: #666;">{col} ({order_text} X 변수)</h5>', unsafe_allow_html=True)
+            
+            # 각 변수별로 좌우 컬럼 레이아웃
+            col1, col2 = st.columns([1, 1])
+            
+            with col1:
+                # 히스토그램 차트
+                fig, ax = plt.subplots(figsize=(8, 6))
+                
+                if is_numeric and profile["histogram"] is not None:
+                    hist_profile = profile["histogram"]
+                    edges = hist_profile["edges"]
+                    
+                    # 히스토그램 그리기 (미리 계산한 구간별 빈도 %)
+                    ax.hist(edges[:-1], bins=edges, weights=hist_profile["counts"], alpha=0.7,
+                            color='skyblue' if col == y_column else 'lightcoral',
+                            edgecolor='black')
+                    ax.set_ylim(0, 100)
+                    
+                    # 중위 50% 구간 영역 표시 (Q25-Q75)
+                    ax.axvspan(*hist_profile["span"], alpha=0.2, color='lightblue', 
+                              label='중위 50% 구간')
+                    
+                    # 평균선 표시 (진한 세로선)
+                    ax.axvline(hist_profile["mean"], color='darkblue', linewidth=2, 
+                              label='평균')
+                    
+                    # 그룹 별 대푯값 표시 (평균선보다 옅은 색)
+                    for i, x in enumerate(hist_profile["group_lines"]):
+                        ax.axvline(x, color='steelblue', linewidth=1.5, linestyle='--', alpha=0.7,
+                                  label='그룹 별 대푯값' if i == 0 else '')
+                    
+                    # 그래프 꾸미기
+                    ax.set_xlabel(col, fontsize=14)
+                    ax.set_ylabel('빈도 (%)', fontsize=14)
+                    ax.grid(True, alpha=0.3)
+                    
+                    # x축, y축 틱 라벨 크기 설정
+                    ax.tick_params(axis='both', which='major', labelsize=14)
+                    
+                    ax.xaxis.set_major_formatter(plt.FuncFormatter(_format_x_ticks))
+                    
+                    # 범례 추가 (최대 3개 항목만 표시)
+                    handles, labels = ax.get_legend_handles_labels()
+                    if len(handles) > 3:
+                        handles = handles[:3]
+                        labels = labels[:3]
+                    ax.legend(handles, labels, loc='upper right', fontsize=10)
+                
+                elif not is_numeric and profile["categories"] is not None:
+                    # 범주형 변수 처리
+                    category_percentages = profile["categories"]["percentages"]
+                    
+                    # 막대 그래프 그리기
+                    bars = ax.bar(range(len(category_percentages)), 
+                                 category_percentages.values,
+                                 color='lightcoral' if col != y_column else 'skyblue',
+                                 edgecolor='black',
+                                 alpha=0.7)
+                    
+                    # x축 설정
+                    ax.set_xticks(range(len(category_percentages)))
+                    ax.set_xticklabels(category_percentages.index, rotation=45, ha='right', fontsize=12)
+                    
+                    # y축 설정 (0-100%)
+                    ax.set_ylim(0, 100)
+                    ax.set_ylabel('빈도 (%)', fontsize=14)
+                    ax.set_xlabel(col, fontsize=14)
+                    
+                    # 그리드 추가
+                    ax.grid(True, alpha=0.3, axis='y')
+                    
+                    # y축 틱 라벨 크기 설정
+                    ax.tick_params(axis='y', which='major', labelsize=14)
+                
+                plt.tight_layout()
+                st.pyplot(fig)
+            
+            with col2:
+                # 변수별 분포 내러티브
+                if is_numeric and profile["narrative"] is not None:
+                    st.write(profile["narrative"])
+                elif not is_numeric and profile["categories"] is not None:
+                    st.write(profile["categories"]["narrative"])
                 else:
                     st.warning(f"{col} 변수에 유효한 데이터가 없습니다.")
             
@@ -1137,5 +1171,4 @@ def perform_eda_analysis(df_ready, y_column, x_columns):
                 st.markdown("---")  # 변수 간 구분선
     
     else:
-        st.info("분석할 변수가 없습니다.") 
-   
+        st.info("분석할 변수가 없습니다.")
@@ -14,6 +14,8 @@ from sklearn.metrics import r2_score
 import cProfile
 import pstats
 import io
+import session_cache
+import result_store
 
 # 코드 소요 시간 분석 프로파일링
 def profile_run(label, fn, *args, **kwargs):
@@ -90,43 +92,66 @@ def actual_vs_pred_plot(y_true, y_pred, title="", square_size=600, enforce_squar
     fig.update_layout(**layout_kwargs)
     return fig
 
-@st.cache_resource
-def perform_linear_regression(df_ready, y_column, x_columns):
+def _term_contributions(model, scaler, X_test_s, columns):
+    """테스트 표본(최대 200행)에서 각 항의 평균 기여도와 비율(전체 합 대비, 부호 유지)을 계산합니다."""
+    coef_series = pd.Series(model.coef_, index=columns)
+    Xs = pd.DataFrame(X_test_s, columns=columns).iloc[:min(200, len(X_test_s))]
+
+    # 역변환을 위한 스케일러 정보
+    inv_scaler = StandardScaler()
+    inv_scaler.mean_ = scaler.mean_
+    inv_scaler.scale_ = scaler.scale_
+    Xs_original = pd.DataFrame(inv_scaler.inverse_transform(Xs), columns=columns)
+
+    # 수치형 변수만 처리 (범주형 변수는 이미 제외됨)
+    term_analysis = []
+    for name, coef in coef_series.items():
+        avg_contrib = float(np.mean(Xs_original[name] * coef)) if len(Xs_original) else 0.0
+        term_analysis.append({"name": name, "avg_contribution": avg_contrib})
+
+    # 절편 추가
+    term_analysis.append({"name": "절편", "avg_contribution": float(model.intercept_)})
+
+    # 전체 기여도 합계 계산 (음수/양수 모두 포함)
+    total_contribution = sum(term["avg_contribution"] for term in term_analysis)
+
+    # 각 항의 비율 계산 (전체 기여도 합계 대비, 부호 유지)
+    for term in term_analysis:
+        ratio = (term["avg_contribution"] / total_contribution * 100.0) if total_contribution != 0 else 0.0
+        term["ratio"] = ratio
+
+    # 절댓값 기준으로 정렬 (표시 순서만 결정)
+    term_analysis.sort(key=lambda t: abs(t["ratio"]), reverse=True)
+    return coef_series, term_analysis
 
-    # --- 1단계: 기준점 설정 (항상 표시) ---
 
+def compute_linear_models(df_ready, y_column, x_columns):
+    """
+    OLS / ElasticNet 적합만 수행합니다. (Streamlit 비의존, 배치 실행에서도 사용)
+    - 실패 시 {"error": 메시지, "level": "warning" | "error"} 를 반환합니다.
+    """
     X = df_ready[x_columns].copy()
     y = df_ready[y_column].copy()
 
     # 범주형 변수들을 완전히 제외하고 수치형 변수만 선택
     # 더 확실한 방법: object, string, category 타입을 제외
     numeric_cols = []
-    excluded_cat_cols = []
-    
     for col in x_columns:
         if X[col].dtype in ['object', 'string', 'category'] or not pd.api.types.is_numeric_dtype(X[col]):
-            excluded_cat_cols.append(col)
-        else:
-            numeric_cols.append(col)
-    
+            continue
+        numeric_cols.append(col)
+
     if not numeric_cols:
-        st.warning("선형회귀분석을 위한 수치형 변수가 없습니다.")
-        return {"r2_test": 0.0}
-    
+        return {"error": "선형회귀분석을 위한 수치형 변수가 없습니다.", "level": "warning"}
+
     # 수치형 변수만으로 X 재구성
     X = X[numeric_cols]
-    
+
     # y를 확실히 수치형으로 변환 (문자열 숫자 등 처리)
     try:
         y = pd.to_numeric(y, errors='coerce')
     except Exception:
-        st.error("Y 변수를 수치형으로 변환할 수 없습니다.")
-        return {"r2_test": 0.0}
-    
-    # 범주형 변수가 제외되었음을 사용자에게 알림 - 일시 비활성화
-    # if excluded_cat_cols:
-    #     with st.expander(f"ℹ️ 범주형 변수는 분석에서 제외"):
-    #         st.caption(f"선형회귀분석에서는 수치형 변수만 사용됩니다. (제외된 변수 {len(excluded_cat_cols)}개: {', '.join(excluded_cat_cols)})")
+        return {"error": "Y 변수를 수치형으로 변환할 수 없습니다.", "level": "error"}
 
     # 데이터 타입 재확인 및 강제 변환
     for col in X.columns:
@@ -134,69 +159,145 @@ def perform_linear_regression(df_ready, y_column, x_columns):
             try:
                 X[col] = pd.to_numeric(X[col], errors='coerce')
             except:
-                st.error(f"변수 '{col}'을 수치형으로 변환할 수 없습니다.")
-                return {"r2_test": 0.0}
-    
+                return {"error": f"변수 '{col}'을 수치형으로 변환할 수 없습니다.", "level": "error"}
+
     # NaN 값이 있는 행 제거 (X 기준) 및 y 정렬
     X = X.dropna()
     y = y.loc[X.index]
-    
+
     # y에 남아있는 NaN 제거하고 X 동기화
     _mask_valid_y = ~y.isna()
     if _mask_valid_y.sum() != len(y):
         X = X.loc[_mask_valid_y]
         y = y.loc[_mask_valid_y]
-    
+
     if len(X) == 0:
-        st.warning("수치형 변환 후 유효한 데이터가 없습니다.")
-        return {"r2_test": 0.0}
+        return {"error": "수치형 변환 후 유효한 데이터가 없습니다.", "level": "warning"}
 
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-    
-    # === OLS용 스케일러 ===
+
+    # === OLS (Ordinary Least Squares) 분석 ===
     OLS_scaler = StandardScaler(with_mean=False)
     OLS_X_train_s = OLS_scaler.fit_transform(X_train)
     OLS_X_test_s = OLS_scaler.transform(X_test)
 
-    # === OLS (Ordinary Least Squares) 분석 ===
     OLS_lr = LinearRegression()
     OLS_lr.fit(OLS_X_train_s, y_train)
-    OLS_y_tr_pred = OLS_lr.predict(OLS_X_train_s)
     OLS_y_te_pred = OLS_lr.predict(OLS_X_test_s)
+    OLS_coef_series, OLS_term_analysis = _term_contributions(OLS_lr, OLS_scaler, OLS_X_test_s, X.columns)
 
-    OLS_r2_te = r2_score(y_test, OLS_y_te_pred)
-
-    OLS_coef_series = pd.Series(OLS_lr.coef_, index=X.columns)
-    OLS_Xs = pd.DataFrame(OLS_X_test_s, columns=X.columns).iloc[:min(200, len(X_test))]
-    OLS_term_analysis = [] #각 항별 기여도 계산
-    OLS_y_pred_samp = (OLS_Xs @ OLS_coef_series.values) + OLS_lr.intercept_
-    OLS_y_pred_mean = float(np.mean(OLS_y_pred_samp)) if len(OLS_Xs) else 1.0
-    
-    # OLS 역변환을 위한 스케일러 정보 저장
-    OLS_inv_scaler = StandardScaler()
-    OLS_inv_scaler.mean_ = OLS_scaler.mean_
-    OLS_inv_scaler.scale_ = OLS_scaler.scale_
-    
-    OLS_Xs_original = pd.DataFrame(OLS_inv_scaler.inverse_transform(OLS_Xs), columns=X.columns)
-    
-    # 수치형 변수만 처리 (범주형 변수는 이미 제외됨)
-    for name, coef in OLS_coef_series.items():
-        avg_contrib = float(np.mean(OLS_Xs_original[name] * coef)) if len(OLS_Xs_original) else 0.0
-        OLS_term_analysis.append({"name": name, "avg_contribution": avg_contrib})
-        
-    # 절편 추가
-    OLS_term_analysis.append({"name": "절편", "avg_contribution": float(OLS_lr.intercept_)})
-    
-    # 전체 기여도 합계 계산 (음수/양수 모두 포함)
-    OLS_total_contribution = sum(term["avg_contribution"] for term in OLS_term_analysis)
-    
-    # 각 항의 비율 계산 (전체 기여도 합계 대비, 부호 유지)
-    for term in OLS_term_analysis:
-        ratio = (term["avg_contribution"] / OLS_total_contribution * 100.0) if OLS_total_contribution != 0 else 0.0
-        term["ratio"] = ratio
-    
-    # 절댓값 기준으로 정렬 (표시 순서만 결정)
-    OLS_term_analysis.sort(key=lambda t: abs(t["ratio"]), reverse=True)
+    # === Elastic Net Regression 분석 ===
+    Elastic_scaler = StandardScaler(with_mean=True)  # ElasticNet은 평균 중심화가 중요
+    Elastic_X_train_s = Elastic_scaler.fit_transform(X_train)
+    Elastic_X_test_s = Elastic_scaler.transform(X_test)
+
+    # 효율적인 Path 알고리즘을 사용하는 CV 모델 (이 한 번의 fit으로 최적 파라미터 찾기 + 최종 모델 학습)
+    # n_jobs=-1로 모든 CPU 코어를 사용하여 작업 시간을 대폭 단축합니다.
+    Elastic_lr = ElasticNetCV(
+        l1_ratio=[0.1, 0.5, 0.7, 0.9, 0.95, 0.99, 1], 
+        alphas=[0.001, 0.01, 0.1, 1, 10, 100],
+        cv=5, 
+        max_iter=2000,
+        random_state=42,
+        n_jobs=-1 
+    )
+    Elastic_lr.fit(Elastic_X_train_s, y_train)
+    Elastic_y_te_pred = Elastic_lr.predict(Elastic_X_test_s)
+    Elastic_coef_series, Elastic_term_analysis = _term_contributions(Elastic_lr, Elastic_scaler, Elastic_X_test_s, X.columns)
+
+    return {
+        "numeric_cols": numeric_cols,
+        "n_rows": len(X),
+        "y_test": y_test,
+        "OLS": {
+            "model": OLS_lr,
+            "r2_test": r2_score(y_test, OLS_y_te_pred),
+            "y_test_pred": OLS_y_te_pred,
+            "coef_series": OLS_coef_series,
+            "term_analysis": OLS_term_analysis,
+        },
+        "ElasticNet": {
+            "model": Elastic_lr,
+            "r2_test": Elastic_lr.score(Elastic_X_test_s, y_test),
+            "y_test_pred": Elastic_y_te_pred,
+            "coef_series": Elastic_coef_series,
+            "term_analysis": Elastic_term_analysis,
+            "best_alpha": Elastic_lr.alpha_,
+            "best_l1_ratio": Elastic_lr.l1_ratio_,
+        },
+    }
+
+# --- dCor 히트맵 분석 helper: 거리상관(0~1, 부호 없음) ---
+# job_runner 워커 스레드에서도 호출되므로 st 캐시 없이 순수 함수로 두고,
+# 캐시는 compute_correlation_matrices(세션) / result_store(디스크)에서 행렬 단위로 합니다.
+def distance_correlation(a, b):
+    a = pd.Series(a).astype(float); b = pd.Series(b).astype(float)
+    m = (~a.isna()) & (~b.isna()); a = a[m].values; b = b[m].values
+    if len(a) < 3: return np.nan
+    A = np.abs(a[:, None] - a[None, :]); B = np.abs(b[:, None] - b[None, :])
+    A -= A.mean(axis=1, keepdims=True); A -= A.mean(axis=0, keepdims=True); A += A.mean()
+    B -= B.mean(axis=1, keepdims=True); B -= B.mean(axis=0, keepdims=True); B += B.mean()
+    dcov2 = np.mean(A*B); dvarx = np.mean(A*A); dvary = np.mean(B*B)
+    if dvarx <= 0 or dvary <= 0: return 0.0
+    dcor = np.sqrt(max(dcov2,0)) / np.sqrt(np.sqrt(dvarx*dvary))
+    return float(np.clip(dcor, 0, 1))
+
+
+def compute_dcor_matrix(df_num, cols):
+    M = pd.DataFrame(np.eye(len(cols)), index=cols, columns=cols, dtype=float)
+    for i, c1 in enumerate(cols):
+        for j, c2 in enumerate(cols):
+            if j < i: 
+                M.iloc[i, j] = M.iloc[j, i]
+            elif j > i:
+                M.iloc[i, j] = distance_correlation(df_num[c1], df_num[c2])
+                M.iloc[j, i] = M.iloc[i, j]
+    return M
+
+
+# ==============================
+# 계산 계층 (내용 해시로 캐시: 세션 메모리 → 결과 저장소 → 계산)
+# ==============================
+# perform_linear_regression은 아래 결과를 그리기만 하므로 재실행 시 렌더링 비용만 듭니다.
+
+@session_cache.memoize("linear", spinner="선형 회귀 모델 학습 중...")
+def cached_linear_models(df_ready, y_column, x_columns):
+    """compute_linear_models 결과 (같은 데이터·Y·X면 다시 학습하지 않음)."""
+    return result_store.cached_result("linear", y_column, x_columns,
+                                      lambda: compute_linear_models(df_ready, y_column, x_columns))
+
+
+@session_cache.memoize("corr", spinner="상관계수 계산 중...")
+def compute_correlation_matrices(df_ready, y_column, x_columns, numeric_cols):
+    """Pearson / Spearman / Kendall / dCor 상관 행렬 {"pearson": DataFrame, ...}."""
+    matrices = {}
+    for method in ("pearson", "spearman", "kendall"):
+        matrices[method] = result_store.cached_result(
+            "corr", y_column, x_columns,
+            lambda method=method: df_ready[numeric_cols].corr(method=method), params={"method": method})
+    matrices["dcor"] = result_store.cached_result(
+        "corr", y_column, x_columns,
+        lambda: compute_dcor_matrix(df_ready[numeric_cols], numeric_cols), params={"method": "dcor"})
+    return matrices
+
+
+# ==============================
+# 렌더링
+# ==============================
+def perform_linear_regression(df_ready, y_column, x_columns):
+
+    # --- 1단계: 기준점 설정 (항상 표시) ---
+    fit = cached_linear_models(df_ready, y_column, x_columns)
+    if "error" in fit:
+        (st.error if fit["level"] == "error" else st.warning)(fit["error"])
+        return {"r2_test": 0.0}
+
+    y_test = fit["y_test"]
+    OLS_lr = fit["OLS"]["model"]
+    OLS_r2_te = fit["OLS"]["r2_test"]
+    OLS_y_te_pred = fit["OLS"]["y_test_pred"]
+    OLS_coef_series = fit["OLS"]["coef_series"]
+    OLS_term_analysis = fit["OLS"]["term_analysis"]
 
     # 히트맵과 비교표를 생성하기 위한 변수 저장
     st.session_state.setdefault("OLS_lr_coefficients", {})
@@ -220,66 +321,13 @@ def perform_linear_regression(df_ready, y_column, x_columns):
         OLS_parts.append("&nbsp;&nbsp;" + s)
     OLS_equation_html = "Y ("+str(y_column)+") = <br>" + "<br>".join(OLS_parts)
 
-    # === ElasticNet용 스케일러 ===
-    Elastic_scaler = StandardScaler(with_mean=True)  # ElasticNet은 평균 중심화가 중요
-    Elastic_X_train_s = Elastic_scaler.fit_transform(X_train)
-    Elastic_X_test_s = Elastic_scaler.transform(X_test)
-
-    # === Elastic Net Regression 분석 ===
-
-    # 1. 효율적인 Path 알고리즘을 사용하는 CV 모델 생성 및 학습
-    # n_jobs=-1로 모든 CPU 코어를 사용하여 작업 시간을 대폭 단축합니다.
-    Elastic_lr = ElasticNetCV(
-        l1_ratio=[0.1, 0.5, 0.7, 0.9, 0.95, 0.99, 1], 
-        alphas=[0.001, 0.01, 0.1, 1, 10, 100],
-        cv=5, 
-        max_iter=2000,
-        random_state=42,
-        n_jobs=-1 
-    )
-
-    # 2. 바로 학습 (이 한 번의 fit으로 최적 파라미터 찾기 + 최종 모델 학습이 끝납니다)
-    Elastic_lr.fit(Elastic_X_train_s, y_train)
-
-    # 3. 기존 코드 하단부와 호환을 위한 결과값 할당
-    Elastic_r2_te = Elastic_lr.score(Elastic_X_test_s, y_test)
-    best_alpha = Elastic_lr.alpha_
-    best_l1_ratio = Elastic_lr.l1_ratio_
-
-    Elastic_y_tr_pred = Elastic_lr.predict(Elastic_X_train_s)
-    Elastic_y_te_pred = Elastic_lr.predict(Elastic_X_test_s)
-
-    Elastic_coef_series = pd.Series(Elastic_lr.coef_, index=X.columns)
-    Elastic_Xs = pd.DataFrame(Elastic_X_test_s, columns=X.columns).iloc[:min(200, len(X_test))]
-    Elastic_term_analysis = [] #각 항별 기여도 계산
-    Elastic_y_pred_samp = (Elastic_Xs @ Elastic_coef_series.values) + Elastic_lr.intercept_
-    Elastic_y_pred_mean = float(np.mean(Elastic_y_pred_samp)) if len(Elastic_Xs) else 1.0
-    
-    # ElasticNet 역변환을 위한 스케일러 정보 저장
-    Elastic_inv_scaler = StandardScaler()
-    Elastic_inv_scaler.mean_ = Elastic_scaler.mean_
-    Elastic_inv_scaler.scale_ = Elastic_scaler.scale_
-    
-    Elastic_Xs_original = pd.DataFrame(Elastic_inv_scaler.inverse_transform(Elastic_Xs), columns=X.columns)
-    
-    # 수치형 변수만 처리 (범주형 변수는 이미 제외됨)
-    for name, coef in Elastic_coef_series.items():
-        avg_contrib = float(np.mean(Elastic_Xs_original[name] * coef)) if len(Elastic_Xs_original) else 0.0
-        Elastic_term_analysis.append({"name": name, "avg_contribution": avg_contrib})
-        
-    # 절편 추가
-    Elastic_term_analysis.append({"name": "절편", "avg_contribution": float(Elastic_lr.intercept_)})
-    
-    # 전체 기여도 합계 계산 (음수/양수 모두 포함)
-    Elastic_total_contribution = sum(term["avg_contribution"] for term in Elastic_term_analysis)
-    
-    # 각 항의 비율 계산 (전체 기여도 합계 대비, 부호 유지)
-    for term in Elastic_term_analysis:
-        ratio = (term["avg_contribution"] / Elastic_total_contribution * 100.0) if Elastic_total_contribution != 0 else 0.0
-        term["ratio"] = ratio
-    
-    # 절댓값 기준으로 정렬 (표시 순서만 결정)
-    Elastic_term_analysis.sort(key=lambda t: abs(t["ratio"]), reverse=True)
+    Elastic_lr = fit["ElasticNet"]["model"]
+    Elastic_r2_te = fit["ElasticNet"]["r2_test"]
+    Elastic_y_te_pred = fit["ElasticNet"]["y_test_pred"]
+    Elastic_coef_series = fit["ElasticNet"]["coef_series"]
+    Elastic_term_analysis = fit["ElasticNet"]["term_analysis"]
+    best_alpha = fit["ElasticNet"]["best_alpha"]
+    best_l1_ratio = fit["ElasticNet"]["best_l1_ratio"]
 
     # 히트맵과 비교표를 생성하기 위한 변수 저장
     st.session_state.setdefault("Elastic_lr_coefficients", {})
@@ -1275,32 +1323,6 @@ def perform_linear_regression(df_ready, y_column, x_columns):
     # st.dataframe(acc_df.applymap(lambda v: f"{v:.4f}" if pd.notnull(v) else ""), width='stretch')
 
 
-    # --- dCor 히트맵 분석 helper: 거리상관(0~1, 부호 없음) ---
-    @st.cache_data(show_spinner="dCor 계산 중...")
-    def distance_correlation(a, b):
-        a = pd.Series(a).astype(float); b = pd.Series(b).astype(float)
-        m = (~a.isna()) & (~b.isna()); a = a[m].values; b = b[m].values
-        if len(a) < 3: return np.nan
-        A = np.abs(a[:, None] - a[None, :]); B = np.abs(b[:, None] - b[None, :])
-        A -= A.mean(axis=1, keepdims=True); A -= A.mean(axis=0, keepdims=True); A += A.mean()
-        B -= B.mean(axis=1, keepdims=True); B -= B.mean(axis=0, keepdims=True); B += B.mean()
-        dcov2 = np.mean(A*B); dvarx = np.mean(A*A); dvary = np.mean(B*B)
-        if dvarx <= 0 or dvary <= 0: return 0.0
-        dcor = np.sqrt(max(dcov2,0)) / np.sqrt(np.sqrt(dvarx*dvary))
-        return float(np.clip(dcor, 0, 1))
-
-    @st.cache_data(show_spinner="dCor 계산 중...")
-    def compute_dcor_matrix(df_num, cols):
-        M = pd.DataFrame(np.eye(len(cols)), index=cols, columns=cols, dtype=float)
-        for i, c1 in enumerate(cols):
-            for j, c2 in enumerate(cols):
-                if j < i: 
-                    M.iloc[i, j] = M.iloc[j, i]
-                elif j > i:
-                    M.iloc[i, j] = distance_correlation(df_num[c1], df_num[c2])
-                    M.iloc[j, i] = M.iloc[i, j]
-        return M
-
     with st.container(border=True):
         # 상관관계 히트맵
         st.markdown('<h4 style="margin: 10px 0; color: #333;">🔗 상관관계 히트맵 분석</h4>', unsafe_allow_html=True)
@@ -1322,12 +1344,14 @@ def perform_linear_regression(df_ready, y_column, x_columns):
         """, unsafe_allow_html=True)
 
         # 수치형 변수만 선택하여 상관관계 계산
-        numeric_cols = [col for col in [y_column] + x_columns if df_ready[col].dtype in ['int64', 'float64']]
+        numeric_cols = [col for col in [y_column] + x_columns
+                        if pd.api.types.is_numeric_dtype(df_ready[col]) and not pd.api.types.is_bool_dtype(df_ready[col])]
         
         if len(numeric_cols) > 1:
            
             # 상관관계 분석 결과를 저장할 딕셔너리
             correlation_results = {}
+            matrices = compute_correlation_matrices(df_ready, y_column, x_columns, numeric_cols)
             
             # 4분할 컬럼으로 히트맵 배치
             heatmap_col1, heatmap_col2, heatmap_col3, heatmap_col4 = st.columns([1, 1, 1, 1])
@@ -1346,8 +1370,8 @@ def perform_linear_regression(df_ready, y_column, x_columns):
                 </div>
                 """, unsafe_allow_html=True)
 
-                # Pearson 상관계수 계산 함수 호출 (기존 방식)
-                correlation_matrix = df_ready[numeric_cols].corr(method='pearson')
+                # Pearson 상관계수 계산 (미리 계산한 행렬)
+                correlation_matrix = matrices["pearson"]
                 
                 # Pearson 상관계수 계산 함수 호출 (프로파일링 적용)
                 # correlation_matrix = profile_run(
@@ -1390,8 +1414,8 @@ def perform_linear_regression(df_ready, y_column, x_columns):
                 </div>
                 """, unsafe_allow_html=True)
                 
-                # Spearman 상관계수 계산 함수 호출
-                correlation_matrix = df_ready[numeric_cols].corr(method='spearman')
+                # Spearman 상관계수 계산 (미리 계산한 행렬)
+                correlation_matrix = matrices["spearman"]
 
                 # Spearman 상관계수 계산 함수 호출 (프로파일링 적용)
                 # correlation_matrix = profile_run(
@@ -1434,8 +1458,8 @@ def perform_linear_regression(df_ready, y_column, x_columns):
                 </div>
                 """, unsafe_allow_html=True)
                 
-                # Kendall 상관계수 계산 함수 호출
-                correlation_matrix = df_ready[numeric_cols].corr(method='kendall')
+                # Kendall 상관계수 계산 (미리 계산한 행렬)
+                correlation_matrix = matrices["kendall"]
                 
                 # Kendall 상관계수 계산 함수 호출 (프로파일링 적용)
                 # correlation_matrix = profile_run(
@@ -1478,8 +1502,8 @@ def perform_linear_regression(df_ready, y_column, x_columns):
                 </div>
                 """, unsafe_allow_html=True)
                 
-                # dcor matrix 계산 함수 호출
-                dcor_matrix = compute_dcor_matrix(df_ready[numeric_cols], numeric_cols)
+                # dcor matrix (미리 계산한 행렬)
+                dcor_matrix = matrices["dcor"]
 
                 # dcor matrix 계산 함수 호출 (프로파일링 적용)
                 # dcor_matrix = profile_run(
@@ -14,6 +14,8 @@ import shap
 # from umap import UMAP
 import time
 import warnings
+import session_cache
+import result_store
 from sklearn.decomposition import PCA
 
 # ==============================
@@ -45,11 +47,11 @@ def _validate_prediction(y_pred, model_name: str = "Unknown"):
     
     return True
 
-@st.cache_data
+@session_cache.memoize("ml", spinner="머신러닝 모델 학습 중...")
 def train_compare_models(_X_train, _y_train, _X_test, _y_test):
     """
     (캐시됨) RF, GB, SVM, NN + (Permutation Importance, SHAP) 총 6개 기법을 학습/비교 후 dict로 반환
-    - 이 함수는 @st.cache_data로 캐시되어 동일한 데이터에 대해서는 재실행되지 않습니다.
+    - 세션·데이터 네임스페이스 캐시(session_cache)에 저장되어 동일한 데이터에 대해서는 재실행되지 않습니다.
     """
 
     # 기본 4개 모델
@@ -188,7 +190,7 @@ def _pick_time_column(df: pd.DataFrame):
     - 없으면 'time','date','timestamp' 등 이름 기반 탐색
     """
     # 1) datetime dtype
-    dt_cols = [c for c in df.columns if np.issubdtype(df[c].dtype, np.datetime64)]
+    dt_cols = [c for c in df.columns if pd.api.types.is_datetime64_any_dtype(df[c])]
     if dt_cols:
         return dt_cols[0]
 
@@ -216,12 +218,16 @@ def _compute_case_distances(
     cat_cols: list,
     distance_metric: str = "L2",   # "L2" or "L1"
     cat_weight: float = 1.0,
+    prepared: dict = None,
 ):
     """
     수치형: z-score 기반 거리
     범주형: match=0 / mismatch=1 (가중치 적용)
+    prepared: _prepare_simulator() 결과가 있으면 열별 z-score·문자열 배열을 다시 계산하지 않음
     반환: distances(np.ndarray), valid_mask(np.ndarray)
     """
+    zscores = prepared["zscores"] if prepared else {}
+    cat_values = prepared["cat_values"] if prepared else {}
     n = len(df)
     valid_mask = np.ones(n, dtype=bool)
 
@@ -232,18 +238,19 @@ def _compute_case_distances(
         for c in numeric_cols:
             if c not in df.columns:
                 continue
-            col = df[c]
-            # df 값
-            x = col.values.astype(float)
-            mu = float(np.nanmean(x))
-            sd = _safe_std(col)
             # query
             q = float(x_query.get(c, np.nan))
             # query가 NaN이면 numeric 거리 계산에서 제외
             if np.isnan(q):
                 continue
 
-            z = (x - mu) / sd
+            if c in zscores:
+                z, mu, sd = zscores[c]
+            else:
+                x = df[c].values.astype(float)
+                mu = float(np.nanmean(x))
+                sd = _safe_std(df[c])
+                z = (x - mu) / sd
             zq = (q - mu) / sd
             diff = z - zq
 
@@ -268,11 +275,11 @@ def _compute_case_distances(
             # query가 비어 있으면 categorical은 제외
             if qv is None or (isinstance(qv, float) and np.isnan(qv)):
                 continue
-            v = df[c].astype(str).values
+            v, na = cat_values[c] if c in cat_values else (df[c].astype(str).values, pd.isna(df[c]).values)
             qvs = str(qv)
             mismatch = (v != qvs)
             # 결측은 mismatch로 간주(보수적으로)
-            mismatch = np.logical_or(mismatch, pd.isna(df[c]).values)
+            mismatch = np.logical_or(mismatch, na)
             cat_dist += cat_weight * mismatch.astype(float)
 
     total = num_dist + cat_dist
@@ -291,6 +298,7 @@ def _knn_case_retrieval(
     alpha: float = 0.20,
     delta: float = None,   # 예: 0.5
     use_mult: bool = True, # d <= d_best*(1+alpha)
+    prepared: dict = None,
 ):
     """
     1) 전체 거리 계산 후 K_max까지 정렬
@@ -308,6 +316,7 @@ def _knn_case_retrieval(
         cat_cols=cat_cols,
         distance_metric=distance_metric,
         cat_weight=cat_weight,
+        prepared=prepared,
     )
 
     # 유효 거리만
@@ -379,7 +388,7 @@ def _recommend_narrowing_candidates(df: pd.DataFrame, used_cols: list, top_n: in
         if nun <= 1:
             continue
         # 범주형/low-card 우선
-        if (not np.issubdtype(s.dtype, np.number)) and (nun <= 30):
+        if (not pd.api.types.is_numeric_dtype(s)) and (nun <= 30):
             cands.append((c, nun))
     cands.sort(key=lambda x: x[1])  # 너무 다양하지 않은 것 우선
     return [c for c, _ in cands[:top_n]]
@@ -510,6 +519,123 @@ def _find_extreme_variables(coverage_model: dict, x_row: pd.Series):
         return []
 
 
+# -----------------------------
+# --- Simulator precompute ---
+# -----------------------------
+# 슬라이더를 움직일 때마다 바뀌지 않는 값(범위·히스토그램·z-score·지도 투영·색상)은
+# 데이터별로 한 번만 계산하고, 시뮬레이터 조작 시에는 예측·유사 사례 검색·현재 위치만 다시 계산합니다.
+
+SIM_HIST_BINS = 40
+# 데이터 지도 배경에 그릴 최대 점 수 (넘으면 균등 간격으로 추림, 투영 학습은 전체 행 사용)
+MAP_MAX_POINTS = 20000
+# 배경 점 색상 (낮은 Y #E5E7EB → 중간 #9CA3AF → 높은 Y #374151, 투명도 0.55)
+MAP_BG_COLORSCALE = [
+    [0.0, 'rgba(229, 231, 235, 0.55)'],
+    [0.5, 'rgba(156, 163, 175, 0.55)'],
+    [1.0, 'rgba(55, 65, 81, 0.55)'],
+]
+
+
+def _histogram_bins(values, value_range=None):
+    """(구간별 개수, 구간 경계). 결측은 제외."""
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    return np.histogram(values, bins=SIM_HIST_BINS, range=value_range)
+
+
+@session_cache.memoize("simulator", spinner="시뮬레이터 준비 중...")
+def _prepare_simulator(df, numeric_x_cols, y_col):
+    """시뮬레이터 정적 데이터: X 슬라이더 범위·히스토그램, 유사 사례 검색용 z-score, Y 히스토그램."""
+    controls = {}
+    for c in numeric_x_cols:
+        col_min = float(np.nanmin(df[c]))
+        col_max = float(np.nanmax(df[c]))
+        controls[c] = {
+            "min": col_min,
+            "max": col_max,
+            "mid": float(np.nanmedian(df[c])),
+            "hist": _histogram_bins(df[c], (col_min, col_max)),
+        }
+
+    # 유사 사례 검색용 (수치형: z-score / 그 외: 문자열 값·결측 여부)
+    zscores, cat_values = {}, {}
+    for c in df.columns:
+        if c == y_col:
+            continue
+        if pd.api.types.is_numeric_dtype(df[c]):
+            x = df[c].values.astype(float)
+            mu = float(np.nanmean(x))
+            sd = _safe_std(df[c])
+            zscores[c] = ((x - mu) / sd, mu, sd)
+        else:
+            cat_values[c] = (df[c].astype(str).values, pd.isna(df[c]).values)
+
+    y = df[y_col].dropna()
+    return {
+        "controls": controls,
+        "zscores": zscores,
+        "cat_values": cat_values,
+        "y_hist": _histogram_bins(y),
+        "y_min": float(y.min()) if len(y) else 0.0,
+        "y_max": float(y.max()) if len(y) else 0.0,
+    }
+
+
+@session_cache.memoize("simulator", spinner="데이터 지도 계산 중...")
+def _fit_data_map(df, numeric_x_cols, y_col, method="PCA"):
+    """2D 투영(PCA 또는 UMAP)과 배경 점 색상값(Y를 0~1로 정규화)."""
+    X_map = df[numeric_x_cols].fillna(0)
+    y_map = df[y_col].reindex(X_map.index).ffill().fillna(0)
+
+    emb = None
+    reducer = None
+    used_method = method.upper() if method else "PCA"
+    if used_method == "UMAP":
+        try:
+            import umap
+            reducer = umap.UMAP(n_components=2, random_state=42)
+            emb = reducer.fit_transform(X_map.values)
+        except Exception:
+            used_method = "PCA"
+
+    if used_method == "PCA" or emb is None:
+        used_method = "PCA"
+        reducer = PCA(n_components=2)
+        try:
+            emb = reducer.fit_transform(X_map.values)
+        except Exception:
+            reducer = None
+            emb = np.zeros((len(X_map), 2))
+
+    y_min = y_map.min()
+    y_max = y_map.max()
+    y_range = y_max - y_min if y_max > y_min else 1.0
+
+    # Colorbar 틱 포맷팅
+    tick_vals = []
+    tick_texts = []
+    tick_val = y_min
+    dtick = y_range / 5 if y_range > 0 else 1
+    while tick_val <= y_max + 1e-6:
+        tick_vals.append(tick_val)
+        tick_texts.append(_format_number(tick_val))
+        tick_val += dtick
+
+    # 배경 점은 균등 간격 표본만 전송 (10만 점을 매번 직렬화하지 않도록)
+    shown = np.linspace(0, len(emb) - 1, MAP_MAX_POINTS).astype(np.int64) if len(emb) > MAP_MAX_POINTS else slice(None)
+
+    return {
+        "method": used_method,
+        "reducer": reducer,
+        "emb": emb[shown],
+        "y_min": float(y_min),
+        "y_max": float(y_max),
+        "y_norm": ((y_map.values - y_min) / y_range)[shown],
+        "tick_vals": tick_vals,
+        "tick_texts": tick_texts,
+    }
+
+
 # -----------------------------
 # --- Simulator renderer UI ---
 # -----------------------------
@@ -524,38 +650,42 @@ def _map_exploration_settings(radius_label: str):
     return dict(alpha=0.20, k_cap=80, k_max=500)
 
 
-def _create_histogram_with_slider(df, col_name, current_value):
+def _vline_shape(x, color, width):
     """
-    슬라이더 위에 표시할 히스토그램을 생성합니다.
+    수직선 shape (축 전체 높이). fig.add_vline()은 호출마다 레이아웃 전체를 검증해 느리므로
+    모아서 update_layout(shapes=...)로 한 번에 넣습니다.
+    """
+    return dict(type="line", xref="x", yref="paper", x0=x, x1=x, y0=0, y1=1,
+                line=dict(color=color, width=width, dash="solid"))
+
+
+def _create_histogram_with_slider(control, current_value):
+    """
+    슬라이더 위에 표시할 히스토그램을 생성합니다. (control: _prepare_simulator()의 열별 범위·구간)
     현재값을 빨간 수직선으로 표시합니다.
     """
-    col_data = df[col_name].dropna()
-    col_min = float(np.nanmin(col_data))
-    col_max = float(np.nanmax(col_data))
+    col_min, col_max = control["min"], control["max"]
+    counts, edges = control["hist"]
     
-    # 히스토그램 생성
+    # 히스토그램 생성 (미리 계산한 구간별 개수)
     fig = go.Figure()
     
-    fig.add_trace(go.Histogram(
-        x=col_data,
-        nbinsx=40,
-        marker=dict(color='#4169E1', opacity=0.7),
+    fig.add_trace(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+        customdata=np.column_stack([edges[:-1], edges[1:]]),
+        marker=dict(color='#4169E1', opacity=0.7, line=dict(width=0)),
         name='Data Distribution',
-        hovertemplate='Range: %{x}<br>Count: %{y}<extra></extra>'
+        hovertemplate='Range: %{customdata[0]:.4g} - %{customdata[1]:.4g}<br>Count: %{y}<extra></extra>'
     ))
     
-    # 현재값을 빨간 수직선으로 표시 (텍스트 없이)
-    fig.add_vline(
-        x=current_value,
-        line_dash="solid",
-        line_color="#FF4444",
-        line_width=2
-    )
-    
-    # 레이아웃 설정 - 여백을 완전히 제거 (x, y축 제거)
+    # 레이아웃 설정 - 여백을 완전히 제거 (x, y축 제거), 현재값은 빨간 수직선 (텍스트 없이)
     fig.update_layout(
+        shapes=[_vline_shape(current_value, "#FF4444", 2)],
         height=60,
         margin=dict(l=0, r=0, t=0, b=0),
+        bargap=0,
         xaxis_title="",
         yaxis_title="",
         showlegend=False,
@@ -577,7 +707,7 @@ def _create_histogram_with_slider(df, col_name, current_value):
     return fig
 
 
-def _render_control_panel(df, numeric_x_cols):
+def _render_control_panel(prepared, numeric_x_cols):
     """Left: sliders for numeric X. Returns current_inputs dict."""
     if 'slider_values' not in st.session_state:
         st.session_state.slider_values = {}
@@ -585,9 +715,10 @@ def _render_control_panel(df, numeric_x_cols):
 
     # st.markdown("**Control Panel**")
     for col_name in numeric_x_cols:
-        col_min = float(np.nanmin(df[col_name]))
-        col_max = float(np.nanmax(df[col_name]))
-        col_mid = float(np.nanmedian(df[col_name]))
+        control = prepared["controls"][col_name]
+        col_min = control["min"]
+        col_max = control["max"]
+        col_mid = control["mid"]
         step = (col_max - col_min) / 100 if col_max > col_min else 0.01
 
         if col_name not in st.session_state.slider_values:
@@ -623,7 +754,7 @@ def _render_control_panel(df, numeric_x_cols):
         current_slider_value = st.session_state.slider_values.get(col_name, col_mid)
         
         # 슬라이더 위에 히스토그램 표시
-        hist_fig = _create_histogram_with_slider(df, col_name, current_slider_value)
+        hist_fig = _create_histogram_with_slider(control, current_slider_value)
         
         # 히스토그램/슬라이더 사이의 여백을 강력하게 제거하여 밀착
         # height=60인 Plotly 차트(히스토그램)를 특정하여 스타일 적용
@@ -670,94 +801,30 @@ def _render_control_panel(df, numeric_x_cols):
 def _render_data_map_placeholder(df, numeric_x_cols, current_inputs, matched_df, y_col, method="PCA", bins=60):
     """Center: 2D projection (PCA or UMAP if available).
     Shows historical points colored by Y (heatmap-like), trajectory and neighbors.
+    투영 모델·배경 점 좌표·색상은 _fit_data_map()에서 한 번만 계산하고, 여기서는 현재 위치와 유사 사례만 투영합니다.
     """
-    X_map = df[numeric_x_cols].fillna(0)
-    y_map = df[y_col].reindex(X_map.index).fillna(method='ffill').fillna(0)
-
-    emb = None
-    used_method = method.upper() if method else "PCA"
-    if used_method == "UMAP":
-        try:
-            import umap
-            reducer = umap.UMAP(n_components=2, random_state=42)
-            emb = reducer.fit_transform(X_map.values)
-        except Exception:
-            used_method = "PCA"
-
-    if used_method == "PCA" or emb is None:
-        pca = PCA(n_components=2)
-        try:
-            emb = pca.fit_transform(X_map.values)
-        except Exception:
-            emb = np.zeros((len(X_map), 2))
+    data_map = _fit_data_map(df, numeric_x_cols, y_col, method)
+    reducer = data_map["reducer"]
+    emb = data_map["emb"]
 
     # project current point
     try:
         cur_vec = np.array([current_inputs[c] for c in numeric_x_cols], dtype=float).reshape(1, -1)
-        if used_method == "UMAP":
-            cur_proj = reducer.transform(cur_vec)[0]
-        else:
-            cur_proj = pca.transform(cur_vec)[0]
+        cur_proj = reducer.transform(cur_vec)[0]
     except Exception:
         cur_proj = np.array([0.0, 0.0])
 
     # matched projections
     try:
-        matched_proj = (reducer.transform(matched_df[numeric_x_cols].fillna(0).values) if (used_method == "UMAP" and 'reducer' in locals())
-                        else pca.transform(matched_df[numeric_x_cols].fillna(0).values)) if (not matched_df.empty) else np.empty((0, 2))
+        matched_proj = reducer.transform(matched_df[numeric_x_cols].fillna(0).values) if (not matched_df.empty) else np.empty((0, 2))
     except Exception:
         matched_proj = np.empty((0, 2))
 
-    # heatmap grid by averaging y per bin
     x_vals = emb[:, 0]
     y_vals = emb[:, 1]
-    grid_x_edges = np.linspace(x_vals.min(), x_vals.max(), bins + 1)
-    grid_y_edges = np.linspace(y_vals.min(), y_vals.max(), bins + 1)
-    sum_y, _, _ = np.histogram2d(x_vals, y_vals, bins=[grid_x_edges, grid_y_edges], weights=y_map.values)
-    counts, _, _ = np.histogram2d(x_vals, y_vals, bins=[grid_x_edges, grid_y_edges])
-    with np.errstate(invalid='ignore', divide='ignore'):
-        avg_y = sum_y / counts
-
-    # compute bin centers
-    x_centers = (grid_x_edges[:-1] + grid_x_edges[1:]) / 2
-    y_centers = (grid_y_edges[:-1] + grid_y_edges[1:]) / 2
     # create figure
     fig = go.Figure()
 
-    # background small history points colored by Y value
-    # Normalize Y values to [0, 1] for color mapping
-    y_min = y_map.min()
-    y_max = y_map.max()
-    y_range = y_max - y_min if y_max > y_min else 1.0
-    y_norm = (y_map.values - y_min) / y_range
-    
-    # Create custom gray gradient colors
-    # Low Y (#E5E7EB) → Mid Y (#9CA3AF) → High Y (#374151)
-    def interpolate_color(t):
-        if t < 0.5:
-            # Low to Mid
-            r = int(0xE5 * (1 - 2*t) + 0x9C * 2*t)
-            g = int(0xE7 * (1 - 2*t) + 0xA3 * 2*t)
-            b = int(0xEB * (1 - 2*t) + 0xAF * 2*t)
-        else:
-            # Mid to High
-            r = int(0x9C * (2 - 2*t) + 0x37 * (2*t - 1))
-            g = int(0xA3 * (2 - 2*t) + 0x41 * (2*t - 1))
-            b = int(0xAF * (2 - 2*t) + 0x51 * (2*t - 1))
-        return f'rgba({r}, {g}, {b}, 0.55)'
-    
-    bg_colors = [interpolate_color(y) for y in y_norm]
-    
-    # Colorbar 틱 포맷팅
-    tick_vals = []
-    tick_texts = []
-    tick_val = y_min
-    dtick = y_range / 5 if y_range > 0 else 1
-    while tick_val <= y_max + 1e-6:
-        tick_vals.append(tick_val)
-        tick_texts.append(_format_number(tick_val))
-        tick_val += dtick
-    
     # Layer 1: Background data points (drawn first)
     fig.add_trace(go.Scattergl(
         x=x_vals, 
@@ -765,7 +832,10 @@ def _render_data_map_placeholder(df, numeric_x_cols, current_inputs, matched_df,
         mode='markers', 
         marker=dict(
             size=5,
-            color=bg_colors,
+            color=data_map["y_norm"],
+            colorscale=MAP_BG_COLORSCALE,
+            cmin=0,
+            cmax=1,
             showscale=False
         ),
         showlegend=False,
@@ -778,7 +848,9 @@ def _render_data_map_placeholder(df, numeric_x_cols, current_inputs, matched_df,
         mode='markers',
         marker=dict(
             size=0,
-            color=y_map.values,
+            color=[data_map["y_min"]],
+            cmin=data_map["y_min"],
+            cmax=data_map["y_max"],
             colorscale=[
                 [0.0, '#E5E7EB'],
                 [0.5, '#9CA3AF'],
@@ -792,8 +864,8 @@ def _render_data_map_placeholder(df, numeric_x_cols, current_inputs, matched_df,
                 y=0.5,
                 len=0.9,
                 thickness=18,
-                tickvals=tick_vals,
-                ticktext=tick_texts
+                tickvals=data_map["tick_vals"],
+                ticktext=data_map["tick_texts"]
             )
         ),
         showlegend=False,
@@ -902,7 +974,7 @@ def _render_data_map_placeholder(df, numeric_x_cols, current_inputs, matched_df,
     st.plotly_chart(fig, use_container_width=True)
 
 
-def _render_prediction_panel(models_results, df, numeric_x_cols, x_df, coverage_model, y_col):
+def _render_prediction_panel(models_results, prepared, numeric_x_cols, x_df, coverage_model, y_col):
     """Right: consensus + simple model cards + confidence badge."""
     results = models_results
     
@@ -980,16 +1052,18 @@ def _render_prediction_panel(models_results, df, numeric_x_cols, x_df, coverage_
                 "</div>", unsafe_allow_html=True)
     
     """Y 변수 분포와 모델 예측값을 시각화하는 함수."""
-    import plotly.express as px
     import plotly.graph_objects as go
     
-    fig_hist = px.histogram(
-        df[y_col].dropna(), nbins=40,
-        labels={y_col: y_col}, color_discrete_sequence=["#636EFA"]
-    )
-    
-    # 히스토그램 자체 범례 제거 및 legendgroup 제거 (variable 헤더 제거)
-    fig_hist.update_traces(showlegend=False, legendgroup="", selector=dict(type='histogram'))
+    # 미리 계산한 Y 구간별 개수로 히스토그램 (범례 없음)
+    y_counts, y_edges = prepared["y_hist"]
+    fig_hist = go.Figure(go.Bar(
+        x=(y_edges[:-1] + y_edges[1:]) / 2,
+        y=y_counts,
+        width=np.diff(y_edges),
+        marker=dict(color="#636EFA", line=dict(width=0)),
+        showlegend=False,
+        hovertemplate=f"{y_col}: %{{x:.4g}}<br>count: %{{y}}<extra></extra>"
+    ))
     
     # Consensus와의 거리 계산
     distances = {}
@@ -1006,9 +1080,7 @@ def _render_prediction_panel(models_results, df, numeric_x_cols, x_df, coverage_
     color_spectrum = ["#FF3B3B", "#FF5252", "#FF6B6B", "#FF8585", "#FFA0A0", "#FFBDBD", "#FFDADA"]
     
     # Consensus 먼저 추가 (범례에서 가장 처음에 나타나도록)
-    fig_hist.add_vline(
-        x=consensus, line_color="red", line_width=4
-    )
+    vlines = [_vline_shape(consensus, "red", 4)]
     # Consensus 범례용 invisible trace 추가
     consensus_label = f"최종 예측 결과 ({_format_number(consensus)})"
     fig_hist.add_trace(go.Scatter(
@@ -1038,9 +1110,7 @@ def _render_prediction_panel(models_results, df, numeric_x_cols, x_df, coverage_
             for pred in preds:
                 if pred["모델"] == model_name:
                     y_hat = pred["예측 Y"]
-                    fig_hist.add_vline(
-                        x=y_hat, line_color=color, line_width=1.5
-                    )
+                    vlines.append(_vline_shape(y_hat, color, 1.5))
                     # 범례용 invisible trace 추가 (숫자 포함)
                     legend_label = f"{model_name} ({_format_number(y_hat)})"
                     fig_hist.add_trace(go.Scatter(
@@ -1057,9 +1127,7 @@ def _render_prediction_panel(models_results, df, numeric_x_cols, x_df, coverage_
     for pred in preds:
         if pred["모델"] == "Linear Regression":
             y_hat = pred["예측 Y"]
-            fig_hist.add_vline(
-                x=y_hat, line_color="#000000", line_width=1.5
-            )
+            vlines.append(_vline_shape(y_hat, "#000000", 1.5))
             # 범례용 invisible trace 추가 (숫자 포함)
             legend_label = f"Linear Regression ({_format_number(y_hat)})"
             fig_hist.add_trace(go.Scatter(
@@ -1073,8 +1141,8 @@ def _render_prediction_panel(models_results, df, numeric_x_cols, x_df, coverage_
             break
     
     # x축의 범위와 틱 간격 계산
-    x_min = df[y_col].dropna().min()
-    x_max = df[y_col].dropna().max()
+    x_min = prepared["y_min"]
+    x_max = prepared["y_max"]
     x_range = x_max - x_min
     
     # 틱 간격 자동 계산 (30% 더 촘촘하게)
@@ -1091,8 +1159,10 @@ def _render_prediction_panel(models_results, df, numeric_x_cols, x_df, coverage_
         tick_val += dtick
     
     fig_hist.update_layout(
+        shapes=vlines,
         height=480, 
         showlegend=True,
+        bargap=0,
         xaxis=dict(
             title="",
             showgrid=True,
@@ -1392,18 +1462,25 @@ def _render_y_distribution_chart(df, y_col, preds, consensus):
     st.plotly_chart(fig_hist, use_container_width=True, key="y_distribution_chart")
 
 
+@st.fragment
 def render_ai_simulator(df, models_results, coverage_model, numeric_x_cols, y_col):
-    """Main renderer: left controls, right tabs (data map & prediction), bottom twins."""
+    """
+    Main renderer: left controls, right tabs (data map & prediction), bottom twins.
+    fragment로 실행되어 슬라이더·입력·반경/투영 조작 시 이 함수만 다시 실행됩니다. (앞쪽 회귀·히트맵·ML 섹션은 그대로)
+    """
+    prepared = _prepare_simulator(df, numeric_x_cols, y_col)
     left, right = st.columns([1, 2.6])
 
-    # 기본 설정 먼저 정의
-    radius = "Balanced"
+    # 탐색 반경·지도 투영은 아래 위젯의 세션 상태를 사용 (처음에는 Balanced / PCA)
+    st.session_state.setdefault("sim_exploration_radius", "Balanced")
+    st.session_state.setdefault("sim_map_projection", "PCA")
+    radius = st.session_state.sim_exploration_radius
     params = _map_exploration_settings(radius)
-    method = "PCA"
+    method = st.session_state.sim_map_projection
 
     with left:
         st.markdown("##### X변수 Control Panel")
-        current_inputs = _render_control_panel(df, numeric_x_cols)
+        current_inputs = _render_control_panel(prepared, numeric_x_cols)
 
     x_df = pd.DataFrame([current_inputs])[numeric_x_cols]
 
@@ -1420,6 +1497,7 @@ def render_ai_simulator(df, models_results, coverage_model, numeric_x_cols, y_co
         alpha=float(params["alpha"]),
         delta=None,
         use_mult=True,
+        prepared=prepared,
     )
     matched_df = retrieval["matched_df"]
 
@@ -1428,7 +1506,7 @@ def render_ai_simulator(df, models_results, coverage_model, numeric_x_cols, y_co
 
         with tab1:
             # st.markdown("##### Prediction")
-            preds, consensus = _render_prediction_panel(models_results, df, numeric_x_cols, x_df, coverage_model, y_col)
+            preds, consensus = _render_prediction_panel(models_results, prepared, numeric_x_cols, x_df, coverage_model, y_col)
         
         with tab2:
             # st.markdown("##### Data Map")
@@ -1438,11 +1516,10 @@ def render_ai_simulator(df, models_results, coverage_model, numeric_x_cols, y_co
         col_radius, col_method = st.columns([1, 1])
         with col_radius:
             st.markdown("**Exploration Radius**")
-            radius = st.select_slider("exploration_radius_slider", options=["Narrow", "Balanced", "Wide"], value=radius, label_visibility="collapsed")
-            params = _map_exploration_settings(radius)
+            st.select_slider("exploration_radius_slider", options=["Narrow", "Balanced", "Wide"], key="sim_exploration_radius", label_visibility="collapsed")
         with col_method:
             st.markdown("**Map Projection**")
-            method = st.selectbox("map_projection_select", options=["PCA", "UMAP"], index=0 if method == "PCA" else 1, label_visibility="collapsed")
+            st.selectbox("map_projection_select", options=["PCA", "UMAP"], key="sim_map_projection", label_visibility="collapsed")
     st.markdown("---")
     _render_operational_twins(df, matched_df, numeric_x_cols, x_df, retrieval=retrieval, y_col=y_col)
 
@@ -1478,7 +1555,9 @@ def perform_ml_analysis_and_simulator(df, y_col, x_cols, baseline_r2):
     
     # 캐시된 함수를 호출합니다. 처음 실행 시에만 스피너가 표시되고 모델이 학습됩니다.
     # 슬라이더 조작 등으로 재실행될 때는 캐시된 결과를 즉시 반환합니다.
-    results = train_compare_models(X_train, y_train, X_test, y_test)
+    # 같은 데이터·변수·필터로 학습한 결과가 저장소에 있으면 재학습 없이 불러옴
+    results = result_store.cached_result("ml", y_col, numeric_x_cols,
+                                         lambda: train_compare_models(X_train, y_train, X_test, y_test))
     
     best_name = results["__best__"]
     best_model = results[best_name]["model"]
@@ -8,10 +8,63 @@ from sklearn.linear_model import Lasso
 from statsmodels.stats.outliers_influence import variance_inflation_factor
 import shap
 import time
+import result_store
 
 # ==============================
 # === 3단계: 변수 선택 적정성 점검 ===
 # ==============================
+
+# --- 계산 함수 (Streamlit 비의존, 배치 실행에서도 사용) ---
+def compute_vif(df, numeric_x_cols):
+    """표준화한 X로 변수별 VIF를 계산합니다. 데이터가 부족하면 None."""
+    X = df[numeric_x_cols].dropna()
+    if X.shape[0] < 2:
+        return None
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+    vif_data = pd.DataFrame()
+    vif_data["feature"] = X.columns
+    vif_data["VIF"] = [variance_inflation_factor(X_scaled, i) for i in range(X_scaled.shape[1])]
+    return vif_data.sort_values('VIF', ascending=True)
+
+
+def compute_lasso_importance(df, numeric_x_cols, y_col):
+    """LASSO(alpha=0.1) 계수 중 0이 아닌 변수만 영향력 순으로 돌려줍니다."""
+    X = df[numeric_x_cols]
+    y = df[y_col]
+
+    pipeline = Pipeline(steps=[('scaler', StandardScaler()), ('regressor', Lasso(alpha=0.1, random_state=42))])
+    pipeline.fit(X, y)
+    coefs = pipeline.named_steps['regressor'].coef_
+
+    lasso_data = pd.DataFrame({'변수': X.columns, '영향력': coefs})
+    return lasso_data[abs(lasso_data['영향력']) > 1e-5].sort_values('영향력', ascending=True)
+
+
+def compute_shap_importance(df, numeric_x_cols, y_col):
+    """간단한 Random Forest 모델로 SHAP 중요도(평균 절댓값)를 계산합니다. 데이터가 부족하면 None."""
+    from sklearn.ensemble import RandomForestRegressor
+    X = df[numeric_x_cols].dropna()
+    y = df[y_col].loc[X.index]
+
+    if len(X) <= 10:  # 최소 데이터 요구사항
+        return None
+    rf_model = RandomForestRegressor(n_estimators=50, random_state=42)
+    rf_model.fit(X, y)
+
+    # SHAP 값 계산 (샘플링하여 계산 속도 향상)
+    sample_size = min(100, len(X))
+    X_sample = X.sample(n=sample_size, random_state=42)
+
+    explainer = shap.TreeExplainer(rf_model)
+    shap_values = explainer.shap_values(X_sample)
+
+    return pd.DataFrame({
+        '변수': X.columns,
+        'SHAP 중요도': np.abs(shap_values).mean(axis=0)
+    }).sort_values('SHAP 중요도', ascending=True)
+
+
 def perform_variable_check(df, x_cols):
     """3단계: 다중공선성(VIF), 변수 선택(LASSO), SHAP 분석, 종합 해석을 4분면으로 렌더링합니다."""
         
@@ -32,17 +85,11 @@ def perform_variable_check(df, x_cols):
         with st.container(border=True):
             st.markdown("<h4 style='text-align: center;'>🚨 변수 간 '메아리 현상' 탐지 (VIF)</h4>", unsafe_allow_html=True)
             with st.spinner("변수들이 서로 얼마나 비슷한지 계산하는 중..."):
-                X = df[numeric_x_cols].dropna()
-                if X.shape[0] < 2:
+                vif_data = result_store.cached_result("vif", st.session_state.y_column, numeric_x_cols,
+                                                      lambda: compute_vif(df, numeric_x_cols))
+                if vif_data is None:
                     st.warning("VIF를 계산하기에 데이터가 부족합니다.")
                 else:
-                    scaler = StandardScaler()
-                    X_scaled = scaler.fit_transform(X)
-                    vif_data = pd.DataFrame()
-                    vif_data["feature"] = X.columns
-                    vif_data["VIF"] = [variance_inflation_factor(X_scaled, i) for i in range(X_scaled.shape[1])]
-                    vif_data = vif_data.sort_values('VIF', ascending=True)
-
                     colors = ['#2ca02c' if x < 5 else '#ff7f0e' if x < 10 else '#d62728' for x in vif_data['VIF']]
                     
                     fig = go.Figure(go.Bar(x=vif_data['VIF'], y=vif_data['feature'], orientation='h', marker_color=colors))
@@ -60,15 +107,9 @@ def perform_variable_check(df, x_cols):
         with st.container(border=True):
             st.markdown("<h4 style='text-align: center;'>🤖 AI가 선택한 핵심 변수 (LASSO)</h4>", unsafe_allow_html=True)
             with st.spinner("AI가 스스로 중요 변수를 고르고 있습니다..."):
-                X = df[numeric_x_cols]
-                y = df[st.session_state.y_column]
-                
-                pipeline = Pipeline(steps=[('scaler', StandardScaler()), ('regressor', Lasso(alpha=0.1, random_state=42))])
-                pipeline.fit(X, y)
-                coefs = pipeline.named_steps['regressor'].coef_
-                
-                lasso_data = pd.DataFrame({'변수': X.columns, '영향력': coefs})
-                lasso_data = lasso_data[abs(lasso_data['영향력']) > 1e-5].sort_values('영향력', ascending=True)
+                lasso_data = result_store.cached_result(
+                    "lasso", st.session_state.y_column, numeric_x_cols,
+                    lambda: compute_lasso_importance(df, numeric_x_cols, st.session_state.y_column))
                 
                 fig = go.Figure(go.Bar(x=lasso_data['영향력'], y=lasso_data['변수'], orientation='h', marker_color=np.where(lasso_data['영향력'] > 0, '#1f77b4', '#d62728')))
                 fig.update_layout(xaxis_title="Y값에 대한 영향력 (양수/음수)", height=350, margin=dict(l=20, r=20, t=40, b=20))
@@ -83,28 +124,11 @@ def perform_variable_check(df, x_cols):
             st.markdown("<h4 style='text-align: center;'>🔬 변수별 실제 기여도 (SHAP)</h4>", unsafe_allow_html=True)
             with st.spinner("각 변수가 실제 예측에 미치는 영향력을 계산하는 중..."):
                 try:
-                    # 간단한 Random Forest 모델로 SHAP 계산
-                    from sklearn.ensemble import RandomForestRegressor
-                    X = df[numeric_x_cols].dropna()
-                    y = df[st.session_state.y_column].loc[X.index]
+                    shap_importance = result_store.cached_result(
+                        "shap", st.session_state.y_column, numeric_x_cols,
+                        lambda: compute_shap_importance(df, numeric_x_cols, st.session_state.y_column))
                     
-                    if len(X) > 10:  # 최소 데이터 요구사항
-                        rf_model = RandomForestRegressor(n_estimators=50, random_state=42)
-                        rf_model.fit(X, y)
-                        
-                        # SHAP 값 계산 (샘플링하여 계산 속도 향상)
-                        sample_size = min(100, len(X))
-                        X_sample = X.sample(n=sample_size, random_state=42)
-                        
-                        explainer = shap.TreeExplainer(rf_model)
-                        shap_values = explainer.shap_values(X_sample)
-                        
-                        # SHAP 중요도 계산 (평균 절댓값)
-                        shap_importance = pd.DataFrame({
-                            '변수': X.columns,
-                            'SHAP 중요도': np.abs(shap_values).mean(axis=0)
-                        }).sort_values('SHAP 중요도', ascending=True)
-                        
+                    if shap_importance is not None:
                         shap_data = shap_importance
                         
                         fig = go.Figure(go.Bar(
@@ -0,0 +1,233 @@
+import os
+import time
+import warnings
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import streamlit as st
+import pandas as pd
+import numpy as np
+import plotly.graph_objects as go
+from sklearn.model_selection import train_test_split
+import result_store
+import category_index
+from step5_1_linear_regression import compute_linear_models
+from step5_2_machine_learning import train_compare_models
+
+# ==============================
+# === 5-4단계: 범주별 일괄 분석 ===
+# ==============================
+# 범주형 X 하나를 골라 범주 값마다 (상관, OLS/ElasticNet, 머신러닝 비교)를 워커 프로세스에서 병렬로 수행하고
+# R², 주요 변수, 계수 부호를 범주별로 나란히 비교합니다.
+# - 결과는 범주마다 결과 저장소(result_store)에 저장 → 범주를 추가하면 새 범주만 계산
+# - 워커 수: ANALYZER_CATEGORY_WORKERS (기본 CPU 수), 행 수가 MIN_CATEGORY_ROWS 미만인 범주는 건너뜀
+
+MAX_WORKERS = int(os.environ.get("ANALYZER_CATEGORY_WORKERS", os.cpu_count() or 1))
+MIN_CATEGORY_ROWS = 30
+TOP_DRIVERS = 3
+_STAGE = "category"
+
+
+# --- 계산 함수 (Streamlit 비의존, 워커 프로세스에서 실행) ---
+def analyze_category(df_part, y_col, x_cols):
+    """범주 하나의 요약: 행 수, Y와의 상관, OLS/ElasticNet R²·계수, ML 모델별 R², 주요 변수."""
+    numeric_x_cols = df_part[x_cols].select_dtypes(include=np.number).columns.tolist()
+    if not numeric_x_cols:
+        return {"error": "수치형 X 변수가 없습니다."}
+
+    data = df_part[[y_col] + numeric_x_cols].dropna()
+    summary = {"n_rows": len(data)}
+    if len(data) < MIN_CATEGORY_ROWS:
+        summary["error"] = f"행 수 부족 ({len(data)}행 < {MIN_CATEGORY_ROWS}행)"
+        return summary
+
+    corr = data[numeric_x_cols].corrwith(data[y_col])
+    summary["corr"] = {c: float(v) for c, v in corr.items()}
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        fit = compute_linear_models(data, y_col, numeric_x_cols)
+        if "error" in fit:
+            summary["linear_error"] = fit["error"]
+        else:
+            summary["ols_r2"] = float(fit["OLS"]["r2_test"])
+            summary["elasticnet_r2"] = float(fit["ElasticNet"]["r2_test"])
+            summary["coef"] = {c: float(v) for c, v in fit["OLS"]["coef_series"].items()}
+
+        # 화면(perform_ml_analysis_and_simulator)과 같은 분할, 세션 캐시 없이 원본 함수 호출
+        X_train, X_test, y_train, y_test = train_test_split(
+            data[numeric_x_cols], data[y_col], test_size=0.2, random_state=42
+        )
+        results = train_compare_models.__wrapped__(X_train, y_train, X_test, y_test)
+
+    summary["ml_r2"] = {name: float(res["r2"]) for name, res in results.items() if name != "__best__"}
+    summary["ml_best"] = results.get("__best__")
+
+    # 주요 변수: Permutation Importance 순 (없으면 |상관계수| 순)
+    pi = results.get("Permutation Importance", {}).get("pi")
+    ranking = pd.Series(pi) if pi else corr.abs()
+    summary["drivers"] = ranking.sort_values(ascending=False).index[:TOP_DRIVERS].tolist()
+    return summary
+
+
+def _category_frames(df, column, labels):
+    """{범주 라벨: 해당 범주 행}. 범주 인덱스의 행 위치로 자릅니다."""
+    index = category_index.build_category_index(df, [column])
+    return {label: df.iloc[category_index.select_positions(index, {column: [label]})] for label in labels}
+
+
+def run_category_batch(df, y_col, x_cols, column, labels, signature=None, progress=None):
+    """
+    범주마다 analyze_category()를 실행합니다. 저장소에 있는 범주는 불러오고, 없는 범주만 워커 프로세스로 계산.
+    signature(df의 데이터셋 시그니처)가 없으면 저장소를 거치지 않고 모두 계산합니다.
+    progress(완료 수, 전체 수, 라벨)가 있으면 범주가 끝날 때마다 호출합니다.
+    """
+    keys = {
+        label: result_store.make_key(signature, y_col, x_cols, {column: [label]}, _STAGE)
+        for label in labels
+    } if signature else {}
+
+    results = {}
+    for label in labels:
+        cached = result_store.get(keys[label]) if label in keys else None
+        if cached is not None:
+            results[label] = cached
+    pending = [label for label in labels if label not in results]
+    done = len(results)
+    if progress:
+        progress(done, len(labels), None)
+
+    def _finish(label, summary):
+        nonlocal done
+        results[label] = summary
+        if label in keys and "error" not in summary:
+            result_store.put(keys[label], summary, signature, y_col, x_cols, {column: [label]}, _STAGE)
+        done += 1
+        if progress:
+            progress(done, len(labels), label)
+
+    frames = _category_frames(df, column, pending)
+    workers = min(MAX_WORKERS, len(pending))
+    if workers > 1:
+        # Streamlit 서버는 스레드가 많아 fork 대신 spawn으로 워커 시작
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            futures = {executor.submit(analyze_category, frames[label], y_col, x_cols): label for label in pending}
+            for future in as_completed(futures):
+                label = futures[future]
+                try:
+                    summary = future.result()
+                except Exception as e:
+                    summary = {"error": str(e)}
+                _finish(label, summary)
+    else:
+        for label in pending:
+            try:
+                summary = analyze_category(frames[label], y_col, x_cols)
+            except Exception as e:
+                summary = {"error": str(e)}
+            _finish(label, summary)
+
+    return {label: results[label] for label in labels}
+
+
+def comparison_table(results):
+    """범주별 R²·최적 모델·주요 변수 비교표."""
+    rows = []
+    for label, s in results.items():
+        ml_r2 = s.get("ml_r2") or {}
+        best = s.get("ml_best")
+        rows.append({
+            "범주": label,
+            "행 수": s.get("n_rows"),
+            "OLS R²": s.get("ols_r2"),
+            "ElasticNet R²": s.get("elasticnet_r2"),
+            "최적 ML 모델": best,
+            "최적 ML R²": ml_r2.get(best) if best else None,
+            "주요 변수": ", ".join(s.get("drivers") or []),
+            "비고": s.get("error") or s.get("linear_error") or "",
+        })
+    return pd.DataFrame(rows)
+
+
+def sign_table(results):
+    """범주(행) × 변수(열) OLS 계수 부호표. 범주마다 부호가 다른 변수가 앞쪽."""
+    signs = pd.DataFrame({
+        label: {c: ("+" if v > 0 else "−" if v < 0 else "0") for c, v in s["coef"].items()}
+        for label, s in results.items() if s.get("coef")
+    }).T
+    if signs.empty:
+        return signs
+    mixed = signs.nunique() > 1
+    return signs[list(signs.columns[mixed]) + list(signs.columns[~mixed])]
+
+
+# --- 화면 ---
+def perform_category_batch_analysis(df, y_col, x_cols, categorical_x):
+    """범주형 X 하나를 골라 범주별 일괄 분석을 실행하고 비교 결과를 보여줍니다."""
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        column = st.selectbox("범주형 변수", categorical_x, key="category_batch_column")
+    index = category_index.build_category_index(df, [column])
+    label_counts = {str(v): n for v, n in category_index.option_counts(index, column).items()}
+    with col2:
+        labels = st.multiselect(
+            "분석할 범주",
+            list(label_counts),
+            default=[label for label, n in label_counts.items() if n >= MIN_CATEGORY_ROWS],
+            key=f"category_batch_values_{column}",
+            format_func=lambda v: f"{v} ({label_counts.get(v, 0):,}행)",
+            help=f"{MIN_CATEGORY_ROWS}행 미만인 범주는 분석에서 제외됩니다."
+        )
+
+    numeric_x_cols = [c for c in x_cols if c in df.columns and pd.api.types.is_numeric_dtype(df[c])]
+    run = st.button(
+        "▶ 범주별 일괄 분석", key="category_batch_run", type="primary",
+        disabled=not labels or not numeric_x_cols,
+        help="선택한 범주마다 상관·선형회귀·머신러닝 비교를 병렬로 수행합니다. 이미 분석한 범주는 저장된 결과를 불러옵니다."
+    )
+
+    # 범주별 분석은 적용된 필터와 무관하게 df_ready 전체 기준이므로 저장소 키에는 시그니처만 사용
+    scope = result_store.current_scope()
+    signature = scope["signature"] if scope else None
+    state_key = (signature, y_col, tuple(numeric_x_cols), column)
+    if run:
+        bar = st.progress(0.0, text="범주별 분석 준비 중...")
+
+        def _progress(done, total, label):
+            text = f"범주별 분석 중... ({done}/{total})" + (f" · '{label}' 완료" if label else "")
+            bar.progress(done / total if total else 1.0, text=text)
+
+        start = time.perf_counter()
+        results = run_category_batch(df, y_col, numeric_x_cols, column, labels, signature=signature, progress=_progress)
+        bar.empty()
+        st.session_state.category_batch = {"key": state_key, "results": results, "seconds": time.perf_counter() - start}
+
+    saved = st.session_state.get("category_batch")
+    if not saved or saved["key"] != state_key:
+        st.info("범주를 고른 뒤 **범주별 일괄 분석**을 누르면 범주마다 분석한 결과를 나란히 비교합니다.")
+        return
+
+    results = saved["results"]
+    st.caption(f"범주 {len(results)}개 · {saved['seconds']:.1f}초 (저장된 범주는 다시 계산하지 않음)")
+
+    table = comparison_table(results)
+    st.dataframe(table.round(3), width='stretch', hide_index=True)
+
+    # 범주별 R² 비교
+    valid = table.dropna(subset=["OLS R²"])
+    if not valid.empty:
+        fig = go.Figure()
+        fig.add_trace(go.Bar(x=valid["범주"], y=valid["OLS R²"], name="OLS"))
+        fig.add_trace(go.Bar(x=valid["범주"], y=valid["ElasticNet R²"], name="ElasticNet"))
+        fig.add_trace(go.Bar(x=valid["범주"], y=valid["최적 ML R²"], name="최적 ML"))
+        fig.update_layout(
+            barmode="group", height=360, margin=dict(l=10, r=10, t=30, b=10),
+            yaxis=dict(title="R² (test)"), xaxis=dict(type="category"),
+            legend=dict(orientation="h", y=1.1, x=0)
+        )
+        st.plotly_chart(fig, width='stretch', key="category_batch_r2")
+
+    signs = sign_table(results)
+    if not signs.empty:
+        st.markdown("**OLS 계수 부호 (범주 × 변수)**")
+        st.caption("범주마다 부호가 달라지는 변수는 앞쪽에 표시됩니다. 범주에 따라 영향 방향이 바뀌는 변수입니다.")
+        st.dataframe(signs, width='stretch')
@@ -0,0 +1,215 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+from missing_mask import MissingMask
+
+# ==============================
+# 업로드 파일 캐시 (내용 해시 → Parquet + 컬럼 타입 분석 결과)
+# ==============================
+# 같은 파일을 다시 올리면 load_data / analyze_column_types 를 건너뛰고 Parquet에서 바로 읽습니다.
+# - 키: 파일 바이트 내용의 해시 (파일명과 무관)
+# - 값: 정규화가 끝난 DataFrame(.parquet) + 컬럼 타입 분석 결과(.json) + 셀별 결측 단계 코드(.mask.npz)
+# - 용량: 전체 크기가 상한을 넘으면 가장 오래 사용하지 않은 항목부터 삭제 (LRU)
+
+CACHE_DIR = os.environ.get(
+    "ANALYZER_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "uploads"),
+)
+MAX_CACHE_BYTES = int(float(os.environ.get("ANALYZER_CACHE_MAX_MB", "2048")) * 1024 * 1024)
+
+# 저장 형식이 바뀌면 올려서 이전 캐시를 무효화
+_CACHE_VERSION = 2
+_STATS_FILE = "stats.json"
+_ANALYSIS_KEYS = [
+    "column_analysis", "numeric_columns", "categorical_columns",
+    "date_columns", "datelike_columns", "empty_columns",
+]
+_lock = threading.Lock()
+
+
+def content_key(uploaded_file, *extra) -> str:
+    """업로드 파일의 바이트 내용(+ 시트명 등 추가 구분값)으로 캐시 키를 만듭니다."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"v{_CACHE_VERSION}".encode())
+    uploaded_file.seek(0)
+    for chunk in iter(lambda: uploaded_file.read(1 << 20), b""):
+        h.update(chunk)
+    uploaded_file.seek(0)
+    for value in extra:
+        h.update(b"\x00" + str(value).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _paths(key: str):
+    return os.path.join(CACHE_DIR, f"{key}.parquet"), os.path.join(CACHE_DIR, f"{key}.json")
+
+
+def _mask_path(key: str):
+    return os.path.join(CACHE_DIR, f"{key}.mask.npz")
+
+
+def _all_paths(key: str):
+    return (*_paths(key), _mask_path(key))
+
+
+def parquet_path(key: str):
+    """캐시된 항목의 Parquet 경로 (없으면 None)."""
+    path = _paths(key)[0]
+    return path if os.path.exists(path) else None
+
+
+def read_parquet(path: str, columns=None) -> pd.DataFrame:
+    """Parquet을 읽고 문자열 열의 결측 표현을 load_data 결과와 같게 맞춥니다."""
+    df = pd.read_parquet(path, columns=columns)
+    # Parquet 왕복 시 문자열 열의 결측이 None으로 돌아오므로 NaN으로 통일
+    for i in range(df.shape[1]):
+        s = df.iloc[:, i]
+        if s.dtype == object:
+            df.isetitem(i, s.mask(s.isna(), np.nan))
+    return df
+
+
+def _update_stats(**increments):
+    path = os.path.join(CACHE_DIR, _STATS_FILE)
+    with _lock:
+        try:
+            with open(path, encoding="utf-8") as f:
+                stats = json.load(f)
+        except (OSError, ValueError):
+            stats = {}
+        for name, inc in increments.items():
+            stats[name] = stats.get(name, 0) + inc
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(stats, f)
+
+
+def get(key: str):
+    """캐시에서 (df, analyze_column_types 결과 튜플)을 꺼냅니다. 없으면 None."""
+    parquet_path, meta_path = _paths(key)
+    if not (os.path.exists(parquet_path) and os.path.exists(meta_path)):
+        _update_stats(misses=1)
+        return None
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        df = read_parquet(parquet_path)
+    except Exception:
+        # 깨진 항목은 지우고 미스로 처리
+        for path in _all_paths(key):
+            if os.path.exists(path):
+                os.remove(path)
+        _update_stats(misses=1)
+        return None
+
+    # LRU: 마지막 사용 시각 갱신
+    now = time.time()
+    for path in _all_paths(key):
+        if os.path.exists(path):
+            os.utime(path, (now, now))
+    _update_stats(hits=1)
+    return df, tuple(meta["analysis"][k] for k in _ANALYSIS_KEYS)
+
+
+def get_mask(key: str, columns):
+    """캐시된 결측 단계 마스크 (없으면 None). columns는 DataFrame 열 이름 순서."""
+    path = _mask_path(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path) as arrays:
+            return MissingMask.from_arrays(columns, {name: arrays[name] for name in arrays.files})
+    except (OSError, ValueError):
+        return None
+
+
+def put(key: str, df: pd.DataFrame, analysis: tuple, filename: str = None, mask: MissingMask = None) -> bool:
+    """정규화된 DataFrame과 컬럼 타입 분석 결과(와 결측 단계 마스크)를 저장합니다. 저장할 수 없는 데이터면 False."""
+    parquet_path, meta_path = _paths(key)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{parquet_path}.{os.getpid()}.tmp"
+    try:
+        df.to_parquet(tmp_path, index=True)
+    except Exception:
+        # pyarrow 미설치, 혼합 타입 열 등 Parquet으로 쓸 수 없는 경우 캐시하지 않음
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+    os.replace(tmp_path, parquet_path)
+
+    meta = {
+        "filename": filename,
+        "created": time.time(),
+        "shape": list(df.shape),
+        "analysis": dict(zip(_ANALYSIS_KEYS, analysis)),
+    }
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    if mask is not None:
+        tmp_mask = f"{_mask_path(key)}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_mask, **mask.to_arrays())
+        os.replace(tmp_mask, _mask_path(key))
+
+    _evict(MAX_CACHE_BYTES)
+    return True
+
+
+def _entries():
+    """(키, 크기, 마지막 사용 시각) 목록."""
+    if not os.path.isdir(CACHE_DIR):
+        return []
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        if not name.endswith(".parquet"):
+            continue
+        key = name[:-len(".parquet")]
+        size = 0
+        last_used = 0.0
+        for path in _all_paths(key):
+            if os.path.exists(path):
+                st_ = os.stat(path)
+                size += st_.st_size
+                last_used = max(last_used, st_.st_mtime)
+        entries.append((key, size, last_used))
+    return entries
+
+
+def _evict(max_bytes: int):
+    entries = sorted(_entries(), key=lambda e: e[2])
+    total = sum(size for _, size, _ in entries)
+    evicted = 0
+    for key, size, _ in entries:
+        if total <= max_bytes:
+            break
+        for path in _all_paths(key):
+            if os.path.exists(path):
+                os.remove(path)
+        total -= size
+        evicted += 1
+    if evicted:
+        _update_stats(evictions=evicted)
+
+
+def cache_stats() -> dict:
+    """캐시 적중률/용량 요약."""
+    try:
+        with open(os.path.join(CACHE_DIR, _STATS_FILE), encoding="utf-8") as f:
+            stats = json.load(f)
+    except (OSError, ValueError):
+        stats = {}
+    hits = stats.get("hits", 0)
+    misses = stats.get("misses", 0)
+    entries = _entries()
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / (hits + misses) if (hits + misses) else 0.0,
+        "evictions": stats.get("evictions", 0),
+        "entries": len(entries),
+        "bytes": sum(size for _, size, _ in entries),
+        "max_bytes": MAX_CACHE_BYTES,
+    }